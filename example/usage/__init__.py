@@ -2,12 +2,14 @@
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import pandas_ta as ta
 from solie import (
     AccountState,
     Decision,
     DecisionInput,
+    ExposureInput,
     IndicatorInput,
     OrderType,
     Position,
@@ -27,6 +29,8 @@ class SilentStrategy:
     description = "A silent strategy that does nothing"
     risk_level = RiskLevel.LOW
     parallel_simulation_chunk_days: int | None = 30
+    decision_interval: int | None = None
+    symbol_independent: bool = False
 
     def create_indicators(self, given: IndicatorInput) -> None:
         """Generate no indicators."""
@@ -44,6 +48,8 @@ class ExampleStrategy:
     description = "A fixed strategy for demonstration"
     risk_level = RiskLevel.HIGH
     parallel_simulation_chunk_days: int | None = 30
+    decision_interval: int | None = None
+    symbol_independent: bool = False
 
     def create_indicators(self, given: IndicatorInput) -> None:
         """Calculate SMA indicators for price and volume."""
@@ -123,3 +129,43 @@ class ExampleStrategy:
                 new_decisions[symbol][OrderType.NOW_BUY] = Decision(
                     margin=position.margin + acquire_ratio * wallet_balance,
                 )
+
+
+class VectorizedExampleStrategy:
+    """Trend-following strategy deciding SMA crossovers over whole arrays."""
+
+    code_name = "VECTOR"
+    readable_name = "Vectorized Strategy"
+    version = "0.1"
+    description = "A vectorized strategy for fast simulation"
+    risk_level = RiskLevel.HIGH
+    parallel_simulation_chunk_days: int | None = 30
+    decision_interval: int | None = 60
+    symbol_independent: bool = True
+
+    def create_indicators(self, given: IndicatorInput) -> None:
+        """Calculate SMA indicators for price."""
+        target_symbols: list[str] = given.target_symbols
+        candle_data: pd.DataFrame = given.candle_data
+        new_indicators: dict[str, pd.Series] = given.new_indicators
+
+        for symbol in target_symbols:
+            close_sr: pd.Series = candle_data[f"{symbol}/CLOSE"]
+            new_indicators[f"{symbol}/PRICE/SMA_ONE(#00FFA6)"] = ta.sma(close_sr, 90)
+            new_indicators[f"{symbol}/PRICE/SMA_TWO(#C261FF)"] = ta.sma(close_sr, 360)
+
+    def create_decisions(self, given: DecisionInput) -> None:
+        """Make no decisions, as exposures are used instead."""
+
+    def create_exposures(self, given: ExposureInput) -> None:
+        """Hold long or short exposures following SMA crossovers."""
+        target_symbols: list[str] = given.target_symbols
+        indicators: pd.DataFrame = given.indicators
+        new_exposures: dict[str, np.ndarray] = given.new_exposures
+
+        for symbol in target_symbols:
+            sma_one = indicators[f"{symbol}/PRICE/SMA_ONE(#00FFA6)"].to_numpy()
+            sma_two = indicators[f"{symbol}/PRICE/SMA_TWO(#C261FF)"].to_numpy()
+            exposures = new_exposures[symbol]
+            exposures[sma_one > sma_two] = 0.8
+            exposures[sma_one < sma_two] = -0.8
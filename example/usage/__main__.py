@@ -2,7 +2,7 @@
 
 from solie import SolieConfig, bring_to_life
 
-from usage import ExampleStrategy, SilentStrategy
+from usage import ExampleStrategy, SilentStrategy, VectorizedExampleStrategy
 
 
 def main() -> None:
@@ -11,6 +11,7 @@ def main() -> None:
     config = SolieConfig()
     config.add_strategy(SilentStrategy())
     config.add_strategy(ExampleStrategy())
+    config.add_strategy(VectorizedExampleStrategy())
     # Run Solie and show the window.
     bring_to_life(config)
 
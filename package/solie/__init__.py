@@ -5,6 +5,7 @@ from .utility import (
     AccountState,
     Decision,
     DecisionInput,
+    ExposureInput,
     IndicatorInput,
     OpenOrder,
     OrderType,
@@ -13,6 +14,7 @@ from .utility import (
     RiskLevel,
     SolieConfig,
     Strategy,
+    VectorizedStrategy,
 )
 from .worker import Team, team
 
@@ -20,6 +22,7 @@ __all__ = [
     "AccountState",
     "Decision",
     "DecisionInput",
+    "ExposureInput",
     "IndicatorInput",
     "OpenOrder",
     "OrderType",
@@ -29,6 +32,7 @@ __all__ = [
     "SolieConfig",
     "Strategy",
     "Team",
+    "VectorizedStrategy",
     "bring_to_life",
     "team",
 ]
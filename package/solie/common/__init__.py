@@ -5,20 +5,44 @@ from .connect_event import outsource
 from .info import PACKAGE_NAME, PACKAGE_PATH, PACKAGE_VERSION
 from .parallelism import (
     PROCESS_COUNT,
-    get_sync_manager,
+    consume_chunks,
     prepare_process_pool,
+    spawn_background,
     spawn_blocking,
 )
+from .sharing import (
+    FLOAT_DTYPE,
+    SharedArray,
+    SharedFlagReader,
+    SharedValueWriter,
+    raise_shared_flag,
+    read_shared_rows,
+    release_shared_memory,
+    share_array,
+    sum_shared_array,
+    write_shared_rows,
+)
 
 __all__ = [
+    "FLOAT_DTYPE",
     "PACKAGE_NAME",
     "PACKAGE_PATH",
     "PACKAGE_VERSION",
     "PROCESS_COUNT",
+    "SharedArray",
+    "SharedFlagReader",
+    "SharedValueWriter",
     "UniqueTask",
-    "get_sync_manager",
+    "consume_chunks",
     "outsource",
     "prepare_process_pool",
+    "raise_shared_flag",
+    "read_shared_rows",
+    "release_shared_memory",
+    "share_array",
     "spawn",
+    "spawn_background",
     "spawn_blocking",
+    "sum_shared_array",
+    "write_shared_rows",
 ]
@@ -58,6 +58,10 @@ class UniqueTask:
         if self._task is not None and not self._task.done():
             self._task.cancel()
 
+    def is_running(self) -> bool:
+        """Check whether the current task is still running."""
+        return self._task is not None and not self._task.done()
+
     def add_done_callback(self, callback: Callable[[Task[Any]], Any]) -> None:
         """Add a callback to be called when the current task is done."""
         if self._task is not None:
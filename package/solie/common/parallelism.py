@@ -1,38 +1,50 @@
 """Process pool management for CPU-bound operations."""
 
 import functools
-from asyncio import get_event_loop
-from collections.abc import Callable
+import os
+from asyncio import Queue, TaskGroup, get_event_loop
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
 from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
-from multiprocessing import Manager, cpu_count
-from multiprocessing.managers import SyncManager
-from typing import ClassVar
+from multiprocessing import cpu_count
+from typing import ClassVar, cast
 
 PROCESS_COUNT = cpu_count()
+BACKGROUND_NICENESS = 10
 
 
 class PoolHolder:
-    """Holds the process pool and sync manager for parallel execution."""
+    """Holds process pools for parallel execution."""
 
     process_pool: ClassVar[ProcessPoolExecutor]
-    sync_manager: ClassVar[SyncManager]
+    background_pool: ClassVar[ProcessPoolExecutor]
+
+
+def _lower_priority() -> None:
+    """Let other processes take the CPU first, where the platform allows it."""
+    if hasattr(os, "nice"):
+        os.nice(BACKGROUND_NICENESS)
+
+
+def _create_background_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(1, initializer=_lower_priority)
 
 
 def prepare_process_pool() -> None:
-    """Initialize process pool and sync manager."""
+    """Initialize process pools."""
     PoolHolder.process_pool = ProcessPoolExecutor(PROCESS_COUNT)
-    PoolHolder.sync_manager = Manager()
+    PoolHolder.background_pool = _create_background_pool()
 
 
 def shutdown_process_pool() -> None:
-    """Shut down process pool and sync manager."""
+    """Shut down process pools."""
     PoolHolder.process_pool.shutdown()
-    PoolHolder.sync_manager.shutdown()
-
-
-def get_sync_manager() -> SyncManager:
-    """Get the sync manager instance."""
-    return PoolHolder.sync_manager
+    PoolHolder.background_pool.shutdown()
 
 
 async def spawn_blocking[**P, T](
@@ -70,3 +82,80 @@ async def spawn_blocking[**P, T](
         prepare_process_pool()
         result = await event_loop.run_in_executor(process_pool, partial_blocker)
     return result
+
+
+async def spawn_background[**P, T](
+    blocker: Callable[P, T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """Execute callable in a single process with lowered priority.
+
+    Small periodic work runs here, so that it neither waits behind
+    long jobs filling the main process pool nor slows them down.
+    """
+    event_loop = get_event_loop()
+    partial_blocker = functools.partial(blocker, *args, **kwargs)
+    try:
+        result = await event_loop.run_in_executor(
+            PoolHolder.background_pool,
+            partial_blocker,
+        )
+    except BrokenExecutor:
+        PoolHolder.background_pool = _create_background_pool()
+        result = await event_loop.run_in_executor(
+            PoolHolder.background_pool,
+            partial_blocker,
+        )
+    return result
+
+
+async def _iterate_chunks[T](
+    chunks: Iterable[T] | AsyncIterable[T],
+) -> AsyncIterator[T]:
+    if isinstance(chunks, AsyncIterable):
+        # Narrowing can't rule out objects that are both kinds of iterables
+        async for chunk in cast("AsyncIterable[T]", chunks):
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def consume_chunks[T](
+    chunks: Iterable[T] | AsyncIterable[T],
+    handle_chunk: Callable[[int, T], Awaitable[None]],
+    consumer_count: int,
+) -> None:
+    """Handle chunks with a fixed number of concurrent consumers.
+
+    Chunks are passed through a queue that only holds as many chunks
+    as there are consumers, so that an asynchronous source of chunks
+    is only advanced when consumers are about to need more.
+    Each call of `handle_chunk` receives the index of its consumer,
+    which lets consumers reuse their own resources.
+    If a chunk fails, the other consumers are cancelled
+    and the error of the chunk is raised.
+    """
+    chunk_queue = Queue[tuple[T] | None](maxsize=max(consumer_count, 1))
+
+    async def feed() -> None:
+        async for chunk in _iterate_chunks(chunks):
+            await chunk_queue.put((chunk,))
+        for _ in range(consumer_count):
+            await chunk_queue.put(None)
+
+    async def consume(consumer: int) -> None:
+        while True:
+            item = await chunk_queue.get()
+            if item is None:
+                return
+            await handle_chunk(consumer, item[0])
+
+    try:
+        async with TaskGroup() as task_group:
+            task_group.create_task(feed())
+            for consumer in range(consumer_count):
+                task_group.create_task(consume(consumer))
+    except ExceptionGroup as error_group:
+        raise error_group.exceptions[0] from None
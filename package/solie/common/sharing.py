@@ -0,0 +1,129 @@
+"""Shared memory transport of NumPy arrays between processes."""
+
+import struct
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+import numpy as np
+
+FLOAT_DTYPE = "<f8"
+
+
+class SharedArray(NamedTuple):
+    """Description of a NumPy array placed in shared memory.
+
+    Only this small description is pickled when sent to other processes.
+    """
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+def share_array(array: np.ndarray) -> tuple[SharedMemory, SharedArray]:
+    """Copy an array into a new shared memory block.
+
+    The returned `SharedMemory` is owned by the caller,
+    which should pass it to `release_shared_memory` when it's no longer needed.
+    """
+    memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    shared_array = SharedArray(memory.name, array.shape, array.dtype.str)
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+    view[...] = array
+    del view
+    return memory, shared_array
+
+
+def read_shared_rows(
+    shared_array: SharedArray,
+    row_from: int,
+    row_until: int,
+) -> np.ndarray:
+    """Copy a range of rows out of a shared array."""
+    memory = SharedMemory(name=shared_array.name)
+    view = np.ndarray(shared_array.shape, shared_array.dtype, buffer=memory.buf)
+    rows = view[row_from:row_until].copy()
+    del view
+    memory.close()
+    return rows
+
+
+def write_shared_rows(
+    shared_array: SharedArray,
+    row_from: int,
+    rows: np.ndarray,
+) -> None:
+    """Write a range of rows into a shared array."""
+    memory = SharedMemory(name=shared_array.name)
+    view = np.ndarray(shared_array.shape, shared_array.dtype, buffer=memory.buf)
+    view[row_from : row_from + len(rows)] = rows
+    del view
+    memory.close()
+
+
+def sum_shared_array(memory: SharedMemory, shared_array: SharedArray) -> float:
+    """Sum all values of a shared array that this process has attached."""
+    view = np.ndarray(shared_array.shape, shared_array.dtype, buffer=memory.buf)
+    total = float(view.sum())
+    del view
+    return total
+
+
+def _get_buffer(memory: SharedMemory) -> memoryview:
+    """Get the buffer of a shared memory block that is still open."""
+    buffer = memory.buf
+    if buffer is None:
+        msg = f"Shared memory {memory.name} is already closed"
+        raise ValueError(msg)
+    return buffer
+
+
+class SharedValueWriter:
+    """Writes float values into a shared array without locks or IPC.
+
+    The shared array should have `<f8` dtype.
+    Each position should be written by only one process,
+    so that readers can poll values at any time.
+    """
+
+    def __init__(self, shared_array: SharedArray) -> None:
+        """Attach to the shared array."""
+        if shared_array.dtype != FLOAT_DTYPE:
+            msg = f"Shared array should have {FLOAT_DTYPE} dtype"
+            raise ValueError(msg)
+        self._memory = SharedMemory(name=shared_array.name)
+
+    def write(self, position: int, value: float) -> None:
+        """Write a value at the position."""
+        struct.pack_into("<d", _get_buffer(self._memory), position * 8, value)
+
+    def close(self) -> None:
+        """Detach from the shared array."""
+        self._memory.close()
+
+
+def raise_shared_flag(memory: SharedMemory) -> None:
+    """Raise a flag stored in the first byte of a shared memory block."""
+    _get_buffer(memory)[0] = 1
+
+
+class SharedFlagReader:
+    """Checks a flag in shared memory that another process may raise."""
+
+    def __init__(self, shared_array: SharedArray) -> None:
+        """Attach to the shared array holding the flag."""
+        self._memory = SharedMemory(name=shared_array.name)
+
+    def is_raised(self) -> bool:
+        """Check whether the flag is raised."""
+        return _get_buffer(self._memory)[0] != 0
+
+    def close(self) -> None:
+        """Detach from the shared array."""
+        self._memory.close()
+
+
+def release_shared_memory(memory: SharedMemory) -> None:
+    """Close and remove a shared memory block."""
+    memory.close()
+    memory.unlink()
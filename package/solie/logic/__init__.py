@@ -6,30 +6,68 @@ from .analyze_market import (
     CalculationOutput,
     DecisionContext,
     SimulationError,
+    is_decision_moment,
     make_decisions,
     make_indicators,
     simulate_chunk,
 )
 from .binance_watcher import BinanceWatcher, ExchangeConfig, StateConfig
+from .candle_archive import (
+    ARCHIVE_MANIFEST,
+    ArchiveManifest,
+    append_candle_journal,
+    get_archive_folder,
+    get_journal_path,
+    read_archive_manifest,
+    read_candle_archive,
+    read_candle_journal,
+    update_candle_archive,
+    write_candle_archive,
+)
 from .download_from_binance import (
     DownloadPreset,
     DownloadUnitSize,
+    collect_moment_aggtrades,
     download_aggtrade_csv,
     fill_holes_with_aggtrades,
     process_aggtrade_csv,
 )
+from .indicator_cache import (
+    IndicatorCache,
+    fingerprint_candle_data,
+    fingerprint_strategy,
+)
+from .multi_year_calculator import MultiYearCalculator
 from .order_placer import OrderPlacer, OrderPlacerConfig
+from .parameter_sweep import (
+    ParameterSweep,
+    expand_parameter_grid,
+    make_strategy_variant,
+)
 from .simulation_calculator import (
+    INDICATOR_WARMUP,
     CalculationConfig,
+    CalculationContext,
     CalculationResult,
     SimulationCalculator,
+    SimulationCheckpoint,
     WidgetReferences,
+    calculate_asset_changes,
+    find_live_window_from,
+    get_legacy_result_paths,
+    make_result_prefix,
+    read_checkpoint,
+    write_checkpoint,
 )
 
 __all__ = [
+    "ARCHIVE_MANIFEST",
+    "INDICATOR_WARMUP",
     "AccountListener",
+    "ArchiveManifest",
     "BinanceWatcher",
     "CalculationConfig",
+    "CalculationContext",
     "CalculationInput",
     "CalculationOutput",
     "CalculationResult",
@@ -37,17 +75,41 @@ __all__ = [
     "DownloadPreset",
     "DownloadUnitSize",
     "ExchangeConfig",
+    "IndicatorCache",
+    "MultiYearCalculator",
     "OrderPlacer",
     "OrderPlacerConfig",
+    "ParameterSweep",
     "ParseOrderTypeParams",
     "SimulationCalculator",
+    "SimulationCheckpoint",
     "SimulationError",
     "StateConfig",
     "WidgetReferences",
+    "append_candle_journal",
+    "calculate_asset_changes",
+    "collect_moment_aggtrades",
     "download_aggtrade_csv",
+    "expand_parameter_grid",
     "fill_holes_with_aggtrades",
+    "find_live_window_from",
+    "fingerprint_candle_data",
+    "fingerprint_strategy",
+    "get_archive_folder",
+    "get_journal_path",
+    "get_legacy_result_paths",
+    "is_decision_moment",
     "make_decisions",
     "make_indicators",
+    "make_result_prefix",
+    "make_strategy_variant",
     "process_aggtrade_csv",
+    "read_archive_manifest",
+    "read_candle_archive",
+    "read_candle_journal",
+    "read_checkpoint",
     "simulate_chunk",
+    "update_candle_archive",
+    "write_candle_archive",
+    "write_checkpoint",
 ]
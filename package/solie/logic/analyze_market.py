@@ -5,26 +5,41 @@ import secrets
 from datetime import UTC, datetime, timedelta
 from enum import Enum
 from itertools import product
-from multiprocessing.managers import ListProxy
 from typing import Any, NamedTuple
 
 import numpy as np
 import pandas as pd
 
+from solie.common import (
+    SharedArray,
+    SharedFlagReader,
+    SharedValueWriter,
+    read_shared_rows,
+    write_shared_rows,
+)
 from solie.utility import (
     COLUMN_PARTS_COUNT,
+    EXPOSURE_LOOKBACK,
+    MOMENT_MS,
+    AbortRules,
     AccountState,
     Decision,
     DecisionInput,
+    ExposureInput,
     IndicatorInput,
+    LazyRow,
     OpenOrder,
     OrderType,
     Position,
     PositionDirection,
     SavedStrategy,
     Strategy,
+    VectorizedStrategy,
     VirtualPlacement,
+    VirtualPosition,
     VirtualState,
+    from_epoch_ms,
+    to_epoch_ms,
 )
 
 GRAPH_TYPES = ["PRICE", "VOLUME", "ABSTRACT"]
@@ -40,6 +55,10 @@ class DecisionContext(NamedTuple):
     current_indicators: dict[str, float]
     account_state: AccountState
     scribbles: dict[Any, Any]
+    candle_data: pd.DataFrame | None = None
+    """Candle data until the current moment, for vectorized strategies"""
+    indicators: pd.DataFrame | None = None
+    """Indicators until the current moment, for vectorized strategies"""
 
 
 class TradeAmounts(NamedTuple):
@@ -50,16 +69,16 @@ class TradeAmounts(NamedTuple):
 
 
 class TradeMoments(NamedTuple):
-    """Trade timing details."""
+    """Trade timing details, in epoch milliseconds."""
 
-    current_moment: datetime
-    before_moment: datetime
+    current_moment: int
+    before_moment: int
 
 
 class TradeDetails(NamedTuple):
     """Trade execution details."""
 
-    before_moment: datetime
+    before_moment: int  # Epoch milliseconds
     amount_shift: float
     open_price: float
 
@@ -130,8 +149,86 @@ def make_indicators(
     return indicators
 
 
+def is_decision_moment(strategy: Strategy, moment: int) -> bool:
+    """Check whether the strategy should make decisions at this moment.
+
+    The moment is given in epoch milliseconds.
+    """
+    decision_interval = getattr(strategy, "decision_interval", None)
+    if decision_interval is None:
+        return True
+    return moment // 1000 % decision_interval == 0
+
+
+def follow_exposure(
+    exposure: float,
+    direction: PositionDirection,
+    position_margin: float,
+    wallet_balance: float,
+) -> tuple[OrderType, Decision] | None:
+    """Decide an order that moves a position toward its target exposure.
+
+    Positions are only changed when the desired direction differs,
+    so they are not resized while the direction stays the same.
+    """
+    if math.isnan(exposure):
+        return None
+
+    if exposure > 0.0:
+        desired_direction = PositionDirection.LONG
+    elif exposure < 0.0:
+        desired_direction = PositionDirection.SHORT
+    else:
+        desired_direction = PositionDirection.NONE
+
+    if desired_direction == direction:
+        return None
+    if desired_direction == PositionDirection.NONE:
+        return OrderType.NOW_CLOSE, Decision()
+
+    margin = abs(exposure) * wallet_balance
+    if direction != PositionDirection.NONE:
+        # Flip the position by covering its current margin as well
+        margin += position_margin
+    if desired_direction == PositionDirection.LONG:
+        return OrderType.NOW_BUY, Decision(margin=margin)
+    return OrderType.NOW_SELL, Decision(margin=margin)
+
+
+def make_exposures(
+    strategy: VectorizedStrategy,
+    target_symbols: list[str],
+    candle_data: pd.DataFrame,
+    indicators: pd.DataFrame,
+) -> np.ndarray:
+    """Get target exposures of a vectorized strategy, one column per symbol."""
+    row_count = len(candle_data)
+    new_exposures: dict[str, np.ndarray] = {
+        s: np.full(row_count, np.nan, dtype=np.float64) for s in target_symbols
+    }
+    exposure_input = ExposureInput(
+        target_symbols=target_symbols,
+        candle_data=candle_data,
+        indicators=indicators,
+        new_exposures=new_exposures,
+    )
+    strategy.create_exposures(exposure_input)
+
+    exposures = np.empty((row_count, len(target_symbols)), dtype=np.float64)
+    for slot, symbol in enumerate(target_symbols):
+        symbol_exposures = np.asarray(new_exposures[symbol], dtype=np.float64)
+        if symbol_exposures.shape != (row_count,):
+            msg = f"Exposures of {symbol} should have one value for each row"
+            raise ValueError(msg)
+        exposures[:, slot] = symbol_exposures
+    return exposures
+
+
 def make_decisions(context: DecisionContext) -> dict[str, dict[OrderType, Decision]]:
     """Make trading decisions based on current market state."""
+    if isinstance(context.strategy, VectorizedStrategy):
+        return _make_decisions_from_exposures(context, context.strategy)
+
     new_decisions: dict[str, dict[OrderType, Decision]] = {}
     for symbol in context.target_symbols:
         new_decisions[symbol] = {}
@@ -157,10 +254,61 @@ def make_decisions(context: DecisionContext) -> dict[str, dict[OrderType, Decisi
     return new_decisions
 
 
+def _make_decisions_from_exposures(
+    context: DecisionContext,
+    strategy: VectorizedStrategy,
+) -> dict[str, dict[OrderType, Decision]]:
+    """Make trading decisions of a vectorized strategy for a single moment.
+
+    Exposures are created over the recent rows that the strategy looks back on,
+    and only those of the last row are followed.
+    """
+    if context.candle_data is None or context.indicators is None:
+        moment_index = pd.DatetimeIndex([context.current_moment])
+        candle_data = pd.DataFrame(
+            [dict(context.current_candle_data)],
+            index=moment_index,
+        )
+        indicators = pd.DataFrame(
+            [dict(context.current_indicators)],
+            index=moment_index,
+        )
+    else:
+        lookback = getattr(strategy, "exposure_lookback", EXPOSURE_LOOKBACK)
+        row_count = max(lookback, EXPOSURE_LOOKBACK)
+        candle_data = context.candle_data.tail(row_count)
+        indicators = context.indicators.reindex(candle_data.index)
+    exposures = make_exposures(
+        strategy,
+        context.target_symbols,
+        candle_data,
+        indicators,
+    )
+
+    account_state = context.account_state
+    new_decisions: dict[str, dict[OrderType, Decision]] = {}
+    for slot, symbol in enumerate(context.target_symbols):
+        position = account_state.positions[symbol]
+        decision_pair = follow_exposure(
+            exposures.item(-1, slot),
+            position.direction,
+            position.margin,
+            account_state.wallet_balance,
+        )
+        if decision_pair is not None:
+            order_type, decision = decision_pair
+            new_decisions[symbol] = {order_type: decision}
+    return new_decisions
+
+
 class SimulationError(Exception):
     """Exception raised during trading simulation."""
 
 
+class SimulationCancelledError(SimulationError):
+    """Exception raised when the calculation was cancelled from outside."""
+
+
 class OrderRole(Enum):
     """Role of trader in order execution."""
 
@@ -179,34 +327,95 @@ class OrderHandlerResult(NamedTuple):
     is_margin_nan: bool
 
 
+class PlacementRule(NamedTuple):
+    """How a placement of a specific order type gets filled."""
+
+    order_type: OrderType
+    role: OrderRole
+    needs_crossing: bool
+    """Whether the price should cross the boundary within the candle"""
+    is_close: bool
+    is_sell: bool
+
+
+# Placements are tried in this order, and only the first fill counts per cycle.
+PLACEMENT_RULES = (
+    PlacementRule(OrderType.NOW_CLOSE, OrderRole.TAKER, False, True, False),
+    PlacementRule(OrderType.NOW_BUY, OrderRole.TAKER, False, False, False),
+    PlacementRule(OrderType.NOW_SELL, OrderRole.TAKER, False, False, True),
+    PlacementRule(OrderType.LATER_UP_CLOSE, OrderRole.TAKER, True, True, False),
+    PlacementRule(OrderType.LATER_DOWN_CLOSE, OrderRole.TAKER, True, True, False),
+    PlacementRule(OrderType.LATER_UP_BUY, OrderRole.TAKER, True, False, False),
+    PlacementRule(OrderType.LATER_DOWN_BUY, OrderRole.TAKER, True, False, False),
+    PlacementRule(OrderType.LATER_UP_SELL, OrderRole.TAKER, True, False, True),
+    PlacementRule(OrderType.LATER_DOWN_SELL, OrderRole.TAKER, True, False, True),
+    PlacementRule(OrderType.BOOK_BUY, OrderRole.MAKER, True, False, False),
+    PlacementRule(OrderType.BOOK_SELL, OrderRole.MAKER, True, False, True),
+)
+ORDER_TYPE_COUNT = len(OrderType)
+CANCELABLE_COLUMNS = [t.value for t in OrderType if t.is_later() or t.is_book()]
+CROSSING_COLUMNS = [r.order_type.value for r in PLACEMENT_RULES if r.needs_crossing]
+INSTANT_COLUMNS = [
+    *(r.order_type.value for r in PLACEMENT_RULES if not r.needs_crossing),
+    OrderType.CANCEL_ALL.value,
+]
+
+
+class SharedFrame(NamedTuple):
+    """Year-long data on a regular time grid placed in shared memory."""
+
+    start: int
+    """Epoch milliseconds of the first row"""
+    step: int
+    """Milliseconds between rows"""
+    values: SharedArray
+    columns: list[str]
+
+
 class CalculationInput(NamedTuple):
-    """Input data for simulation calculation."""
+    """Input data for simulation calculation.
+
+    Candle data and indicators are not pickled for each chunk.
+    The chunk is only a range of rows in shared memory.
+    """
 
     strategy: Strategy
-    progress_list: ListProxy
+    progress: SharedArray
+    """Seconds of simulated time, one counter per chunk"""
     target_progress: int
+    cancel_flag: SharedArray
+    """Raised by the main process to stop all chunks"""
     target_symbols: list[str]
-    calculation_index: pd.DatetimeIndex
-    chunk_candle_data: pd.DataFrame
-    chunk_indicators: pd.DataFrame
+    candle_data: SharedFrame
+    indicators: SharedFrame
+    unrealized_changes: SharedArray
+    """Output array that shares rows with candle data"""
+    row_from: int
+    row_until: int
     chunk_asset_record: pd.DataFrame
-    chunk_unrealized_changes: pd.Series
     chunk_scribbles: dict[Any, Any]
     chunk_account_state: AccountState
     chunk_virtual_state: VirtualState
+    abort_rules: AbortRules = AbortRules()
 
 
 class CalculationOutput(NamedTuple):
-    """Output data from simulation calculation."""
+    """Output data from simulation calculation.
+
+    Unrealized changes are written directly into shared memory.
+    """
 
     chunk_asset_record: pd.DataFrame
-    chunk_unrealized_changes: pd.Series
     chunk_scribbles: dict[Any, Any]
     chunk_account_state: AccountState
     chunk_virtual_state: VirtualState
+    is_aborted: bool = False
+    """Whether the chunk stopped early by abort rules, with partial results"""
 
 
 ORDER_ID_MIN, ORDER_ID_MAX = 10**18, 10**19 - 1
+ASSET_RECORD_MIN_CAPACITY = 64
+QUIET_SEARCH_ROWS = 360  # First block of rows searched for the next event
 
 
 class ChunkSimulator:
@@ -215,400 +424,449 @@ class ChunkSimulator:
     This class eliminates the need for multiple NamedTuples by using instance
     variables to hold state, making method signatures cleaner and reducing
     parameter passing overhead.
+
+    Each symbol is given an integer slot while simulating.
+    Positions and placements live in preallocated NumPy arrays indexed by
+    those slots, and the virtual state model is only rebuilt at the end.
+
+    When the strategy has a decision interval, cycles between decision moments
+    where no placement can be filled are skipped at once,
+    recording only unrealized changes of held positions with array operations.
     """
 
     def __init__(self, calculation_input: CalculationInput) -> None:
         """Initialize the chunk simulator with calculation input."""
         # Input parameters
         self.strategy = calculation_input.strategy
-        self.progress_list = calculation_input.progress_list
+        self.progress = calculation_input.progress
         self.target_progress = calculation_input.target_progress
+        self.cancel_flag = calculation_input.cancel_flag
         self.target_symbols = calculation_input.target_symbols
-        self.calculation_index = calculation_input.calculation_index
 
-        # Chunk data (will be converted to arrays)
-        self.chunk_candle_data = calculation_input.chunk_candle_data
-        self.chunk_indicators = calculation_input.chunk_indicators
+        # Chunk data in shared memory (will be copied into arrays)
+        self.candle_data = calculation_input.candle_data
+        self.indicators = calculation_input.indicators
+        self.unrealized_changes = calculation_input.unrealized_changes
+        self.row_from = calculation_input.row_from
+        self.row_until = calculation_input.row_until
         self.chunk_asset_record = calculation_input.chunk_asset_record
-        self.chunk_unrealized_changes = calculation_input.chunk_unrealized_changes
 
         # State that gets mutated
         self.chunk_scribbles = calculation_input.chunk_scribbles
         self.chunk_account_state = calculation_input.chunk_account_state
         self.chunk_virtual_state = calculation_input.chunk_virtual_state
+        self.abort_rules = calculation_input.abort_rules
 
         # Constants
         self.decision_lag = 3000  # milliseconds
+        self.symbol_slots = {s: i for i, s in enumerate(self.target_symbols)}
 
         # Working arrays, initialized in `simulate` method
-        self.candle_data_ar: np.recarray
-        self.indicators_ar: np.recarray
+        self.calculation_index: pd.DatetimeIndex
+        self.index_moments: list[int] = []  # Epoch milliseconds
+        self.candle_values: np.ndarray
+        self.candle_row: list[float] = []
+        self.indicator_values: np.ndarray
+        self.exposure_values: np.ndarray | None = None
+        self.decision_rows: np.ndarray | None = None
+        self.candle_columns: dict[str, int] = {}
+        self.indicator_columns: dict[str, int] = {}
         self.asset_record_ar: np.recarray
-        self.chunk_unrealized_changes_ar: np.recarray
+        self.asset_record_size: int = 0
+        self.last_fill_time: int = 0  # Epoch milliseconds
+        self.unrealized_changes_ar: np.ndarray
         self.cycle: int = 0
+        self.trade_count: int = 0
+        self.peak_equity: float = 0.0
+        self.is_aborted = False
+        self.progress_writer: SharedValueWriter
+        self.cancel_reader: SharedFlagReader
+
+        # Column indices of each symbol slot, resolved once per chunk
+        self.open_columns: list[int] = []
+        self.high_columns: list[int] = []
+        self.low_columns: list[int] = []
+        self.close_columns: list[int] = []
+
+        self._allocate_state_arrays()
+
+    def _allocate_state_arrays(self) -> None:
+        """Allocate arrays of virtual and account states, indexed by symbol slot."""
+        # Virtual state arrays indexed by symbol slot and order type value
+        symbol_count = len(self.target_symbols)
+        placement_shape = (symbol_count, ORDER_TYPE_COUNT)
+        self.available_balance = 0.0
+        self.position_amounts = np.zeros(symbol_count, dtype=np.float64)
+        self.entry_prices = np.zeros(symbol_count, dtype=np.float64)
+        self.placement_flags = np.zeros(placement_shape, dtype=np.bool_)
+        self.placement_boundaries = np.zeros(placement_shape, dtype=np.float64)
+        self.placement_margins = np.zeros(placement_shape, dtype=np.float64)
+        self.placement_order_ids = np.zeros(placement_shape, dtype=np.uint64)
+
+        # Account state snapshots, rebuilt only for slots that have changed
+        observed_until = self.chunk_account_state.observed_until
+        self.observed_until = to_epoch_ms(observed_until)  # Epoch milliseconds
+        self.wallet_balance = self.chunk_account_state.wallet_balance
+        self.update_times = np.zeros(symbol_count, dtype=np.int64)  # Epoch ms
+        self.account_positions: list[Position] = []
+        self.account_open_orders: list[dict[int, OpenOrder]] = []
+        self.dirty_slots = np.ones(symbol_count, dtype=np.bool_)
 
     def simulate(self) -> CalculationOutput:
         """Run the trading simulation."""
         if isinstance(self.strategy, SavedStrategy):
             self.strategy.compile_code()
 
-        if len(self.calculation_index) == 0:
+        if self.row_from == self.row_until:
             return CalculationOutput(
                 chunk_asset_record=self.chunk_asset_record,
-                chunk_unrealized_changes=self.chunk_unrealized_changes,
                 chunk_scribbles=self.chunk_scribbles,
                 chunk_account_state=self.chunk_account_state,
                 chunk_virtual_state=self.chunk_virtual_state,
             )
 
-        # Convert DataFrames to numpy arrays for performance
-        calculation_index_ar = self.calculation_index.to_numpy()
-        self.candle_data_ar = self.chunk_candle_data.to_records()
-        self.indicators_ar = self.chunk_indicators.to_records()
-        self.asset_record_ar = self.chunk_asset_record.to_records()
-        self.chunk_unrealized_changes_ar = (
-            self.chunk_unrealized_changes.to_frame().to_records()
-        )
+        self._load_chunk()
+
+        calculation_index_length = len(self.index_moments)
+        first_calculation_moment = self.index_moments[0]
 
-        calculation_index_length = len(calculation_index_ar)
-        first_calculation_moment = calculation_index_ar[0]
+        should_check_abort = any(r is not None for r in self.abort_rules)
+        self.peak_equity = self.wallet_balance
 
         # Main simulation loop
-        for cycle in range(calculation_index_length):
-            self.cycle = cycle
-            before_moment = calculation_index_ar[cycle]
-            current_moment = before_moment + timedelta(seconds=10)
+        self.progress_writer = SharedValueWriter(self.progress)
+        self.cancel_reader = SharedFlagReader(self.cancel_flag)
+        try:
+            cycle = 0
+            while cycle < calculation_index_length:
+                if self.cancel_reader.is_raised():
+                    msg = "Calculation was cancelled"
+                    raise SimulationCancelledError(msg)
+
+                self.cycle = cycle
+                self.candle_row = self.candle_values[cycle].tolist()
+                before_moment = self.index_moments[cycle]
+                current_moment = before_moment + MOMENT_MS
+
+                # Process all symbols
+                for slot in range(len(self.target_symbols)):
+                    self._process_symbol(slot, current_moment, before_moment)
+
+                # Update unrealized changes
+                self._update_unrealized_state(current_moment)
+
+                # Give up early when the result is already hopeless
+                if should_check_abort and self._should_abort():
+                    self.is_aborted = True
+                    self.unrealized_changes_ar[cycle + 1 :] = np.nan
+                    break
+
+                # Make new trading decisions, only at the strategy's cadence
+                if is_decision_moment(self.strategy, current_moment):
+                    self._make_cycle_decisions(current_moment)
+
+                # Update progress
+                self._update_progress(current_moment, first_calculation_moment)
+
+                # Jump to the next cycle where something can happen
+                cycle = self._skip_quiet_cycles(cycle + 1, first_calculation_moment)
+                if self.is_aborted:
+                    break
+        finally:
+            self.progress_writer.close()
+            self.cancel_reader.close()
+
+        return self._create_output()
 
-            # Process all symbols
-            for symbol in self.target_symbols:
-                self._process_symbol(symbol, current_moment, before_moment)
+    def _load_chunk(self) -> None:
+        """Copy rows of this chunk out of shared memory and load states."""
+        row_from, row_until = self.row_from, self.row_until
+        step = self.candle_data.step
+        moment_from = self.candle_data.start + row_from * step
+        moment_until = self.candle_data.start + row_until * step
+        self.index_moments = list(range(moment_from, moment_until, step))
+        self.calculation_index = pd.to_datetime(self.index_moments, unit="ms", utc=True)
+        self.candle_values = read_shared_rows(
+            self.candle_data.values,
+            row_from,
+            row_until,
+        )
+        self.indicator_values = read_shared_rows(
+            self.indicators.values,
+            row_from,
+            row_until,
+        )
+        self.asset_record_ar = self.chunk_asset_record.to_records()
+        self.asset_record_size = len(self.asset_record_ar)
+        if self.asset_record_size > 0:
+            last_record_time = self.chunk_asset_record.index.max()
+            self.last_fill_time = to_epoch_ms(last_record_time)
+        self.unrealized_changes_ar = np.empty(
+            len(self.index_moments),
+            dtype=self.unrealized_changes.dtype,
+        )
+        self._resolve_columns()
+        self._load_virtual_state()
+        self._load_account_state()
+        if isinstance(self.strategy, VectorizedStrategy):
+            self.exposure_values = make_exposures(
+                self.strategy,
+                self.target_symbols,
+                pd.DataFrame(
+                    self.candle_values,
+                    index=self.calculation_index,
+                    columns=self.candle_data.columns,
+                ),
+                pd.DataFrame(
+                    self.indicator_values,
+                    index=self.calculation_index,
+                    columns=self.indicators.columns,
+                ),
+            )
 
-            # Update unrealized changes
-            self._update_unrealized_state(before_moment, current_moment)
+        decision_interval = getattr(self.strategy, "decision_interval", None)
+        if decision_interval is not None:
+            moment_seconds = np.array(self.index_moments) // 1000 + 10
+            self.decision_rows = np.flatnonzero(moment_seconds % decision_interval == 0)
 
-            # Make new trading decisions
+    def _make_cycle_decisions(self, current_moment: int) -> None:
+        """Place orders of the current cycle, from exposures or strategy code."""
+        if self.exposure_values is None:
             self._process_decisions(current_moment)
+        else:
+            self._process_exposures(self.exposure_values[self.cycle])
+
+    def _resolve_columns(self) -> None:
+        """Find column positions of candle data and indicators."""
+        columns = {c: i for i, c in enumerate(self.candle_data.columns)}
+        self.candle_columns = columns
+        self.indicator_columns = {c: i for i, c in enumerate(self.indicators.columns)}
+        for symbol in self.target_symbols:
+            self.open_columns.append(columns[f"{symbol}/OPEN"])
+            self.high_columns.append(columns[f"{symbol}/HIGH"])
+            self.low_columns.append(columns[f"{symbol}/LOW"])
+            self.close_columns.append(columns[f"{symbol}/CLOSE"])
+
+    def _load_virtual_state(self) -> None:
+        """Copy the virtual state model into slot arrays."""
+        virtual_state = self.chunk_virtual_state
+        self.available_balance = virtual_state.available_balance
+        for symbol, slot in self.symbol_slots.items():
+            virtual_position = virtual_state.positions.get(symbol)
+            if virtual_position is not None:
+                self.position_amounts[slot] = virtual_position.amount
+                self.entry_prices[slot] = virtual_position.entry_price
+            symbol_placements = virtual_state.placements.get(symbol, {})
+            for order_type, placement in symbol_placements.items():
+                column = order_type.value
+                self.placement_flags[slot, column] = True
+                self.placement_boundaries[slot, column] = placement.boundary
+                self.placement_margins[slot, column] = placement.margin
+                self.placement_order_ids[slot, column] = placement.order_id
+
+    def _load_account_state(self) -> None:
+        """Take initial account state snapshots of each symbol slot."""
+        account_state = self.chunk_account_state
+        for symbol, slot in self.symbol_slots.items():
+            position = account_state.positions.get(symbol)
+            if position is None:
+                position = Position(
+                    margin=0.0,
+                    direction=PositionDirection.NONE,
+                    entry_price=0.0,
+                    update_time=datetime.fromtimestamp(0.0, tz=UTC),
+                )
+            self.update_times[slot] = to_epoch_ms(position.update_time)
+            self.account_positions.append(
+                position.model_copy(),
+            )
+            self.account_open_orders.append(
+                {
+                    order_id: open_order.model_copy()
+                    for order_id, open_order in account_state.open_orders.get(
+                        symbol,
+                        {},
+                    ).items()
+                },
+            )
 
-            # Update progress
-            self._update_progress(current_moment, first_calculation_moment)
+    def _view_account_state(self) -> AccountState:
+        """Expose the account state to the strategy without deep copying.
+
+        Positions and open orders are shallow copies of snapshots,
+        so that the strategy may freely modify them.
+        """
+        return AccountState.model_construct(
+            observed_until=from_epoch_ms(self.observed_until),
+            wallet_balance=self.wallet_balance,
+            positions={
+                symbol: position.model_copy()
+                for symbol, position in zip(
+                    self.target_symbols,
+                    self.account_positions,
+                    strict=True,
+                )
+            },
+            open_orders={
+                symbol: {
+                    order_id: open_order.model_copy()
+                    for order_id, open_order in self.account_open_orders[slot].items()
+                }
+                for symbol, slot in self.symbol_slots.items()
+            },
+        )
 
-        return self._create_output()
+    def _dump_account_state(self) -> AccountState:
+        """Build the account state model from snapshots."""
+        account_state = self.chunk_account_state.model_copy()
+        account_state.observed_until = from_epoch_ms(self.observed_until)
+        account_state.wallet_balance = self.wallet_balance
+        account_state.positions = account_state.positions.copy()
+        account_state.open_orders = account_state.open_orders.copy()
+        for symbol, slot in self.symbol_slots.items():
+            position = self.account_positions[slot]
+            account_state.positions[symbol] = Position(**dict(position))
+            account_state.open_orders[symbol] = {
+                order_id: OpenOrder(**dict(open_order))
+                for order_id, open_order in self.account_open_orders[slot].items()
+            }
+        return account_state
+
+    def _dump_virtual_state(self) -> VirtualState:
+        """Build the virtual state model from slot arrays."""
+        virtual_state = VirtualState(
+            available_balance=self.available_balance,
+            positions={},
+            placements={},
+        )
+        for symbol, slot in self.symbol_slots.items():
+            virtual_state.positions[symbol] = VirtualPosition(
+                amount=self.position_amounts.item(slot),
+                entry_price=self.entry_prices.item(slot),
+            )
+            virtual_state.placements[symbol] = {
+                order_type: VirtualPlacement(
+                    boundary=self.placement_boundaries.item(slot, order_type.value),
+                    margin=self.placement_margins.item(slot, order_type.value),
+                    order_id=self.placement_order_ids.item(slot, order_type.value),
+                )
+                for order_type in OrderType
+                if self.placement_flags[slot, order_type.value]
+            }
+        return virtual_state
 
     def _process_symbol(
         self,
-        symbol: str,
-        current_moment: datetime,
-        before_moment: datetime,
+        slot: int,
+        current_moment: int,
+        before_moment: int,
     ) -> None:
-        """Process orders and trades for a single symbol."""
-        open_price = float(self.candle_data_ar[self.cycle][f"{symbol}/OPEN"])
-        close_price = float(self.candle_data_ar[self.cycle][f"{symbol}/CLOSE"])
+        """Process orders and trades for a single symbol slot."""
+        open_price = self.candle_row[self.open_columns[slot]]
+        close_price = self.candle_row[self.close_columns[slot]]
 
         if math.isnan(open_price) or math.isnan(close_price):
             return
 
-        # Initialize trade state
-        would_trade_happen = False
-        amount_shift = 0.0
-        fill_price = 0.0
-        role: OrderRole | None = None
+        symbol = self.target_symbols[slot]
         price_speed = (close_price - open_price) / 10
-        is_margin_negative = False
-        is_margin_nan = False
+        symbol_flags = self.placement_flags[slot]
 
         # Handle CANCEL_ALL
-        if OrderType.CANCEL_ALL in self.chunk_virtual_state.placements[symbol]:
-            self._handle_cancel_all(symbol)
+        if symbol_flags[OrderType.CANCEL_ALL.value]:
+            self._handle_cancel_all(slot)
 
         # Try each order type in priority order
-        result = self._try_order_types(symbol, open_price, price_speed)
-        if result:
-            would_trade_happen = result.would_trade_happen
-            role = result.role
-            fill_price = result.fill_price
-            amount_shift = result.amount_shift
-            is_margin_negative = result.is_margin_negative
-            is_margin_nan = result.is_margin_nan
-
-        # Validate and execute trade
-        if is_margin_negative:
-            msg = (
-                "Got an order with a negative margin "
-                f"while calculating {symbol} market at {current_moment}"
-            )
-            raise SimulationError(
-                msg,
-            )
-        if is_margin_nan:
-            msg = (
-                "Got an order with a non-numeric margin "
-                f"while calculating {symbol} market at {current_moment}"
-            )
-            raise SimulationError(
-                msg,
-            )
+        result = None
+        if symbol_flags.any():
+            result = self._try_order_types(slot, open_price, price_speed)
+
+        if result is not None:
+            # Validate and execute trade
+            if result.is_margin_negative:
+                msg = (
+                    "Got an order with a negative margin while calculating "
+                    f"{symbol} market at {from_epoch_ms(current_moment)}"
+                )
+                raise SimulationError(
+                    msg,
+                )
+            if result.is_margin_nan:
+                msg = (
+                    "Got an order with a non-numeric margin while calculating "
+                    f"{symbol} market at {from_epoch_ms(current_moment)}"
+                )
+                raise SimulationError(
+                    msg,
+                )
 
-        if would_trade_happen:
             self._execute_trade(
-                symbol,
-                TradeAmounts(amount_shift, fill_price),
+                slot,
+                TradeAmounts(result.amount_shift, result.fill_price),
                 TradeMoments(current_moment, before_moment),
                 open_price,
-                role,
+                result.role,
             )
 
-        self._update_account_state_for_symbol(symbol)
+        self._update_account_state_for_symbol(slot)
 
-    def _handle_cancel_all(self, symbol: str) -> None:
-        """Cancel all pending orders for a symbol."""
-        cancel_placement_names = [
-            order_type
-            for order_type in self.chunk_virtual_state.placements[symbol]
-            if order_type.is_later() or order_type.is_book()
-        ]
-        for cancel_placement_name in cancel_placement_names:
-            self.chunk_virtual_state.placements[symbol].pop(cancel_placement_name)
-        self.chunk_virtual_state.placements[symbol].pop(OrderType.CANCEL_ALL)
+    def _handle_cancel_all(self, slot: int) -> None:
+        """Cancel all pending orders for a symbol slot."""
+        self.placement_flags[slot, CANCELABLE_COLUMNS] = False
+        self.placement_flags[slot, OrderType.CANCEL_ALL.value] = False
+        self.dirty_slots[slot] = True
 
     def _try_order_types(
         self,
-        symbol: str,
+        slot: int,
         open_price: float,
         price_speed: float,
     ) -> OrderHandlerResult | None:
-        """Try processing each order type, returning first match."""
-        # NOW orders
-        now_handlers = {
-            OrderType.NOW_CLOSE: lambda: self._handle_now_close(
-                symbol,
-                open_price,
-                price_speed,
-            ),
-            OrderType.NOW_BUY: lambda: self._handle_now_buy(
-                symbol,
-                open_price,
-                price_speed,
-            ),
-            OrderType.NOW_SELL: lambda: self._handle_now_sell(
-                symbol,
-                open_price,
-                price_speed,
-            ),
-        }
-        for order_type, handler in now_handlers.items():
-            if order_type in self.chunk_virtual_state.placements[symbol]:
-                result = handler()
-                if result:
-                    return result
-
-        # LATER orders
-        later_handlers = {
-            OrderType.LATER_UP_CLOSE: lambda: self._handle_later_close(
-                symbol,
-                OrderType.LATER_UP_CLOSE,
-            ),
-            OrderType.LATER_DOWN_CLOSE: lambda: self._handle_later_close(
-                symbol,
-                OrderType.LATER_DOWN_CLOSE,
-            ),
-            OrderType.LATER_UP_BUY: lambda: self._handle_later_buy_sell(
-                symbol,
-                OrderType.LATER_UP_BUY,
-                False,
-            ),
-            OrderType.LATER_DOWN_BUY: lambda: self._handle_later_buy_sell(
-                symbol,
-                OrderType.LATER_DOWN_BUY,
-                False,
-            ),
-            OrderType.LATER_UP_SELL: lambda: self._handle_later_buy_sell(
-                symbol,
-                OrderType.LATER_UP_SELL,
-                True,
-            ),
-            OrderType.LATER_DOWN_SELL: lambda: self._handle_later_buy_sell(
-                symbol,
-                OrderType.LATER_DOWN_SELL,
-                True,
-            ),
-        }
-        for order_type, handler in later_handlers.items():
-            if order_type in self.chunk_virtual_state.placements[symbol]:
-                result = handler()
-                if result:
-                    return result
-
-        # BOOK orders
-        book_handlers = {
-            OrderType.BOOK_BUY: lambda: self._handle_book_order(
-                symbol,
-                OrderType.BOOK_BUY,
-                False,
-            ),
-            OrderType.BOOK_SELL: lambda: self._handle_book_order(
-                symbol,
-                OrderType.BOOK_SELL,
-                True,
-            ),
-        }
-        for order_type, handler in book_handlers.items():
-            if order_type in self.chunk_virtual_state.placements[symbol]:
-                result = handler()
-                if result:
-                    return result
-
-        return None
-
-    def _handle_now_close(
-        self,
-        symbol: str,
-        open_price: float,
-        price_speed: float,
-    ) -> OrderHandlerResult:
-        """Handle NOW_CLOSE order."""
-        role = OrderRole.TAKER
-        fill_price = open_price + price_speed * (self.decision_lag / 1000)
-        amount_shift = -self.chunk_virtual_state.positions[symbol].amount
-        self.chunk_virtual_state.placements[symbol].pop(OrderType.NOW_CLOSE)
-        return OrderHandlerResult(True, role, fill_price, amount_shift, False, False)
-
-    def _handle_now_buy(
-        self,
-        symbol: str,
-        open_price: float,
-        price_speed: float,
-    ) -> OrderHandlerResult:
-        """Handle NOW_BUY order."""
-        placement = self.chunk_virtual_state.placements[symbol][OrderType.NOW_BUY]
-        role = OrderRole.TAKER
-        fill_price = open_price + price_speed * (self.decision_lag / 1000)
-        fill_margin = placement.margin
-        is_margin_negative = fill_margin < 0.0
-        is_margin_nan = math.isnan(fill_margin)
-        amount_shift = fill_margin / fill_price
-        self.chunk_virtual_state.placements[symbol].pop(OrderType.NOW_BUY)
-        return OrderHandlerResult(
-            True,
-            role,
-            fill_price,
-            amount_shift,
-            is_margin_negative,
-            is_margin_nan,
-        )
-
-    def _handle_now_sell(
-        self,
-        symbol: str,
-        open_price: float,
-        price_speed: float,
-    ) -> OrderHandlerResult:
-        """Handle NOW_SELL order."""
-        placement = self.chunk_virtual_state.placements[symbol][OrderType.NOW_SELL]
-        role = OrderRole.TAKER
-        fill_price = open_price + price_speed * (self.decision_lag / 1000)
-        fill_margin = placement.margin
-        is_margin_negative = fill_margin < 0.0
-        is_margin_nan = math.isnan(fill_margin)
-        amount_shift = -fill_margin / fill_price
-        self.chunk_virtual_state.placements[symbol].pop(OrderType.NOW_SELL)
-        return OrderHandlerResult(
-            True,
-            role,
-            fill_price,
-            amount_shift,
-            is_margin_negative,
-            is_margin_nan,
-        )
+        """Try filling each placement type, returning first match."""
+        symbol_flags = self.placement_flags[slot]
+        wobble_high = self.candle_row[self.high_columns[slot]]
+        wobble_low = self.candle_row[self.low_columns[slot]]
+
+        for rule in PLACEMENT_RULES:
+            column = rule.order_type.value
+            if not symbol_flags[column]:
+                continue
 
-    def _handle_later_close(
-        self,
-        symbol: str,
-        order_type: OrderType,
-    ) -> OrderHandlerResult | None:
-        """Handle LATER_*_CLOSE orders."""
-        placement = self.chunk_virtual_state.placements[symbol][order_type]
-        boundary = placement.boundary
-        wobble_high = float(self.candle_data_ar[self.cycle][f"{symbol}/HIGH"])
-        wobble_low = float(self.candle_data_ar[self.cycle][f"{symbol}/LOW"])
-
-        if wobble_low < boundary < wobble_high:
-            role = OrderRole.TAKER
-            fill_price = boundary
-            amount_shift = -self.chunk_virtual_state.positions[symbol].amount
-            self.chunk_virtual_state.placements[symbol].pop(order_type)
-            return OrderHandlerResult(
-                True,
-                role,
-                fill_price,
-                amount_shift,
-                False,
-                False,
-            )
-        return None
+            if rule.needs_crossing:
+                boundary = self.placement_boundaries.item(slot, column)
+                if not wobble_low < boundary < wobble_high:
+                    continue
+                fill_price = boundary
+            else:
+                fill_price = open_price + price_speed * (self.decision_lag / 1000)
 
-    def _handle_later_buy_sell(
-        self,
-        symbol: str,
-        order_type: OrderType,
-        is_sell: bool,
-    ) -> OrderHandlerResult | None:
-        """Handle LATER_*_BUY/SELL orders."""
-        placement = self.chunk_virtual_state.placements[symbol][order_type]
-        boundary = placement.boundary
-        wobble_high = float(self.candle_data_ar[self.cycle][f"{symbol}/HIGH"])
-        wobble_low = float(self.candle_data_ar[self.cycle][f"{symbol}/LOW"])
-
-        if wobble_low < boundary < wobble_high:
-            role = OrderRole.TAKER
-            fill_price = boundary
-            fill_margin = placement.margin
-            is_margin_negative = fill_margin < 0.0
-            is_margin_nan = math.isnan(fill_margin)
-            amount_shift = (-fill_margin if is_sell else fill_margin) / fill_price
-            self.chunk_virtual_state.placements[symbol].pop(order_type)
+            if rule.is_close:
+                amount_shift = -self.position_amounts.item(slot)
+                is_margin_negative = False
+                is_margin_nan = False
+            else:
+                fill_margin = self.placement_margins.item(slot, column)
+                is_margin_negative = fill_margin < 0.0
+                is_margin_nan = math.isnan(fill_margin)
+                signed_margin = -fill_margin if rule.is_sell else fill_margin
+                amount_shift = signed_margin / fill_price
+
+            symbol_flags[column] = False
+            self.dirty_slots[slot] = True
             return OrderHandlerResult(
                 True,
-                role,
+                rule.role,
                 fill_price,
                 amount_shift,
                 is_margin_negative,
                 is_margin_nan,
             )
-        return None
 
-    def _handle_book_order(
-        self,
-        symbol: str,
-        order_type: OrderType,
-        is_sell: bool,
-    ) -> OrderHandlerResult | None:
-        """Handle BOOK_BUY/SELL orders."""
-        placement = self.chunk_virtual_state.placements[symbol][order_type]
-        boundary = placement.boundary
-        wobble_high = float(self.candle_data_ar[self.cycle][f"{symbol}/HIGH"])
-        wobble_low = float(self.candle_data_ar[self.cycle][f"{symbol}/LOW"])
-
-        if wobble_low < boundary < wobble_high:
-            role = OrderRole.MAKER
-            fill_price = boundary
-            fill_margin = placement.margin
-            is_margin_negative = fill_margin < 0.0
-            is_margin_nan = math.isnan(fill_margin)
-            amount_shift = (-fill_margin if is_sell else fill_margin) / fill_price
-            self.chunk_virtual_state.placements[symbol].pop(order_type)
-            return OrderHandlerResult(
-                True,
-                role,
-                fill_price,
-                amount_shift,
-                is_margin_negative,
-                is_margin_nan,
-            )
         return None
 
     def _execute_trade(
         self,
-        symbol: str,
+        slot: int,
         trade_amounts: TradeAmounts,
         moments: TradeMoments,
         open_price: float,
@@ -619,36 +877,34 @@ class ChunkSimulator:
         fill_price = trade_amounts.fill_price
         current_moment = moments.current_moment
         before_moment = moments.before_moment
-        virtual_position = self.chunk_virtual_state.positions[symbol]
-        before_entry_price = virtual_position.entry_price
-        before_amount = virtual_position.amount
+        before_entry_price = self.entry_prices.item(slot)
+        before_amount = self.position_amounts.item(slot)
 
-        virtual_position.amount += amount_shift
-        current_amount = virtual_position.amount
+        current_amount = before_amount + amount_shift
+        self.position_amounts[slot] = current_amount
+        self.dirty_slots[slot] = True
 
         # Update position entry price and balance based on trade type
         if before_amount == 0.0 and current_amount != 0.0:
             # Opening new position
-            virtual_position.entry_price = fill_price
+            self.entry_prices[slot] = fill_price
             invested_margin = abs(current_amount) * fill_price
-            self.chunk_virtual_state.available_balance -= invested_margin
+            self.available_balance -= invested_margin
         elif before_amount != 0.0 and current_amount == 0.0:
             # Closing position
-            virtual_position.entry_price = 0.0
+            self.entry_prices[slot] = 0.0
             price_difference = fill_price - before_entry_price
             realized_profit = price_difference * before_amount
             returned_margin = abs(before_amount) * before_entry_price
-            self.chunk_virtual_state.available_balance += (
-                returned_margin + realized_profit
-            )
+            self.available_balance += returned_margin + realized_profit
         elif before_amount * current_amount < 0.0:
             # Reversing position
-            virtual_position.entry_price = fill_price
+            self.entry_prices[slot] = fill_price
             price_difference = fill_price - before_entry_price
             realized_profit = price_difference * before_amount
             returned_margin = abs(before_amount) * before_entry_price
             invested_margin = abs(current_amount) * fill_price
-            self.chunk_virtual_state.available_balance += (
+            self.available_balance += (
                 returned_margin - invested_margin + realized_profit
             )
         elif abs(current_amount) > abs(before_amount):
@@ -657,60 +913,64 @@ class ChunkSimulator:
             new_numerator = fill_price * amount_shift
             current_numerator = before_numerator + new_numerator
             new_entry_price = current_numerator / current_amount
-            virtual_position.entry_price = new_entry_price
+            self.entry_prices[slot] = new_entry_price
             invested_margin = abs(amount_shift) * fill_price
-            self.chunk_virtual_state.available_balance -= invested_margin
+            self.available_balance -= invested_margin
         else:
             # Reducing position
-            virtual_position.entry_price = before_entry_price
+            self.entry_prices[slot] = before_entry_price
             price_difference = fill_price - before_entry_price
             realized_profit = price_difference * (-amount_shift)
             returned_margin = abs(amount_shift) * before_entry_price
-            self.chunk_virtual_state.available_balance += (
-                returned_margin + realized_profit
-            )
+            self.available_balance += returned_margin + realized_profit
 
-        if self.chunk_virtual_state.available_balance < 0.0:
+        if self.available_balance < 0.0:
+            symbol = self.target_symbols[slot]
             msg = (
                 f"Available balance went below zero while calculating "
-                f"{symbol} market at {current_moment}"
+                f"{symbol} market at {from_epoch_ms(current_moment)}"
             )
             raise SimulationError(msg)
 
         # Record the trade
         if role is not None:
             self._record_trade(
-                symbol,
+                slot,
                 fill_price,
                 role,
                 TradeDetails(before_moment, amount_shift, open_price),
             )
 
+    def _calculate_wallet_balance(self) -> float:
+        """Sum available balance and margins of open positions."""
+        wallet_balance = self.available_balance
+        for slot in np.flatnonzero(self.position_amounts).tolist():
+            symbol_price = self.candle_row[self.close_columns[slot]]
+            if math.isnan(symbol_price):
+                continue
+            amount = self.position_amounts.item(slot)
+            wallet_balance += abs(amount) * self.entry_prices.item(slot)
+        return wallet_balance
+
     def _record_trade(
         self,
-        symbol: str,
+        slot: int,
         fill_price: float,
         role: OrderRole,
         trade_details: TradeDetails,
     ) -> None:
         """Record a trade in the asset record."""
+        symbol = self.target_symbols[slot]
         before_moment = trade_details.before_moment
         amount_shift = trade_details.amount_shift
         open_price = trade_details.open_price
-        fill_time = before_moment + timedelta(milliseconds=self.decision_lag)
-        fill_time_np = np.datetime64(int(fill_time.timestamp() * 1000), "ms")
-        while fill_time_np in self.asset_record_ar["index"]:
-            fill_time_np += np.timedelta64(1, "ms")
-
-        wallet_balance = self.chunk_virtual_state.available_balance
-        for symbol_key, location in self.chunk_virtual_state.positions.items():
-            if location.amount == 0.0:
-                continue
-            symbol_price = float(self.candle_data_ar[self.cycle][f"{symbol_key}/CLOSE"])
-            if math.isnan(symbol_price):
-                continue
-            current_margin = abs(location.amount) * location.entry_price
-            wallet_balance += current_margin
+        # Records are written in time order, so only the last one can collide
+        fill_time_ms = before_moment + self.decision_lag
+        fill_time_ms = max(fill_time_ms, self.last_fill_time + 1)
+        self.last_fill_time = fill_time_ms
+        fill_time_np = np.datetime64(fill_time_ms, "ms")
+
+        wallet_balance = self._calculate_wallet_balance()
 
         margin_ratio = abs(amount_shift) * open_price / wallet_balance
         order_id = ORDER_ID_MIN + secrets.randbelow(ORDER_ID_MAX - ORDER_ID_MIN + 1)
@@ -722,25 +982,38 @@ class ChunkSimulator:
             msg = "The fill price should be bigger than zero"
             raise ValueError(msg)
 
-        original_size = self.asset_record_ar.shape[0]
-        self.asset_record_ar.resize(original_size + 1)
-        self.asset_record_ar[-1]["index"] = fill_time_np
-        self.asset_record_ar[-1]["CAUSE"] = "AUTO_TRADE"
-        self.asset_record_ar[-1]["SYMBOL"] = symbol
-        self.asset_record_ar[-1]["SIDE"] = "BUY" if amount_shift > 0.0 else "SELL"
-        self.asset_record_ar[-1]["FILL_PRICE"] = fill_price
-        self.asset_record_ar[-1]["ROLE"] = role.value
-        self.asset_record_ar[-1]["MARGIN_RATIO"] = margin_ratio
-        self.asset_record_ar[-1]["ORDER_ID"] = order_id
-        self.asset_record_ar[-1]["RESULT_ASSET"] = wallet_balance
-
-        update_time = fill_time_np.item().replace(tzinfo=UTC)
-        self.chunk_account_state.positions[symbol].update_time = update_time
-
-    def _update_account_state_for_symbol(self, symbol: str) -> None:
-        """Update account state for a specific symbol."""
-        current_entry_price = self.chunk_virtual_state.positions[symbol].entry_price
-        current_amount = self.chunk_virtual_state.positions[symbol].amount
+        row_index = self._append_asset_record_row()
+        self.trade_count += 1
+        self.asset_record_ar[row_index]["index"] = fill_time_np
+        self.asset_record_ar[row_index]["CAUSE"] = "AUTO_TRADE"
+        self.asset_record_ar[row_index]["SYMBOL"] = symbol
+        side = "BUY" if amount_shift > 0.0 else "SELL"
+        self.asset_record_ar[row_index]["SIDE"] = side
+        self.asset_record_ar[row_index]["FILL_PRICE"] = fill_price
+        self.asset_record_ar[row_index]["ROLE"] = role.value
+        self.asset_record_ar[row_index]["MARGIN_RATIO"] = margin_ratio
+        self.asset_record_ar[row_index]["ORDER_ID"] = order_id
+        self.asset_record_ar[row_index]["RESULT_ASSET"] = wallet_balance
+
+        self.update_times[slot] = fill_time_ms
+
+    def _append_asset_record_row(self) -> int:
+        """Reserve a row in the asset record, growing it geometrically."""
+        row_index = self.asset_record_size
+        if row_index == len(self.asset_record_ar):
+            new_capacity = max(row_index * 2, ASSET_RECORD_MIN_CAPACITY)
+            self.asset_record_ar.resize(new_capacity)
+        self.asset_record_size += 1
+        return row_index
+
+    def _update_account_state_for_symbol(self, slot: int) -> None:
+        """Refresh account state snapshots of a symbol slot if it has changed."""
+        if not self.dirty_slots[slot]:
+            return
+        self.dirty_slots[slot] = False
+
+        current_entry_price = self.entry_prices.item(slot)
+        current_amount = self.position_amounts.item(slot)
         current_margin = abs(current_amount) * current_entry_price
 
         if current_amount > 0.0:
@@ -750,144 +1023,299 @@ class ChunkSimulator:
         else:
             current_direction = PositionDirection.NONE
 
-        symbol_position = Position(
+        self.account_positions[slot] = Position.model_construct(
             margin=current_margin,
             direction=current_direction,
             entry_price=current_entry_price,
-            update_time=datetime.fromtimestamp(0.0, tz=UTC),
+            update_time=from_epoch_ms(self.update_times.item(slot)),
         )
-        self.chunk_account_state.positions[symbol] = symbol_position
 
-        symbol_placements = self.chunk_virtual_state.placements[symbol]
         symbol_open_orders: dict[int, OpenOrder] = {}
-        for order_type, placement in symbol_placements.items():
-            symbol_open_orders[placement.order_id] = OpenOrder(
-                order_type=order_type,
-                boundary=placement.boundary,
-                left_margin=placement.margin,
+        for column in np.flatnonzero(self.placement_flags[slot]).tolist():
+            order_id = self.placement_order_ids.item(slot, column)
+            symbol_open_orders[order_id] = OpenOrder.model_construct(
+                order_type=OrderType(column),
+                boundary=self.placement_boundaries.item(slot, column),
+                left_margin=self.placement_margins.item(slot, column),
             )
-        self.chunk_account_state.open_orders[symbol] = symbol_open_orders
+        self.account_open_orders[slot] = symbol_open_orders
 
-    def _update_unrealized_state(
-        self,
-        before_moment: datetime,
-        current_moment: datetime,
-    ) -> None:
+    def _update_unrealized_state(self, current_moment: int) -> None:
         """Calculate and record unrealized profit/loss."""
-        wallet_balance = self.chunk_virtual_state.available_balance
+        wallet_balance = self.available_balance
         unrealized_profit = 0.0
 
-        for symbol_key, location in self.chunk_virtual_state.positions.items():
-            if location.amount == 0.0:
-                continue
-            symbol_price = float(self.candle_data_ar[self.cycle][f"{symbol_key}/CLOSE"])
+        for slot in np.flatnonzero(self.position_amounts).tolist():
+            symbol_price = self.candle_row[self.close_columns[slot]]
             if math.isnan(symbol_price):
                 continue
-            current_margin = abs(location.amount) * location.entry_price
+            amount = self.position_amounts.item(slot)
+            entry_price = self.entry_prices.item(slot)
+            current_margin = abs(amount) * entry_price
             wallet_balance += current_margin
 
             # Assume mark price doesn't wobble more than 5%
-            key_open_price = float(
-                self.candle_data_ar[self.cycle][f"{symbol_key}/OPEN"],
-            )
-            key_close_price = float(
-                self.candle_data_ar[self.cycle][f"{symbol_key}/CLOSE"],
-            )
-            if location.amount < 0.0:
+            key_open_price = self.candle_row[self.open_columns[slot]]
+            key_close_price = symbol_price
+            if amount < 0.0:
                 basic_price = max(key_open_price, key_close_price) * 1.05
-                key_high_price = float(
-                    self.candle_data_ar[self.cycle][f"{symbol_key}/HIGH"],
-                )
+                key_high_price = self.candle_row[self.high_columns[slot]]
                 extreme_price = min(basic_price, key_high_price)
             else:
                 basic_price = min(key_open_price, key_close_price) * 0.95
-                key_low_price = float(
-                    self.candle_data_ar[self.cycle][f"{symbol_key}/LOW"],
-                )
+                key_low_price = self.candle_row[self.low_columns[slot]]
                 extreme_price = max(basic_price, key_low_price)
-            price_difference = extreme_price - location.entry_price
-            unrealized_profit += price_difference * location.amount
+            price_difference = extreme_price - entry_price
+            unrealized_profit += price_difference * amount
 
         unrealized_change = unrealized_profit / wallet_balance
 
-        self.chunk_account_state.observed_until = current_moment
-        self.chunk_account_state.wallet_balance = wallet_balance
+        self.observed_until = current_moment
+        self.wallet_balance = wallet_balance
 
-        original_size = self.chunk_unrealized_changes_ar.shape[0]
-        self.chunk_unrealized_changes_ar.resize(original_size + 1)
-        self.chunk_unrealized_changes_ar[-1]["index"] = before_moment
-        self.chunk_unrealized_changes_ar[-1]["0"] = unrealized_change
+        self.unrealized_changes_ar[self.cycle] = unrealized_change
 
-    def _process_decisions(self, current_moment: datetime) -> None:
+    def _process_decisions(self, current_moment: int) -> None:
         """Make trading decisions at cycle end."""
-        record_row: np.record = self.candle_data_ar[self.cycle]
-        current_candle_data = {
-            k: float(record_row[k])
-            for k in record_row.dtype.names or ()
-            if k != "index"
-        }
-        record_row: np.record = self.indicators_ar[self.cycle]
-        current_indicators = {
-            k: float(record_row[k])
-            for k in record_row.dtype.names or ()
-            if k != "index"
-        }
+        # Values are converted only when the strategy reads them
+        current_candle_data = LazyRow(self.candle_columns, self.candle_row)
+        current_indicators = LazyRow(
+            self.indicator_columns,
+            self.indicator_values[self.cycle],
+        )
 
         decisions = make_decisions(
             DecisionContext(
                 strategy=self.strategy,
                 target_symbols=self.target_symbols,
-                current_moment=current_moment,
+                current_moment=from_epoch_ms(current_moment),
                 current_candle_data=current_candle_data,
                 current_indicators=current_indicators,
-                account_state=self.chunk_account_state.model_copy(deep=True),
+                account_state=self._view_account_state(),
                 scribbles=self.chunk_scribbles,
             ),
         )
 
         for symbol_key, symbol_decisions in decisions.items():
+            slot = self.symbol_slots[symbol_key]
             for order_type, decision in symbol_decisions.items():
-                placement = VirtualPlacement(
-                    order_id=ORDER_ID_MIN
-                    + secrets.randbelow(ORDER_ID_MAX - ORDER_ID_MIN + 1),
-                    boundary=decision.boundary,
-                    margin=decision.margin,
-                )
-                self.chunk_virtual_state.placements[symbol_key][order_type] = placement
+                self._place_decision(slot, order_type, decision)
+
+    def _process_exposures(self, exposure_row: np.ndarray) -> None:
+        """Place orders toward target exposures without calling strategy code."""
+        for slot, exposure in enumerate(exposure_row.tolist()):
+            if math.isnan(exposure):
+                continue
+            amount = self.position_amounts.item(slot)
+            if amount > 0.0:
+                direction = PositionDirection.LONG
+            elif amount < 0.0:
+                direction = PositionDirection.SHORT
+            else:
+                direction = PositionDirection.NONE
+            decision_pair = follow_exposure(
+                exposure,
+                direction,
+                abs(amount) * self.entry_prices.item(slot),
+                self.wallet_balance,
+            )
+            if decision_pair is not None:
+                self._place_decision(slot, *decision_pair)
+
+    def _place_decision(
+        self,
+        slot: int,
+        order_type: OrderType,
+        decision: Decision,
+    ) -> None:
+        """Place a decided order into the virtual state arrays."""
+        self.dirty_slots[slot] = True
+        column = order_type.value
+        self.placement_flags[slot, column] = True
+        self.placement_boundaries[slot, column] = decision.boundary
+        self.placement_margins[slot, column] = decision.margin
+        self.placement_order_ids[slot, column] = ORDER_ID_MIN + secrets.randbelow(
+            ORDER_ID_MAX - ORDER_ID_MIN + 1,
+        )
+
+    def _skip_quiet_cycles(
+        self,
+        row_from: int,
+        first_calculation_moment: int,
+    ) -> int:
+        """Fill quiet cycles from a row and return the next row to simulate.
+
+        Cycles are quiet when they are not decision moments
+        and none of the placements can be filled during them.
+        """
+        if self.decision_rows is None:
+            return row_from
+        # Orders that don't need crossing are handled by the very next cycle
+        if self.placement_flags[:, INSTANT_COLUMNS].any():
+            return row_from
+
+        turn = int(np.searchsorted(self.decision_rows, row_from))
+        if turn < len(self.decision_rows):
+            row_limit = int(self.decision_rows[turn])
+        else:
+            row_limit = len(self.calculation_index)
+
+        row_until = self._find_event_row(row_from, row_limit)
+        if row_until == row_from:
+            return row_from
+
+        self._fill_quiet_rows(row_from, row_until)
+        if self.is_aborted:
+            return row_until
+
+        last_moment = self.index_moments[row_until - 1] + MOMENT_MS
+        progress_in_seconds = (last_moment - first_calculation_moment) / 1000
+        self.progress_writer.write(self.target_progress, max(progress_in_seconds, 0.0))
+        return row_until
+
+    def _find_event_row(self, row_from: int, row_limit: int) -> int:
+        """Find the first row where a placement crosses its boundary.
+
+        Rows with missing prices of watched symbols are also treated as events,
+        so that they are handled one by one as usual.
+        Rows are searched in growing blocks to avoid scanning far ahead.
+        """
+        watched_slots = np.flatnonzero(
+            (self.position_amounts != 0.0)
+            | self.placement_flags[:, CROSSING_COLUMNS].any(axis=1),
+        ).tolist()
+
+        block_from = row_from
+        block_size = QUIET_SEARCH_ROWS
+        while block_from < row_limit:
+            block_until = min(block_from + block_size, row_limit)
+            block_values = self.candle_values[block_from:block_until]
+            event_mask = np.zeros(block_until - block_from, dtype=np.bool_)
+            for slot in watched_slots:
+                low_prices = block_values[:, self.low_columns[slot]]
+                high_prices = block_values[:, self.high_columns[slot]]
+                price_columns = [
+                    self.open_columns[slot],
+                    self.high_columns[slot],
+                    self.low_columns[slot],
+                    self.close_columns[slot],
+                ]
+                event_mask |= np.isnan(block_values[:, price_columns]).any(axis=1)
+                for column in CROSSING_COLUMNS:
+                    if not self.placement_flags[slot, column]:
+                        continue
+                    boundary = self.placement_boundaries.item(slot, column)
+                    event_mask |= (low_prices < boundary) & (boundary < high_prices)
+            if event_mask.any():
+                return block_from + int(event_mask.argmax())
+            block_from = block_until
+            block_size *= 2
+
+        return row_limit
+
+    def _fill_quiet_rows(self, row_from: int, row_until: int) -> None:
+        """Record unrealized changes of quiet rows, checking abort rules.
+
+        This follows `_update_unrealized_state`, with positions unchanged
+        and every price present.
+        """
+        block_values = self.candle_values[row_from:row_until]
+        wallet_balance = self.available_balance
+        unrealized_profits = np.zeros(row_until - row_from, dtype=np.float64)
+
+        for slot in np.flatnonzero(self.position_amounts).tolist():
+            amount = self.position_amounts.item(slot)
+            entry_price = self.entry_prices.item(slot)
+            wallet_balance += abs(amount) * entry_price
+
+            open_prices = block_values[:, self.open_columns[slot]]
+            close_prices = block_values[:, self.close_columns[slot]]
+            if amount < 0.0:
+                basic_prices = np.maximum(open_prices, close_prices) * 1.05
+                high_prices = block_values[:, self.high_columns[slot]]
+                extreme_prices = np.minimum(basic_prices, high_prices)
+            else:
+                basic_prices = np.minimum(open_prices, close_prices) * 0.95
+                low_prices = block_values[:, self.low_columns[slot]]
+                extreme_prices = np.maximum(basic_prices, low_prices)
+            unrealized_profits += (extreme_prices - entry_price) * amount
+
+        quiet_changes = self.unrealized_changes_ar[row_from:row_until]
+        quiet_changes[:] = unrealized_profits / wallet_balance
+
+        last_row = row_until - 1
+        max_drawdown = self.abort_rules.max_drawdown
+        if max_drawdown is not None:
+            # Wallet balance stays the same, so only drawdown can be broken
+            equities = wallet_balance * (1.0 + quiet_changes.astype(np.float64))
+            peaks = np.maximum.accumulate(np.maximum(equities, self.peak_equity))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                is_broken = (peaks > 0.0) & (1.0 - equities / peaks > max_drawdown)
+            if is_broken.any():
+                last_row = row_from + int(is_broken.argmax())
+                self.is_aborted = True
+                self.unrealized_changes_ar[last_row + 1 :] = np.nan
+            self.peak_equity = float(peaks[last_row - row_from])
+
+        self.cycle = last_row
+        self.observed_until = self.index_moments[last_row] + MOMENT_MS
+        self.wallet_balance = wallet_balance
 
     def _update_progress(
         self,
-        current_moment: datetime,
-        first_calculation_moment: datetime,
+        current_moment: int,
+        first_calculation_moment: int,
     ) -> None:
         """Update progress reporting."""
-        progress_in_time = current_moment - first_calculation_moment
-        progress_in_seconds = progress_in_time.total_seconds()
-        if progress_in_seconds % 3600 == 0.0:
-            self.progress_list[self.target_progress] = max(progress_in_seconds, 0.0)
+        progress_in_ms = current_moment - first_calculation_moment
+        if progress_in_ms % 3_600_000 == 0:
+            progress_value = max(progress_in_ms / 1000, 0.0)
+            self.progress_writer.write(self.target_progress, progress_value)
+
+    def _should_abort(self) -> bool:
+        """Check abort rules against the state after the current cycle."""
+        abort_rules = self.abort_rules
+        wallet_balance = self.wallet_balance
+
+        min_wallet_balance = abort_rules.min_wallet_balance
+        if min_wallet_balance is not None and wallet_balance < min_wallet_balance:
+            return True
+
+        max_trade_count = abort_rules.max_trade_count
+        if max_trade_count is not None and self.trade_count > max_trade_count:
+            return True
+
+        max_drawdown = abort_rules.max_drawdown
+        if max_drawdown is not None:
+            unrealized_change = self.unrealized_changes_ar.item(self.cycle)
+            equity = wallet_balance * (1.0 + unrealized_change)
+            self.peak_equity = max(self.peak_equity, equity)
+            peak_equity = self.peak_equity
+            if peak_equity > 0.0 and 1.0 - equity / peak_equity > max_drawdown:
+                return True
+
+        return False
 
     def _create_output(self) -> CalculationOutput:
         """Convert arrays back to DataFrames and create output."""
-        chunk_asset_record = pd.DataFrame(self.asset_record_ar)
+        written_records = self.asset_record_ar[: self.asset_record_size]
+        chunk_asset_record = pd.DataFrame(written_records)
         chunk_asset_record = chunk_asset_record.set_index("index")
         chunk_asset_record.index.name = None
         chunk_asset_record.index = pd.to_datetime(chunk_asset_record.index, utc=True)
 
-        chunk_unrealized_changes_df = pd.DataFrame(self.chunk_unrealized_changes_ar)
-        chunk_unrealized_changes_df = chunk_unrealized_changes_df.set_index("index")
-        chunk_unrealized_changes_df.index.name = None
-        chunk_unrealized_changes_df.index = pd.to_datetime(
-            chunk_unrealized_changes_df.index,
-            utc=True,
+        write_shared_rows(
+            self.unrealized_changes,
+            self.row_from,
+            self.unrealized_changes_ar,
         )
-        chunk_unrealized_changes = chunk_unrealized_changes_df["0"]
 
         return CalculationOutput(
             chunk_asset_record=chunk_asset_record,
-            chunk_unrealized_changes=chunk_unrealized_changes,
             chunk_scribbles=self.chunk_scribbles,
-            chunk_account_state=self.chunk_account_state,
-            chunk_virtual_state=self.chunk_virtual_state,
+            chunk_account_state=self._dump_account_state(),
+            chunk_virtual_state=self._dump_virtual_state(),
+            is_aborted=self.is_aborted,
         )
 
 
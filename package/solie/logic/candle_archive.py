@@ -0,0 +1,213 @@
+"""Columnar archive of candle data on the regular time grid."""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from solie.utility import GridFrame, from_epoch_ms, to_epoch_ms
+
+ARCHIVE_MANIFEST = "manifest.json"
+
+
+class ArchiveManifest(BaseModel):
+    """Description of the grid and columns stored in an archive."""
+
+    start: int
+    """Epoch milliseconds of the first row"""
+    step: int
+    """Milliseconds between rows"""
+    row_count: int
+    columns: list[str]
+
+
+def get_archive_folder(workerpath: Path, year: int) -> Path:
+    """Get the archive folder of candle data of a year."""
+    return workerpath / f"candle_data_{year}"
+
+
+def get_journal_path(workerpath: Path, year: int) -> Path:
+    """Get the journal file of candle rows of a year not yet in the archive."""
+    return workerpath / f"candle_journal_{year}.jsonl"
+
+
+def get_column_filename(column: str) -> str:
+    """Get the file name of a column like `BTCUSDT/CLOSE`."""
+    return f"{column.replace('/', '.')}.f32"
+
+
+def _locate_row(manifest: ArchiveManifest, moment: int) -> int:
+    """Get the offset of the first row at or after a moment."""
+    offset = -((manifest.start - moment) // manifest.step)
+    return min(max(offset, 0), manifest.row_count)
+
+
+def write_candle_archive(folder: Path, candle_data: pd.DataFrame) -> None:
+    """Replace the archive with candle data, one raw `float32` file per column.
+
+    Files are written in a new folder that is swapped in at the end,
+    keeping the previous archive as a backup.
+    """
+    grid_frame = GridFrame.from_frame(candle_data)
+    folder_new = folder.with_name(f"{folder.name}.new")
+    folder_backup = folder.with_name(f"{folder.name}.backup")
+
+    shutil.rmtree(folder_new, ignore_errors=True)
+    folder_new.mkdir(parents=True)
+    for column in grid_frame.columns:
+        column_values = np.ascontiguousarray(grid_frame.column(column))
+        column_values.tofile(folder_new / get_column_filename(column))
+    manifest = ArchiveManifest(
+        start=grid_frame.start,
+        step=grid_frame.step,
+        row_count=len(grid_frame),
+        columns=grid_frame.columns,
+    )
+    manifest_path = folder_new / ARCHIVE_MANIFEST
+    manifest_path.write_text(manifest.model_dump_json(indent=2), encoding="utf8")
+
+    shutil.rmtree(folder_backup, ignore_errors=True)
+    if folder.is_dir():
+        folder.rename(folder_backup)
+    folder_new.rename(folder)
+
+
+def read_archive_manifest(folder: Path) -> ArchiveManifest:
+    """Read the description of an archive."""
+    manifest_path = folder / ARCHIVE_MANIFEST
+    return ArchiveManifest.model_validate_json(
+        manifest_path.read_text(encoding="utf8"),
+    )
+
+
+def update_candle_archive(folder: Path, candle_data: pd.DataFrame) -> bool:
+    """Write recent rows into the archive in place.
+
+    Rows may overwrite the end of the archive or extend it,
+    so only the bytes of given rows are written.
+    Returns `False` without writing anything if rows are not
+    on the grid or columns of the archive.
+    The manifest is replaced last, which means that the archive
+    stays readable with its previous length if this is interrupted.
+    """
+    manifest = read_archive_manifest(folder)
+    grid_frame = GridFrame.from_frame(candle_data, manifest.step)
+    if len(grid_frame) == 0:
+        return True
+    if (
+        grid_frame.columns != manifest.columns
+        or grid_frame.start < manifest.start
+        or (grid_frame.start - manifest.start) % manifest.step != 0
+    ):
+        return False
+
+    archive_until = manifest.start + manifest.row_count * manifest.step
+    if grid_frame.start > archive_until:
+        # Rows missing between the archive and new rows are filled with `NaN`
+        gap_count = (grid_frame.start - archive_until) // manifest.step
+        gap_shape = (gap_count, len(grid_frame.columns))
+        gap_values = np.full(gap_shape, np.nan, dtype=np.float32)
+        grid_frame = GridFrame(
+            archive_until,
+            manifest.step,
+            np.concatenate([gap_values, grid_frame.to_numpy()]),
+            grid_frame.columns,
+        )
+
+    row_from = (grid_frame.start - manifest.start) // manifest.step
+    byte_offset = row_from * np.dtype(np.float32).itemsize
+    for column in grid_frame.columns:
+        column_values = np.ascontiguousarray(grid_frame.column(column))
+        with (folder / get_column_filename(column)).open("r+b") as file:
+            file.seek(byte_offset)
+            file.write(column_values.tobytes())
+
+    manifest.row_count = max(manifest.row_count, row_from + len(grid_frame))
+    manifest_path = folder / ARCHIVE_MANIFEST
+    manifest_path_new = manifest_path.with_name(f"{ARCHIVE_MANIFEST}.new")
+    manifest_path_new.write_text(manifest.model_dump_json(indent=2), encoding="utf8")
+    manifest_path_new.replace(manifest_path)
+    return True
+
+
+def append_candle_journal(
+    journal_path: Path,
+    moment: int,
+    values: dict[str, float],
+) -> None:
+    """Append a candle row at a moment in epoch milliseconds to a journal.
+
+    The line is flushed to the disk before returning,
+    so that a crash loses at most the row being written.
+    """
+    line = json.dumps({"moment": moment, "values": values})
+    with journal_path.open("a", encoding="utf8") as file:
+        file.write(f"{line}\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def read_candle_journal(journal_path: Path) -> pd.DataFrame:
+    """Read candle rows of a journal, ignoring a line left incomplete by a crash."""
+    moments: list[int] = []
+    rows: list[dict[str, float]] = []
+    with journal_path.open(encoding="utf8") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            moments.append(entry["moment"])
+            rows.append(entry["values"])
+
+    index = pd.DatetimeIndex([from_epoch_ms(m) for m in moments])
+    return pd.DataFrame(rows, index=index, dtype=np.float32)
+
+
+def read_candle_archive(
+    folder: Path,
+    columns: list[str] | None = None,
+    slice_from: datetime | None = None,
+    slice_until: datetime | None = None,
+) -> pd.DataFrame:
+    """Read chosen columns and rows of an archive, both inclusive.
+
+    Column files are memory-mapped, so only the pages of chosen rows
+    are read from disk, and they are shared with other processes
+    through the cache of the operating system.
+    Columns that are not in the archive are filled with `NaN`.
+    """
+    manifest = read_archive_manifest(folder)
+    if columns is None:
+        columns = manifest.columns
+
+    row_from = 0
+    if slice_from is not None:
+        row_from = _locate_row(manifest, to_epoch_ms(slice_from))
+    row_until = manifest.row_count
+    if slice_until is not None:
+        row_until = _locate_row(manifest, to_epoch_ms(slice_until) + 1)
+    row_until = max(row_until, row_from)
+
+    values = np.empty((row_until - row_from, len(columns)), dtype=np.float32)
+    if len(values) > 0:
+        for slot, column in enumerate(columns):
+            if column not in manifest.columns:
+                values[:, slot] = np.nan
+                continue
+            mapped = np.memmap(
+                folder / get_column_filename(column),
+                dtype=np.float32,
+                mode="r",
+                shape=(manifest.row_count,),
+            )
+            values[:, slot] = mapped[row_from:row_until]
+            del mapped
+
+    sliced_start = manifest.start + row_from * manifest.step
+    return GridFrame(sliced_start, manifest.step, values, columns).to_frame()
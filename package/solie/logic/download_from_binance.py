@@ -1,7 +1,7 @@
 """Historical market data download from Binance."""
 
 from asyncio import sleep
-from datetime import UTC, datetime, timedelta
+from collections.abc import Reversible
 from enum import Enum
 from logging import getLogger
 from pathlib import Path
@@ -15,7 +15,12 @@ import numpy as np
 import pandas as pd
 
 from solie.common import spawn_blocking
-from solie.utility import AggregateTrade, to_moment
+from solie.utility import (
+    MOMENT_MS,
+    AggregateTrade,
+    from_epoch_ms,
+    to_moment_ms,
+)
 
 logger = getLogger(__name__)
 
@@ -342,32 +347,62 @@ def process_aggtrade_csv(
     return df
 
 
+def collect_moment_aggtrades(
+    aggregate_trades: Reversible[AggregateTrade],
+    target_symbols: list[str],
+    moment_from: int,
+) -> dict[str, list[AggregateTrade]] | None:
+    """Group trades of a 10-second moment by symbol.
+
+    The moment starts from the given epoch milliseconds.
+    Trades are scanned from the newest, which should come last,
+    until those that are well before the moment.
+    `None` is returned when no trade was received recently.
+    """
+    recent_aggtrades: list[AggregateTrade] = []
+    for aggtrade in reversed(aggregate_trades):
+        if aggtrade.timestamp < moment_from - 1000:
+            # Go additional 1000 milliseconds backward.
+            break
+        recent_aggtrades.append(aggtrade)
+    if len(recent_aggtrades) == 0:
+        return None
+
+    moment_until = moment_from + MOMENT_MS
+    symbol_aggtrades: dict[str, list[AggregateTrade]] = {s: [] for s in target_symbols}
+    for aggtrade in reversed(recent_aggtrades):
+        if not moment_from < aggtrade.timestamp < moment_until:
+            continue
+        if aggtrade.symbol in symbol_aggtrades:
+            symbol_aggtrades[aggtrade.symbol].append(aggtrade)
+    return symbol_aggtrades
+
+
 def fill_holes_with_aggtrades(
     symbol: str,
     recent_candle_data: pd.DataFrame,
     aggtrades: dict[int, AggregateTrade],
-    moment_to_fill_from: datetime,
-    last_fetched_time: datetime,
+    moment_to_fill_from: int,
+    last_fetched_time: int,
 ) -> pd.DataFrame:
-    """Fill missing candle data using aggregate trade information."""
-    fill_moment = moment_to_fill_from
-
-    last_fetched_moment = to_moment(last_fetched_time)
-    while fill_moment < last_fetched_moment:
-        block_start = fill_moment
-        block_end = fill_moment + timedelta(seconds=10)
-
-        aggtrade_prices: list[float] = []
-        aggtrade_volumes: list[float] = []
-        for _, aggtrade in sorted(aggtrades.items()):
-            # sorted by time
-            aggtrade_time = datetime.fromtimestamp(
-                aggtrade.timestamp / 1000,
-                tz=UTC,
-            )
-            if block_start <= aggtrade_time < block_end:
-                aggtrade_prices.append(aggtrade.price)
-                aggtrade_volumes.append(aggtrade.volume)
+    """Fill missing candle data using aggregate trade information.
+
+    Times are given in epoch milliseconds.
+    """
+    # Group trades by their moments in a single pass
+    moment_aggtrades: dict[int, list[AggregateTrade]] = {}
+    for _, aggtrade in sorted(aggtrades.items()):
+        # sorted by time
+        aggtrade_moment = to_moment_ms(aggtrade.timestamp)
+        moment_aggtrades.setdefault(aggtrade_moment, []).append(aggtrade)
+
+    fill_moment_ms = moment_to_fill_from
+    last_fetched_moment = to_moment_ms(last_fetched_time)
+    while fill_moment_ms < last_fetched_moment:
+        fill_moment = from_epoch_ms(fill_moment_ms)
+        block_aggtrades = moment_aggtrades.get(fill_moment_ms, [])
+        aggtrade_prices = [t.price for t in block_aggtrades]
+        aggtrade_volumes = [t.volume for t in block_aggtrades]
 
         can_write = True
 
@@ -407,7 +442,7 @@ def fill_holes_with_aggtrades(
             column = f"{symbol}/VOLUME"
             recent_candle_data.loc[fill_moment, column] = np.float32(sum_volume)
 
-        fill_moment += timedelta(seconds=10)
+        fill_moment_ms += MOMENT_MS
 
     recent_candle_data = recent_candle_data.sort_index(axis="index")
     return recent_candle_data.sort_index(axis="columns")
@@ -0,0 +1,192 @@
+"""Cache of indicators made by strategies."""
+
+import hashlib
+import os
+import pickle
+from asyncio import to_thread
+from collections import OrderedDict
+from pathlib import Path
+
+import aiofiles.os
+import numpy as np
+import pandas as pd
+
+from solie.common import spawn_background, spawn_blocking
+from solie.utility import SavedStrategy, Strategy
+
+from .analyze_market import make_indicators
+
+# Errors of reading a file that was left broken or written by another version
+BROKEN_ENTRY_ERRORS = (
+    pickle.UnpicklingError,
+    EOFError,
+    AttributeError,
+    ImportError,
+    TypeError,
+    ValueError,
+)
+
+
+def describe_parameters(strategy: Strategy) -> str:
+    """Describe parameters that make variants of the same strategy differ.
+
+    Only the declared `parameters` are described, with sorted names,
+    so that the description is the same across runs.
+    """
+    parameters: dict[str, float] = getattr(strategy, "parameters", {})
+    return repr(sorted(parameters.items()))
+
+
+def fingerprint_strategy(strategy: Strategy) -> str:
+    """Identify what the strategy's indicators depend on."""
+    if isinstance(strategy, SavedStrategy):
+        script = strategy.indicator_script + describe_parameters(strategy)
+        return f"SCRIPT_{hashlib.sha256(script.encode()).hexdigest()}"
+    ingredients = (
+        strategy.code_name,
+        strategy.version,
+        describe_parameters(strategy),
+    )
+    digest = hashlib.sha256("\0".join(ingredients).encode()).hexdigest()
+    return f"{type(strategy).__qualname__}_{digest}"
+
+
+def fingerprint_candle_data(candle_data: pd.DataFrame) -> str:
+    """Hash the time index, the columns and every value of candle data."""
+    hasher = hashlib.blake2b()
+    index = pd.DatetimeIndex(candle_data.index)
+    hasher.update(index.to_numpy("datetime64[ns]").astype(np.int64).tobytes())
+    hasher.update("|".join(str(c) for c in candle_data.columns).encode())
+    # Column by column, to avoid copying the whole data at once
+    for column in candle_data.columns:
+        values = np.ascontiguousarray(candle_data[column].to_numpy())
+        hasher.update(values.dtype.str.encode())
+        hasher.update(values.tobytes())
+    return hasher.hexdigest()
+
+
+def _write_indicator_file(filepath: Path, indicators: pd.DataFrame) -> None:
+    """Write indicators next to the destination first and then swap them in.
+
+    An interrupted write never leaves a truncated file at the destination.
+    """
+    filepath_new = filepath.with_name(f"{filepath.name}.new")
+    indicators.to_pickle(filepath_new)
+    filepath_new.replace(filepath)
+
+
+def _evict_indicator_files(folder: Path, disk_limit: int) -> None:
+    """Remove least recently used indicator files beyond the size limit."""
+    file_stats = [(p, p.stat()) for p in folder.glob("*.pickle")]
+    file_stats.sort(key=lambda t: t[1].st_mtime)
+    total_size = sum(s.st_size for _, s in file_stats)
+    for old_filepath, file_stat in file_stats:
+        if total_size <= disk_limit:
+            break
+        old_filepath.unlink(missing_ok=True)
+        total_size -= file_stat.st_size
+
+
+class IndicatorCache:
+    """Keeps indicators to avoid making them again from identical inputs.
+
+    Indicators are keyed by the strategy's indicator code, target symbols,
+    and a fingerprint of the candle data.
+    Recently used ones are kept in memory and, if a folder is given, on disk.
+    Both are limited by size, evicting least recently used ones first.
+    Returned indicators are shared, so they should not be modified in place.
+    """
+
+    def __init__(
+        self,
+        folder: Path | None,
+        memory_limit: int = 512 * 1024 * 1024,
+        disk_limit: int = 4 * 1024 * 1024 * 1024,
+    ) -> None:
+        """Initialize with an optional folder for storing on disk."""
+        self._folder = folder
+        self._memory_limit = memory_limit
+        self._disk_limit = disk_limit
+        self._memory_entries = OrderedDict[str, pd.DataFrame]()
+        self._memory_size = 0
+
+    async def make_indicators(
+        self,
+        strategy: Strategy,
+        target_symbols: list[str],
+        candle_data: pd.DataFrame,
+        *,
+        in_background: bool = False,
+    ) -> pd.DataFrame:
+        """Get indicators from the cache, or make them if they're missing.
+
+        Missing indicators are made in the low-priority background process
+        if `in_background` is set.
+        """
+        # Hashing releases the GIL, so a thread keeps the event loop responsive
+        candle_fingerprint = await to_thread(fingerprint_candle_data, candle_data)
+        key = hashlib.sha256(
+            "/".join(
+                (
+                    fingerprint_strategy(strategy),
+                    ",".join(target_symbols),
+                    candle_fingerprint,
+                ),
+            ).encode(),
+        ).hexdigest()
+
+        indicators = self._memory_entries.get(key)
+        if indicators is not None:
+            self._memory_entries.move_to_end(key)
+            return indicators
+
+        indicators = await self._read_from_disk(key)
+        if indicators is None:
+            spawn_maker = spawn_background if in_background else spawn_blocking
+            indicators = await spawn_maker(
+                make_indicators,
+                strategy=strategy,
+                target_symbols=target_symbols,
+                candle_data=candle_data,
+            )
+            await self._write_to_disk(key, indicators)
+
+        self._remember(key, indicators)
+        return indicators
+
+    def _remember(self, key: str, indicators: pd.DataFrame) -> None:
+        """Keep indicators in memory, evicting old ones beyond the limit."""
+        self._memory_entries[key] = indicators
+        self._memory_size += int(indicators.memory_usage(deep=False).sum())
+        while self._memory_size > self._memory_limit and self._memory_entries:
+            _, evicted = self._memory_entries.popitem(last=False)
+            self._memory_size -= int(evicted.memory_usage(deep=False).sum())
+
+    async def _read_from_disk(self, key: str) -> pd.DataFrame | None:
+        """Read indicators from disk if they were stored before."""
+        if self._folder is None:
+            return None
+        filepath = self._folder / f"{key}.pickle"
+        try:
+            indicators: pd.DataFrame = await spawn_blocking(pd.read_pickle, filepath)
+        except FileNotFoundError:
+            return None
+        except BROKEN_ENTRY_ERRORS:
+            # Broken entries are made again as if they were missing
+            await to_thread(filepath.unlink, missing_ok=True)
+            return None
+        if not isinstance(indicators, pd.DataFrame):
+            await to_thread(filepath.unlink, missing_ok=True)
+            return None
+        # Mark as recently used
+        await to_thread(os.utime, filepath)
+        return indicators
+
+    async def _write_to_disk(self, key: str, indicators: pd.DataFrame) -> None:
+        """Store indicators on disk, evicting old files beyond the limit."""
+        if self._folder is None:
+            return
+        await aiofiles.os.makedirs(self._folder, exist_ok=True)
+        filepath = self._folder / f"{key}.pickle"
+        await to_thread(_write_indicator_file, filepath, indicators)
+        await to_thread(_evict_indicator_files, self._folder, self._disk_limit)
@@ -0,0 +1,172 @@
+"""Simulation calculation of several years as one job."""
+
+from asyncio import Task, gather
+from collections.abc import AsyncIterator, Awaitable, Callable
+from logging import getLogger
+from time import perf_counter
+from typing import NamedTuple
+
+import pandas as pd
+
+from solie.common import (
+    PROCESS_COUNT,
+    consume_chunks,
+    spawn,
+    spawn_blocking,
+)
+from solie.utility import DurationRecorder
+
+from .analyze_market import CalculationInput, CalculationOutput, simulate_chunk
+from .simulation_calculator import (
+    CalculationConfig,
+    CalculationContext,
+    CalculationResult,
+    SimulationCalculator,
+    get_year_slice,
+)
+
+logger = getLogger(__name__)
+
+
+class YearChunk(NamedTuple):
+    """Chunk of a year waiting to be simulated."""
+
+    year_index: int
+    turn: int
+    calculation_input: CalculationInput
+
+
+class MultiYearCalculator:
+    """Calculates simulations of several years on a single chunk queue.
+
+    Years are prepared one by one, while chunks of prepared years
+    are already being simulated in the process pool.
+    The next year is only prepared when few chunks are left waiting,
+    and each year is merged and stored separately as soon as its chunks
+    are done, so that data of only a few years is in memory at once.
+    """
+
+    def __init__(
+        self,
+        *,
+        context: CalculationContext,
+        configs: list[CalculationConfig],
+        read_candle_data: Callable[[int], Awaitable[pd.DataFrame]],
+    ) -> None:
+        """Initialize with calculation configurations of each year."""
+        self.context = context
+        self.configs = configs
+        self.read_candle_data = read_candle_data
+
+        self.calculators: list[SimulationCalculator] = []
+        self.finished_years: set[int] = set()
+
+        # Progress of years that are being calculated, by year index
+        self.output_slots: list[list[CalculationOutput | None]] = []
+        self.remaining_counts: list[int] = []
+        self.finishing_tasks: list[Task[None]] = []
+        self.results: dict[int, CalculationResult] = {}
+
+    def get_progress(self) -> float:
+        """Get the ratio of simulated time across all years, from 0 to 1.
+
+        Years are weighted by their length, including those not prepared yet.
+        """
+        weights: dict[int, float] = {}
+        for config in self.configs:
+            slice_from, slice_until = get_year_slice(config.year)
+            year_seconds = (slice_until - slice_from).total_seconds()
+            weights[config.year] = max(year_seconds, 1.0)
+
+        weighted_progress = 0.0
+        for calculator in self.calculators:
+            if calculator.year in self.finished_years:
+                ratio = 1.0
+            else:
+                simulated_seconds, total_seconds = calculator.measure_progress()
+                ratio = min(simulated_seconds / max(total_seconds, 1.0), 1.0)
+            weighted_progress += weights[calculator.year] * ratio
+
+        return weighted_progress / max(sum(weights.values()), 1.0)
+
+    async def calculate(self) -> dict[int, CalculationResult]:
+        """Calculate all years, returning results by year."""
+        try:
+            return await self._calculate_real()
+        finally:
+            for calculator in self.calculators:
+                calculator.release_shared_memories()
+
+    async def _calculate_real(self) -> dict[int, CalculationResult]:
+        started_at = perf_counter()
+        try:
+            await consume_chunks(
+                self._prepare_years(),
+                self._simulate_year_chunk,
+                PROCESS_COUNT,
+            )
+            await gather(*self.finishing_tasks)
+        finally:
+            for finishing_task in self.finishing_tasks:
+                finishing_task.cancel()
+        logger.info(
+            "Calculated %d years in %.1fs",
+            len(self.configs),
+            perf_counter() - started_at,
+        )
+
+        return self.results
+
+    async def _prepare_years(self) -> AsyncIterator[YearChunk]:
+        """Prepare years one by one, giving their chunks to be simulated."""
+        for config in self.configs:
+            year_candle_data = await self.read_candle_data(config.year)
+            calculator = SimulationCalculator(
+                context=self.context,
+                config=config,
+                year_candle_data=year_candle_data,
+            )
+            year_index = len(self.calculators)
+            self.calculators.append(calculator)
+            calculation_inputs = await calculator.prepare()
+            self.output_slots.append([None] * len(calculation_inputs))
+            self.remaining_counts.append(len(calculation_inputs))
+            if not calculation_inputs:
+                await self._finish_year(year_index)
+                continue
+            # Longer chunks go first so that short ones fill the tail
+            for turn, input_data in sorted(
+                enumerate(calculation_inputs),
+                key=lambda t: t[1].row_until - t[1].row_from,
+                reverse=True,
+            ):
+                yield YearChunk(year_index, turn, input_data)
+
+    async def _simulate_year_chunk(self, _: int, year_chunk: YearChunk) -> None:
+        """Simulate a chunk, finishing its year if it was the last one."""
+        year_index = year_chunk.year_index
+        duration_recorder = DurationRecorder("SIMULATE_CHUNK")
+        output_data = await spawn_blocking(
+            simulate_chunk,
+            year_chunk.calculation_input,
+        )
+        duration_recorder.record()
+        self.output_slots[year_index][year_chunk.turn] = output_data
+        self.remaining_counts[year_index] -= 1
+        if self.remaining_counts[year_index] == 0:
+            # Merging shouldn't keep this consumer from the next chunk
+            self.finishing_tasks.append(spawn(self._finish_year(year_index)))
+
+    async def _finish_year(self, year_index: int) -> None:
+        """Merge and store results of a year whose chunks are all simulated."""
+        calculator = self.calculators[year_index]
+        calculation_output_data: list[CalculationOutput] = []
+        for output_data in self.output_slots[year_index]:
+            if output_data is None:
+                msg = "A simulation chunk was not calculated"
+                raise ValueError(msg)
+            calculation_output_data.append(output_data)
+        self.results[calculator.year] = await calculator.finish(
+            calculation_output_data,
+        )
+        self.finished_years.add(calculator.year)
@@ -2,7 +2,7 @@
 
 from asyncio import gather
 from collections import deque
-from datetime import UTC, datetime, timedelta
+from datetime import timedelta
 from logging import getLogger
 from typing import Any, ClassVar, NamedTuple
 
@@ -18,9 +18,11 @@ from solie.utility import (
     PositionDirection,
     RWLock,
     ball_ceil,
+    from_epoch_ms,
+    now_epoch_ms,
     slice_deque,
     sort_data_frame,
-    to_moment,
+    to_moment_ms,
 )
 from solie.window import Window
 
@@ -138,7 +140,7 @@ class OrderPlacer:
 
     async def _get_current_prices(self, target_symbols: list[str]) -> dict[str, float]:
         """Get current prices from recent aggregate trades."""
-        current_timestamp = to_moment(datetime.now(UTC)).timestamp() * 1000
+        current_timestamp = to_moment_ms(now_epoch_ms())
         current_prices: dict[str, float] = {}
         recent_trades = slice_deque(self._aggregate_trades_queue, 2 ** (10 + 6))
 
@@ -171,8 +173,7 @@ class OrderPlacer:
         )
         order_symbol = response["symbol"]
         order_id = response["orderId"]
-        timestamp = response["updateTime"] / 1000
-        update_time = datetime.fromtimestamp(timestamp, tz=UTC)
+        update_time = from_epoch_ms(response["updateTime"])
 
         async with self._auto_order_record.write_lock as cell:
             while update_time in cell.data.index:
@@ -196,7 +197,7 @@ class OrderPlacer:
             if OrderType.CANCEL_ALL in decisions[symbol]:
                 cancel_orders.append(
                     {
-                        "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                        "timestamp": now_epoch_ms(),
                         "symbol": symbol,
                     },
                 )
@@ -231,9 +232,7 @@ class OrderPlacer:
                     )
                     now_orders.append(
                         {
-                            "timestamp": int(
-                                datetime.now(UTC).timestamp() * 1000,
-                            ),
+                            "timestamp": now_epoch_ms(),
                             "symbol": symbol,
                             "type": "MARKET",
                             "side": order_side,
@@ -252,7 +251,7 @@ class OrderPlacer:
                 quantity = min(maximum_quantity, notional / current_price)
                 now_orders.append(
                     {
-                        "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                        "timestamp": now_epoch_ms(),
                         "symbol": symbol,
                         "type": "MARKET",
                         "side": "BUY",
@@ -268,7 +267,7 @@ class OrderPlacer:
                 quantity = min(maximum_quantity, notional / current_price)
                 now_orders.append(
                     {
-                        "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                        "timestamp": now_epoch_ms(),
                         "symbol": symbol,
                         "type": "MARKET",
                         "side": "SELL",
@@ -306,7 +305,7 @@ class OrderPlacer:
                 quantity = min(maximum_quantity, notional / boundary)
                 book_orders.append(
                     {
-                        "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                        "timestamp": now_epoch_ms(),
                         "symbol": symbol,
                         "type": "LIMIT",
                         "side": "BUY",
@@ -324,7 +323,7 @@ class OrderPlacer:
                 quantity = min(maximum_quantity, notional / boundary)
                 book_orders.append(
                     {
-                        "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                        "timestamp": now_epoch_ms(),
                         "symbol": symbol,
                         "type": "LIMIT",
                         "side": "SELL",
@@ -344,7 +343,7 @@ class OrderPlacer:
         """Add a close position order to the orders list."""
         orders.append(
             {
-                "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                "timestamp": now_epoch_ms(),
                 "symbol": params.symbol,
                 "type": params.order_type_str,
                 "side": params.side,
@@ -361,7 +360,7 @@ class OrderPlacer:
         """Add an entry order to the orders list."""
         orders.append(
             {
-                "timestamp": int(datetime.now(UTC).timestamp() * 1000),
+                "timestamp": now_epoch_ms(),
                 "symbol": params.symbol,
                 "type": params.order_type_str,
                 "side": params.side,
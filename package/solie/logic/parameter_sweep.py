@@ -0,0 +1,381 @@
+"""Parameter sweep over variants of a strategy."""
+
+import copy
+from datetime import timedelta
+from itertools import product
+from logging import getLogger
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from solie.common import (
+    FLOAT_DTYPE,
+    PROCESS_COUNT,
+    SharedArray,
+    consume_chunks,
+    raise_shared_flag,
+    read_shared_rows,
+    release_shared_memory,
+    share_array,
+    spawn_blocking,
+    sum_shared_array,
+)
+from solie.utility import (
+    DurationRecorder,
+    GridFrame,
+    SavedStrategy,
+    SimulationSettings,
+    Strategy,
+    SweepOptions,
+    SweepRanking,
+)
+
+from .analyze_market import (
+    CalculationInput,
+    CalculationOutput,
+    SharedFrame,
+    simulate_chunk,
+)
+from .indicator_cache import IndicatorCache, fingerprint_strategy
+from .simulation_calculator import (
+    INDICATOR_WARMUP,
+    calculate_asset_changes,
+    create_blank_states,
+    divide_rows,
+    get_year_slice,
+    share_frame,
+)
+
+logger = getLogger(__name__)
+
+
+class SweepChunk(NamedTuple):
+    """Chunk of a strategy variant waiting to be simulated."""
+
+    variant: int
+    turn: int
+    calculation_input: CalculationInput
+
+
+def expand_parameter_grid(grid: dict[str, list[float]]) -> list[dict[str, float]]:
+    """List every combination of parameter values in a grid."""
+    names = list(grid)
+    return [
+        dict(zip(names, values, strict=True))
+        for values in product(*(grid[n] for n in names))
+    ]
+
+
+def make_strategy_variant(
+    strategy: Strategy,
+    parameters: dict[str, float],
+) -> Strategy:
+    """Make a copy of a strategy with different parameters.
+
+    Saved strategies receive them in `parameters`,
+    while other strategies should already have them as attributes.
+    They are also recorded in `parameters` of other strategies,
+    which is what tells variants apart in caches and stored results.
+    """
+    merged = {**getattr(strategy, "parameters", {}), **parameters}
+    if isinstance(strategy, SavedStrategy):
+        return strategy.model_copy(update={"parameters": merged})
+    variant = copy.copy(strategy)
+    for name, value in parameters.items():
+        if not hasattr(variant, name):
+            msg = f"Strategy {strategy.code_name} has no parameter {name}"
+            raise ValueError(msg)
+        setattr(variant, name, value)
+    variant.parameters = merged  # type:ignore
+    return variant
+
+
+class ParameterSweep:
+    """Simulates variants of a strategy over candle data of a year.
+
+    Candle data is interpolated and placed in shared memory only once,
+    and chunks of all variants are scheduled together across the process pool.
+    Variants always start from blank states at the beginning of the year.
+    Once a chunk of a variant is aborted, its remaining chunks are skipped.
+    """
+
+    def __init__(
+        self,
+        *,
+        strategy: Strategy,
+        options: SweepOptions,
+        settings: SimulationSettings,
+        target_symbols: list[str],
+        indicator_cache: IndicatorCache,
+    ) -> None:
+        """Initialize with a strategy and the grid of parameters to sweep."""
+        self.strategy = strategy
+        self.abort_rules = options.abort_rules
+        self.settings = settings
+        self.target_symbols = target_symbols
+        self.indicator_cache = indicator_cache
+
+        self.parameter_sets = expand_parameter_grid(options.grid)
+        self.variants = [
+            make_strategy_variant(strategy, p) for p in self.parameter_sets
+        ]
+
+        self.shared_memories: list[SharedMemory] = []
+        self.progress: SharedArray | None = None
+        self.progress_memory: SharedMemory | None = None
+        self.cancel_memory: SharedMemory | None = None
+        self.total_seconds = 1.0
+
+    def get_progress(self) -> float:
+        """Get the ratio of simulated time, from 0 to 1."""
+        if self.progress is None or self.progress_memory is None:
+            return 0.0
+        total_progress = sum_shared_array(self.progress_memory, self.progress)
+        return min(total_progress / self.total_seconds, 1.0)
+
+    async def run(self, year_candle_data: pd.DataFrame) -> list[SweepRanking]:
+        """Simulate all variants over candle data of the year and rank them.
+
+        Variants are ranked by total yield,
+        and aborted variants are placed after complete ones.
+        """
+        try:
+            return await self._run_real(year_candle_data)
+        finally:
+            if self.cancel_memory is not None:
+                raise_shared_flag(self.cancel_memory)
+                self.cancel_memory = None
+            for memory in self.shared_memories:
+                release_shared_memory(memory)
+            self.shared_memories.clear()
+            self.progress = None
+            self.progress_memory = None
+
+    async def _run_real(self, year_candle_data: pd.DataFrame) -> list[SweepRanking]:
+        slice_from, slice_until = get_year_slice(self.settings.year)
+        year_candle_data = year_candle_data.interpolate()
+        candle_data = GridFrame.from_frame(year_candle_data[slice_from:slice_until])
+        index = candle_data.make_index()
+        if len(index) == 0:
+            return []
+
+        shared_candle_data = share_frame(candle_data, self.shared_memories)
+        cancel_memory, cancel_flag = share_array(np.zeros(1, np.uint8))
+        self.shared_memories.append(cancel_memory)
+        self.cancel_memory = cancel_memory
+
+        shared_indicators = await self._share_indicators(
+            year_candle_data[slice_from - INDICATOR_WARMUP :],
+            index,
+        )
+
+        parallel_chunk_days = self.strategy.parallel_simulation_chunk_days
+        if parallel_chunk_days is None:
+            row_ranges = [(0, len(index))]
+        else:
+            row_ranges = divide_rows(index, timedelta(days=parallel_chunk_days))
+
+        chunk_count = len(self.variants) * len(row_ranges)
+        progress_memory, progress = share_array(np.zeros(chunk_count, FLOAT_DTYPE))
+        self.shared_memories.append(progress_memory)
+        self.progress_memory = progress_memory
+        self.progress = progress
+        self.total_seconds = max(
+            len(self.variants)
+            * sum((index[u - 1] - index[f]).total_seconds() for f, u in row_ranges),
+            1.0,
+        )
+
+        # Each consumer writes unrealized changes into its own block,
+        # so that memory doesn't grow with the number of variants
+        consumer_count = min(PROCESS_COUNT, chunk_count)
+        consumer_unrealized_changes: list[SharedArray] = []
+        for _ in range(consumer_count):
+            memory, shared_array = share_array(np.zeros(len(index), np.float32))
+            self.shared_memories.append(memory)
+            consumer_unrealized_changes.append(shared_array)
+
+        # Every chunk starts from blank states
+        blank_states = create_blank_states(self.target_symbols)
+        base_input = CalculationInput(
+            strategy=self.strategy,
+            progress=progress,
+            target_progress=0,
+            cancel_flag=cancel_flag,
+            target_symbols=self.target_symbols,
+            candle_data=shared_candle_data,
+            indicators=next(iter(shared_indicators.values())),
+            unrealized_changes=consumer_unrealized_changes[0],
+            row_from=0,
+            row_until=len(index),
+            chunk_asset_record=blank_states.asset_record,
+            chunk_scribbles=blank_states.scribbles,
+            chunk_account_state=blank_states.account_state,
+            chunk_virtual_state=blank_states.virtual_state,
+            abort_rules=self.abort_rules,
+        )
+        sweep_chunks = self._create_sweep_chunks(
+            base_input,
+            shared_indicators,
+            row_ranges,
+        )
+
+        outputs: list[list[CalculationOutput | None]] = [
+            [None] * len(row_ranges) for _ in self.variants
+        ]
+        min_unrealized_changes = [0.0] * len(self.variants)
+        is_aborted = [False] * len(self.variants)
+
+        async def simulate_sweep_chunk(consumer: int, sweep_chunk: SweepChunk) -> None:
+            if is_aborted[sweep_chunk.variant]:
+                return
+            unrealized_changes = consumer_unrealized_changes[consumer]
+            calculation_input = sweep_chunk.calculation_input._replace(
+                unrealized_changes=unrealized_changes,
+            )
+            duration_recorder = DurationRecorder("SIMULATE_CHUNK")
+            output_data = await spawn_blocking(simulate_chunk, calculation_input)
+            duration_recorder.record()
+            outputs[sweep_chunk.variant][sweep_chunk.turn] = output_data
+            if output_data.is_aborted:
+                is_aborted[sweep_chunk.variant] = True
+            chunk_unrealized_changes = read_shared_rows(
+                unrealized_changes,
+                calculation_input.row_from,
+                calculation_input.row_until,
+            )
+            min_unrealized_changes[sweep_chunk.variant] = min(
+                min_unrealized_changes[sweep_chunk.variant],
+                float(np.nanmin(chunk_unrealized_changes, initial=0.0)),
+            )
+
+        started_at = perf_counter()
+        await consume_chunks(sweep_chunks, simulate_sweep_chunk, consumer_count)
+        logger.info(
+            "Swept %d variants in %d chunks for %.1fs",
+            len(self.variants),
+            chunk_count,
+            perf_counter() - started_at,
+        )
+
+        rankings = [
+            self._rank_variant(
+                self.parameter_sets[variant_index],
+                variant_outputs,
+                min_unrealized_changes[variant_index],
+                is_aborted[variant_index],
+            )
+            for variant_index, variant_outputs in enumerate(outputs)
+        ]
+        rankings.sort(key=lambda r: (not r.is_aborted, r.total_yield), reverse=True)
+        return rankings
+
+    async def _share_indicators(
+        self,
+        candle_data: pd.DataFrame,
+        index: pd.DatetimeIndex,
+    ) -> dict[str, SharedFrame]:
+        """Calculate indicators of variants once per indicator code."""
+        shared_indicators: dict[str, SharedFrame] = {}
+        for variant in self.variants:
+            key = fingerprint_strategy(variant)
+            if key in shared_indicators:
+                continue
+            indicators = await self.indicator_cache.make_indicators(
+                strategy=variant,
+                target_symbols=self.target_symbols,
+                candle_data=candle_data,
+            )
+            shared_indicators[key] = share_frame(
+                GridFrame.from_frame(indicators.reindex(index)),
+                self.shared_memories,
+            )
+        return shared_indicators
+
+    def _create_sweep_chunks(
+        self,
+        base_input: CalculationInput,
+        shared_indicators: dict[str, SharedFrame],
+        row_ranges: list[tuple[int, int]],
+    ) -> list[SweepChunk]:
+        """Divide every variant into chunks of rows.
+
+        Longer chunks go first so that short ones fill the tail.
+        """
+        sweep_chunks: list[SweepChunk] = []
+        for variant_index, variant in enumerate(self.variants):
+            for turn, (row_from, row_until) in enumerate(row_ranges):
+                calculation_input = base_input._replace(
+                    strategy=variant,
+                    target_progress=variant_index * len(row_ranges) + turn,
+                    indicators=shared_indicators[fingerprint_strategy(variant)],
+                    row_from=row_from,
+                    row_until=row_until,
+                )
+                sweep_chunks.append(SweepChunk(variant_index, turn, calculation_input))
+
+        sweep_chunks.sort(
+            key=lambda c: c.calculation_input.row_until - c.calculation_input.row_from,
+            reverse=True,
+        )
+        return sweep_chunks
+
+    def _rank_variant(
+        self,
+        parameters: dict[str, float],
+        variant_outputs: list[CalculationOutput | None],
+        min_unrealized_change: float,
+        is_aborted: bool,
+    ) -> SweepRanking:
+        """Summarize the performance of a variant from its chunks.
+
+        Aborted variants are summarized from the chunks that were simulated.
+        """
+        maker_fee = self.settings.maker_fee
+        taker_fee = self.settings.taker_fee
+        leverage = self.settings.leverage
+
+        chunk_asset_changes_list: list[pd.Series] = []
+        transaction_count = 0
+        for output_data in variant_outputs:
+            if output_data is None:
+                if is_aborted:
+                    continue
+                msg = "A simulation chunk was not calculated"
+                raise ValueError(msg)
+            chunk_asset_record = output_data.chunk_asset_record
+            is_auto_trade = chunk_asset_record["CAUSE"] == "AUTO_TRADE"
+            transaction_count += int(is_auto_trade.sum())
+            chunk_asset_changes_list.append(
+                calculate_asset_changes(
+                    chunk_asset_record,
+                    maker_fee,
+                    taker_fee,
+                    leverage,
+                ),
+            )
+
+        if chunk_asset_changes_list:
+            asset_changes = pd.concat(chunk_asset_changes_list).to_numpy(np.float64)
+        else:
+            asset_changes = np.empty(0, np.float64)
+        if len(asset_changes) > 0:
+            asset_curve = np.cumprod(asset_changes)
+            total_yield = (asset_curve[-1] - 1) * 100
+            peak_curve = np.maximum.accumulate(np.maximum(asset_curve, 1.0))
+            max_drawdown = float(np.max(1 - asset_curve / peak_curve)) * 100
+        else:
+            total_yield = 0.0
+            max_drawdown = 0.0
+
+        return SweepRanking(
+            parameters=parameters,
+            total_yield=float(total_yield),
+            max_drawdown=max_drawdown,
+            min_unrealized_change=min_unrealized_change * leverage * 100,
+            transaction_count=transaction_count,
+            is_aborted=is_aborted,
+        )
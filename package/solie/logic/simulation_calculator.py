@@ -1,22 +1,47 @@
 """Simulation calculation orchestrator."""
 
+import hashlib
 import math
 import pickle
-from asyncio import gather, sleep
+from asyncio import Task, sleep, to_thread
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime, timedelta
+from logging import getLogger
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
+from time import perf_counter
 from typing import Any, NamedTuple
 
 import aiofiles
+import aiofiles.os
+import numpy as np
 import pandas as pd
 from PySide6.QtWidgets import QProgressBar
 
-from solie.common import UniqueTask, get_sync_manager, spawn, spawn_blocking
+from solie.common import (
+    FLOAT_DTYPE,
+    PROCESS_COUNT,
+    SharedArray,
+    UniqueTask,
+    consume_chunks,
+    raise_shared_flag,
+    read_shared_rows,
+    release_shared_memory,
+    share_array,
+    spawn,
+    spawn_background,
+    spawn_blocking,
+    sum_shared_array,
+    write_shared_rows,
+)
 from solie.utility import (
     MAX_PREPARATION_STEPS,
     PROGRESS_BAR_MAX,
     AccountState,
     Cell,
+    DurationRecorder,
+    GridFrame,
+    SavedStrategy,
     Strategy,
     VirtualPosition,
     VirtualState,
@@ -25,15 +50,29 @@ from solie.utility import (
     create_empty_unrealized_changes,
     sort_data_frame,
     sort_series,
+    to_epoch_ms,
 )
 from solie.widget import GraphLines
 
 from .analyze_market import (
     CalculationInput,
     CalculationOutput,
-    make_indicators,
+    SharedFrame,
     simulate_chunk,
 )
+from .indicator_cache import (
+    IndicatorCache,
+    describe_parameters,
+    fingerprint_candle_data,
+)
+
+logger = getLogger(__name__)
+
+INDICATOR_WARMUP = timedelta(days=28)
+# Results of sequential strategies are fingerprinted in segments of this span,
+# so that continuing them only needs recent candle data to be fingerprinted again
+SEQUENTIAL_SEGMENT_SPAN = timedelta(days=1)
+PARTIAL_RESULT_INTERVAL = 2.0  # Seconds
 
 
 class BlankStates(NamedTuple):
@@ -46,6 +85,14 @@ class BlankStates(NamedTuple):
     virtual_state: VirtualState
 
 
+class SymbolState(NamedTuple):
+    """States of a symbol that is simulated separately from other symbols."""
+
+    scribbles: dict[Any, Any]
+    account_state: AccountState
+    virtual_state: VirtualState
+
+
 class PreviousState(NamedTuple):
     """Previous calculation state."""
 
@@ -56,6 +103,8 @@ class PreviousState(NamedTuple):
     virtual_state: VirtualState
     calculate_from: datetime
     calculate_until: datetime
+    recalculate_ranges: list[tuple[datetime, datetime]]
+    symbol_states: dict[str, SymbolState] | None = None
 
 
 class WidgetReferences(NamedTuple):
@@ -66,6 +115,15 @@ class WidgetReferences(NamedTuple):
     simulation_graph: GraphLines
 
 
+class CalculationContext(NamedTuple):
+    """Resources of the worker that calculations run with."""
+
+    unique_task: UniqueTask
+    workerpath: Path
+    widgets: WidgetReferences
+    indicator_cache: IndicatorCache
+
+
 class CalculationConfig(NamedTuple):
     """Configuration for simulation calculation."""
 
@@ -74,15 +132,413 @@ class CalculationConfig(NamedTuple):
     target_symbols: list[str]
     only_visible: bool
     should_draw_all_years: bool
+    calculate_until: datetime | None = None
+    max_span: timedelta | None = None
+    should_save: bool = True
+
+
+class ResultSegment(NamedTuple):
+    """Range of calculated results with a fingerprint of its candle data."""
+
+    slice_from: datetime
+    slice_until: datetime
+    fingerprint: str
 
 
 class CalculationResult(NamedTuple):
-    """Result of simulation calculation."""
+    """Result of simulation calculation.
+
+    When symbols were simulated separately, their own states are kept
+    so that the calculation can be continued exactly as if uninterrupted.
+    Segments of the last saved checkpoint are kept as well,
+    so that saving a continued result only fingerprints new candle data.
+    """
 
     asset_record: pd.DataFrame
     unrealized_changes: pd.Series
     scribbles: dict[Any, Any]
     account_state: AccountState
+    virtual_state: VirtualState
+    symbol_states: dict[str, SymbolState] | None = None
+    segments: list[ResultSegment] | None = None
+
+
+class SimulationCheckpoint(NamedTuple):
+    """Stored simulation results with everything needed to continue them."""
+
+    asset_record: pd.DataFrame
+    unrealized_changes: pd.Series
+    scribbles: dict[Any, Any]
+    account_state: AccountState
+    virtual_state: VirtualState
+    segments: list[ResultSegment]
+    symbol_states: dict[str, SymbolState] | None = None
+
+
+async def read_checkpoint(filepath: Path) -> SimulationCheckpoint:
+    """Read a simulation checkpoint from disk."""
+    async with aiofiles.open(filepath, "rb") as file:
+        content = await file.read()
+    checkpoint: SimulationCheckpoint = pickle.loads(content)
+    return checkpoint
+
+
+async def write_checkpoint(filepath: Path, checkpoint: SimulationCheckpoint) -> None:
+    """Write a simulation checkpoint to disk atomically.
+
+    The file is written next to the destination first and then swapped in,
+    so that an interrupted write never leaves a mix of old and new state.
+    """
+    filepath_new = filepath.with_name(f"{filepath.name}.new")
+    content = await to_thread(pickle.dumps, checkpoint)
+    async with aiofiles.open(filepath_new, "wb") as file:
+        await file.write(content)
+    await aiofiles.os.replace(filepath_new, filepath)
+
+
+def fingerprint_simulation(strategy: Strategy, target_symbols: list[str]) -> str:
+    """Identify what simulation results of a strategy depend on, except data."""
+    if isinstance(strategy, SavedStrategy):
+        code = f"{strategy.indicator_script}\0{strategy.decision_script}"
+    else:
+        code = f"{type(strategy).__qualname__}_{strategy.code_name}"
+        code += f"_{strategy.version}"
+    ingredients = (
+        code,
+        describe_parameters(strategy),
+        str(strategy.parallel_simulation_chunk_days),
+        str(getattr(strategy, "decision_interval", None)),
+        str(getattr(strategy, "symbol_independent", False)),
+        ",".join(target_symbols),
+    )
+    return hashlib.sha256("\0".join(ingredients).encode()).hexdigest()[:32]
+
+
+def make_result_prefix(
+    strategy: Strategy,
+    target_symbols: list[str],
+    year: int,
+) -> str:
+    """Make the file name prefix of stored simulation results."""
+    return f"{fingerprint_simulation(strategy, target_symbols)}_{year}"
+
+
+def get_legacy_result_paths(
+    workerpath: Path,
+    strategy: Strategy,
+    year: int,
+) -> list[Path]:
+    """Get paths of simulation results stored by older versions.
+
+    They were named only by the strategy's code name and version,
+    with each part of the results in a separate file.
+    They can't be continued because the virtual state was not stored,
+    so they are removed once the combination is calculated or deleted.
+    """
+    prefix = f"{strategy.code_name}_{strategy.version}_{year}"
+    parts = ("asset_record", "unrealized_changes", "scribbles", "account_state")
+    return [workerpath / f"{prefix}_{p}.pickle" for p in parts]
+
+
+def get_year_slice(year: int) -> tuple[datetime, datetime]:
+    """Get the inclusive time range of a year that can be simulated.
+
+    The current year is simulated until the last whole hour.
+    """
+    slice_from = datetime(year, 1, 1, tzinfo=UTC)
+    if year == datetime.now(UTC).year:
+        slice_until = datetime.now(UTC)
+        slice_until = slice_until.replace(minute=0, second=0, microsecond=0)
+    else:
+        slice_until = datetime(year + 1, 1, 1, tzinfo=UTC)
+    slice_until -= timedelta(seconds=1)
+    return slice_from, slice_until
+
+
+def create_blank_states(target_symbols: list[str]) -> BlankStates:
+    """Create blank initial states."""
+    blank_asset_record = create_empty_asset_record()
+    blank_unrealized_changes = create_empty_unrealized_changes()
+    blank_scribbles: dict[Any, Any] = {}
+    blank_account_state = create_empty_account_state(target_symbols)
+    blank_virtual_state = VirtualState(
+        available_balance=1,
+        positions={},
+        placements={},
+    )
+    for symbol in target_symbols:
+        blank_virtual_state.positions[symbol] = VirtualPosition(
+            amount=0.0,
+            entry_price=0.0,
+        )
+        blank_virtual_state.placements[symbol] = {}
+
+    return BlankStates(
+        asset_record=blank_asset_record,
+        unrealized_changes=blank_unrealized_changes,
+        scribbles=blank_scribbles,
+        account_state=blank_account_state,
+        virtual_state=blank_virtual_state,
+    )
+
+
+def share_frame(
+    grid_frame: GridFrame,
+    shared_memories: list[SharedMemory],
+) -> SharedFrame:
+    """Place values on a regular time grid in shared memory.
+
+    Created shared memory blocks are added to the given list,
+    so that they can be released together later.
+    """
+    values_memory, shared_values = share_array(grid_frame.to_numpy())
+    shared_memories.append(values_memory)
+    return SharedFrame(
+        start=grid_frame.start,
+        step=grid_frame.step,
+        values=shared_values,
+        columns=grid_frame.columns,
+    )
+
+
+def calculate_asset_changes(
+    chunk_asset_record: pd.DataFrame,
+    maker_fee: float,
+    taker_fee: float,
+    leverage: int,
+) -> pd.Series:
+    """Calculate asset changes of a chunk, applying fees and leverage."""
+    chunk_result_asset_sr = chunk_asset_record["RESULT_ASSET"]
+    chunk_asset_shifts: pd.Series = chunk_result_asset_sr.diff()
+    if len(chunk_asset_shifts) > 0:
+        chunk_asset_shifts.iloc[0] = 0.0
+
+    lazy_chunk_result_asset = chunk_result_asset_sr.shift(periods=1)
+    if len(lazy_chunk_result_asset) > 0:
+        lazy_chunk_result_asset.iloc[0] = 1
+
+    chunk_asset_changes_by_leverage = (
+        1 + chunk_asset_shifts / lazy_chunk_result_asset * leverage
+    )
+
+    chunk_fees = chunk_asset_record["ROLE"].copy()
+    chunk_fees[chunk_fees == "MAKER"] = maker_fee
+    chunk_fees[chunk_fees == "TAKER"] = taker_fee
+    chunk_fees = chunk_fees.astype(np.float32)
+    chunk_margin_ratios = chunk_asset_record["MARGIN_RATIO"]
+    chunk_asset_changes_by_fee = 1 - (chunk_fees / 100) * chunk_margin_ratios * leverage
+
+    return chunk_asset_changes_by_leverage * chunk_asset_changes_by_fee
+
+
+def separate_symbol_states(
+    account_state: AccountState,
+    virtual_state: VirtualState,
+    symbol: str,
+) -> tuple[AccountState, VirtualState]:
+    """Take the part of states that a single symbol's simulation needs.
+
+    The symbol trades with the whole wallet as if it were alone,
+    so margins of other symbols are not taken from its available balance.
+    """
+    wallet_balance = account_state.wallet_balance
+    symbol_account_state = account_state.model_copy(
+        update={
+            "positions": {
+                s: p for s, p in account_state.positions.items() if s == symbol
+            },
+            "open_orders": {
+                s: o for s, o in account_state.open_orders.items() if s == symbol
+            },
+        },
+    )
+
+    virtual_position = virtual_state.positions.get(symbol)
+    if virtual_position is None:
+        virtual_position = VirtualPosition(amount=0.0, entry_price=0.0)
+    margin = abs(virtual_position.amount) * virtual_position.entry_price
+    symbol_virtual_state = VirtualState(
+        # Other symbols may have lost the wallet this margin was taken from
+        available_balance=max(wallet_balance - margin, 0.0),
+        positions={symbol: virtual_position},
+        placements={symbol: virtual_state.placements.get(symbol, {})},
+    )
+
+    return symbol_account_state, symbol_virtual_state
+
+
+def _chain_symbol_records(
+    previous_asset_record: pd.DataFrame,
+    chunk_asset_records: list[pd.DataFrame],
+    asset_ratios: list[np.ndarray],
+    wallet_balance: float,
+) -> pd.DataFrame:
+    """Append records of all symbols to previous ones in time order."""
+    filled_records = [r for r in chunk_asset_records if len(r) > 0]
+    new_asset_record = pd.concat(filled_records or chunk_asset_records[:1])
+    record_index = pd.DatetimeIndex(new_asset_record.index)
+    record_times = record_index.to_numpy("datetime64[ms]").astype(np.int64)
+    order = np.argsort(record_times, kind="stable")
+    ratios = np.concatenate(asset_ratios)[order]
+    new_asset_record = new_asset_record.iloc[order].assign(
+        RESULT_ASSET=wallet_balance * np.cumprod(ratios),
+    )
+
+    # Fills of different symbols can collide, so shift them apart by milliseconds
+    fill_times = record_times[order]
+    if len(previous_asset_record) > 0:
+        last_record_time = previous_asset_record.index.max()
+        first_allowed = int(last_record_time.timestamp() * 1000) + 1
+        fill_times = np.maximum(fill_times, first_allowed)
+    steps = np.arange(len(fill_times))
+    fill_times = np.maximum.accumulate(fill_times - steps) + steps
+    new_asset_record.index = pd.to_datetime(fill_times, unit="ms", utc=True)
+    asset_records = [previous_asset_record, new_asset_record]
+    asset_records = [r for r in asset_records if len(r) > 0]
+    return pd.concat(asset_records) if asset_records else previous_asset_record
+
+
+def merge_symbol_outputs(
+    previous_asset_record: pd.DataFrame,
+    symbol_outputs: list[CalculationOutput],
+    target_symbols: list[str],
+    wallet_balance: float,
+    symbol_wallet_balances: list[float],
+) -> CalculationOutput:
+    """Combine outputs of symbols that were simulated separately.
+
+    Each trade changes the combined wallet, which starts from the given balance,
+    by the same ratio as it changed its symbol's own wallet,
+    which starts from the symbol's balance.
+    Scribbles under a symbol's key come from that symbol's simulation,
+    while other keys come from the first symbol that has them.
+    """
+    chunk_asset_records: list[pd.DataFrame] = []
+    asset_ratios: list[np.ndarray] = []
+    final_wallet_balance = wallet_balance
+    for output_data, symbol_wallet_balance in zip(
+        symbol_outputs,
+        symbol_wallet_balances,
+        strict=True,
+    ):
+        chunk_asset_record = output_data.chunk_asset_record
+        result_assets = chunk_asset_record["RESULT_ASSET"].to_numpy(np.float64)
+        before_assets = np.concatenate(([symbol_wallet_balance], result_assets))[:-1]
+        chunk_asset_records.append(chunk_asset_record)
+        asset_ratios.append(result_assets / before_assets)
+        final_balance = output_data.chunk_account_state.wallet_balance
+        final_wallet_balance *= final_balance / symbol_wallet_balance
+
+    asset_record = _chain_symbol_records(
+        previous_asset_record,
+        chunk_asset_records,
+        asset_ratios,
+        wallet_balance,
+    )
+
+    symbol_set = set(target_symbols)
+    scribbles: dict[Any, Any] = {}
+    account_state = symbol_outputs[0].chunk_account_state.model_copy()
+    account_state.wallet_balance = final_wallet_balance
+    account_state.positions = {}
+    account_state.open_orders = {}
+    virtual_state = VirtualState(available_balance=0.0, positions={}, placements={})
+    occupied_margin = 0.0
+    for symbol, output_data in zip(target_symbols, symbol_outputs, strict=True):
+        for key, value in output_data.chunk_scribbles.items():
+            if key == symbol or (key not in symbol_set and key not in scribbles):
+                scribbles[key] = value
+        symbol_account_state = output_data.chunk_account_state
+        account_state.observed_until = max(
+            account_state.observed_until,
+            symbol_account_state.observed_until,
+        )
+        account_state.positions[symbol] = symbol_account_state.positions[symbol]
+        account_state.open_orders[symbol] = symbol_account_state.open_orders[symbol]
+        symbol_virtual_state = output_data.chunk_virtual_state
+        virtual_position = symbol_virtual_state.positions[symbol]
+        virtual_state.positions[symbol] = virtual_position
+        virtual_state.placements[symbol] = symbol_virtual_state.placements[symbol]
+        occupied_margin += abs(virtual_position.amount) * virtual_position.entry_price
+    virtual_state.available_balance = final_wallet_balance - occupied_margin
+
+    return CalculationOutput(
+        chunk_asset_record=asset_record,
+        chunk_scribbles=scribbles,
+        chunk_account_state=account_state,
+        chunk_virtual_state=virtual_state,
+        is_aborted=any(o.is_aborted for o in symbol_outputs),
+    )
+
+
+def find_live_window_from(
+    previous_result: CalculationResult,
+    *,
+    should_save: bool,
+) -> datetime | None:
+    """Find where candle data needed to continue a result in memory starts.
+
+    Saving needs candle data of the last segment to fingerprint it again.
+    `None` means that candle data of the whole year is needed.
+    """
+    window_from = previous_result.account_state.observed_until - INDICATOR_WARMUP
+    if not should_save:
+        return window_from
+    segments = previous_result.segments
+    if not segments:
+        return None
+    return min(window_from, segments[-1].slice_from)
+
+
+def _append_new_rows[T: (pd.DataFrame, pd.Series)](
+    previous_data: T,
+    new_parts: list[T],
+) -> T | None:
+    """Append rows that come after previous data, without deduplicating all of it.
+
+    Rows of new parts that previous data already has are left out,
+    just as deduplication would do.
+    `None` is returned when some rows would have to be inserted in between.
+    """
+    previous_index = pd.DatetimeIndex(previous_data.index)
+    if len(previous_index) == 0 or not previous_index.is_monotonic_increasing:
+        return None
+    last_moment = previous_index[-1]
+    new_rows: list[T] = []
+    for part in new_parts:
+        part_index = pd.DatetimeIndex(part.index)
+        if not part_index.is_monotonic_increasing:
+            return None
+        tail_from = int(part_index.searchsorted(last_moment, side="right"))
+        head_index = part_index[:tail_from]
+        positions = previous_index.searchsorted(head_index)
+        positions = np.minimum(positions, len(previous_index) - 1)
+        if not (previous_index[positions] == head_index).all():
+            return None
+        new_rows.append(part.iloc[tail_from:])
+    new_rows = [r for r in new_rows if len(r) > 0]
+    if not new_rows:
+        return previous_data
+    new_data = pd.concat(new_rows)
+    new_index = new_data.index
+    if not (new_index.is_monotonic_increasing and new_index.is_unique):
+        return None
+    return pd.concat([previous_data, new_data])  # type:ignore
+
+
+def divide_rows(
+    index: pd.DatetimeIndex,
+    division: timedelta,
+) -> list[tuple[int, int]]:
+    """Divide rows of a time index into ranges aligned from the epoch."""
+    if len(index) == 0:
+        return []
+    moments = index.to_numpy("datetime64[ms]").astype(np.int64)
+    chunk_keys = moments // (division // timedelta(milliseconds=1))
+    boundaries = (np.flatnonzero(np.diff(chunk_keys)) + 1).tolist()
+    starts = [0, *boundaries]
+    ends = [*boundaries, len(index)]
+    return list(zip(starts, ends, strict=True))
 
 
 class SimulationCalculator:
@@ -91,20 +547,31 @@ class SimulationCalculator:
     def __init__(
         self,
         *,
-        unique_task: UniqueTask,
+        context: CalculationContext,
         config: CalculationConfig,
-        workerpath: Path,
         year_candle_data: pd.DataFrame,
-        widgets: WidgetReferences,
+        previous_result: CalculationResult | None = None,
+        on_partial_result: Callable[[CalculationResult], Awaitable[None]] | None = None,
     ) -> None:
-        """Initialize simulation calculator."""
-        self.unique_task = unique_task
+        """Initialize simulation calculator.
+
+        A previous result kept in memory can be given to continue from it
+        instead of the stored checkpoint, when candle data before it is known
+        to be unchanged.
+        While chunks are being calculated, results including finished chunks
+        are periodically given to `on_partial_result` if it's provided.
+        """
+        self.context = context
         self.config = config
-        self.workerpath = workerpath
         self.year_candle_data = year_candle_data
-        self.widgets = widgets
+        self.previous_result = previous_result
+        self.on_partial_result = on_partial_result
 
         # Convenience accessors
+        self.unique_task = context.unique_task
+        self.workerpath = context.workerpath
+        self.widgets = context.widgets
+        self.indicator_cache = context.indicator_cache
         self.year = config.year
         self.strategy = config.strategy
         self.target_symbols = config.target_symbols
@@ -114,28 +581,30 @@ class SimulationCalculator:
         self.prepare_step = 0
         self.calculate_step = Cell(0)
 
+        # Shared memory blocks that live during a single calculation
+        self.shared_memories: list[SharedMemory] = []
+        self.needed_index = pd.DatetimeIndex([], tz="UTC")
+        self.shared_unrealized_changes: SharedArray | None = None
+        self.symbol_unrealized_changes: list[SharedArray] = []
+        self.symbol_wallet_balances: list[float] = []
+        self.simulated_row_ranges: list[tuple[int, int]] = []
+        self.has_tail_chunks = False
+        self.progress: SharedArray | None = None
+        self.progress_memory: SharedMemory | None = None
+        self.cancel_memory: SharedMemory | None = None
+
+        # Decided while preparing
+        self.previous_state: PreviousState | None = None
+        self.should_calculate = False
+
         # File paths
-        prefix = f"{self.strategy.code_name}_{self.strategy.version}_{self.year}"
-        self.asset_record_path = workerpath / f"{prefix}_asset_record.pickle"
-        self.unrealized_changes_path = (
-            workerpath / f"{prefix}_unrealized_changes.pickle"
-        )
-        self.scribbles_path = workerpath / f"{prefix}_scribbles.pickle"
-        self.account_state_path = workerpath / f"{prefix}_account_state.pickle"
-        self.virtual_state_path = workerpath / f"{prefix}_virtual_state.pickle"
+        prefix = make_result_prefix(self.strategy, self.target_symbols, self.year)
+        self.checkpoint_path = self.workerpath / f"{prefix}_checkpoint.pickle"
 
         # Time range
-        self.slice_from = datetime(self.year, 1, 1, tzinfo=UTC)
-        if self.year == datetime.now(UTC).year:
-            self.slice_until = datetime.now(UTC)
-            self.slice_until = self.slice_until.replace(
-                minute=0,
-                second=0,
-                microsecond=0,
-            )
-        else:
-            self.slice_until = datetime(self.year + 1, 1, 1, tzinfo=UTC)
-        self.slice_until -= timedelta(seconds=1)
+        self.slice_from, self.slice_until = get_year_slice(self.year)
+        if config.calculate_until is not None:
+            self.slice_until = config.calculate_until - timedelta(seconds=1)
 
     async def calculate(self) -> CalculationResult:
         """Run the simulation calculation."""
@@ -144,13 +613,47 @@ class SimulationCalculator:
         bar_task.add_done_callback(lambda _: self.widgets.main_progressbar.setValue(0))
         self.unique_task.add_done_callback(lambda _: bar_task.cancel())
 
+        try:
+            calculation_inputs = await self.prepare()
+            calculation_output_data = await self._run_calculation(
+                self.should_calculate,
+                calculation_inputs,
+            )
+            self.calculate_step.value = 1000
+            return await self.finish(calculation_output_data)
+        finally:
+            self.release_shared_memories()
+
+    async def calculate_live(self) -> CalculationResult:
+        """Run the simulation calculation quietly, for following live candles.
+
+        Progress is not shown, and chunks are simulated one after another
+        in the low-priority background process,
+        so that following live candles doesn't compete with other calculations.
+        """
+        try:
+            calculation_inputs = await self.prepare(in_background=True)
+            calculation_output_data = [
+                await spawn_background(simulate_chunk, i) for i in calculation_inputs
+            ]
+            return await self.finish(calculation_output_data)
+        finally:
+            self.release_shared_memories()
+
+    async def prepare(self, *, in_background: bool = False) -> list[CalculationInput]:
+        """Prepare chunks to calculate, placing their data in shared memory.
+
+        Shared memory is kept until `finish` or `release_shared_memories`
+        is called, so that chunks can be calculated in the meantime.
+        Indicators are made in the background process if `in_background` is set.
+        """
         self.prepare_step = 1
 
         self.year_candle_data = self.year_candle_data.interpolate()
 
         self.prepare_step = 2
 
-        blank_states = self._create_blank_states()
+        blank_states = create_blank_states(self.target_symbols)
 
         self.prepare_step = 3
 
@@ -160,6 +663,7 @@ class SimulationCalculator:
 
         should_calculate = (
             previous_state.calculate_from < previous_state.calculate_until
+            or len(previous_state.recalculate_ranges) > 0
         )
         if len(previous_state.asset_record) == 0:
             previous_state.asset_record.loc[previous_state.calculate_from, "CAUSE"] = (
@@ -172,47 +676,63 @@ class SimulationCalculator:
 
         self.prepare_step = 5
 
+        self.previous_state = previous_state
+        self.should_calculate = should_calculate
         calculation_inputs = await self._create_calculation_inputs(
             should_calculate,
             previous_state,
             blank_states,
+            in_background=in_background,
         )
 
         self.prepare_step = 6
 
-        calculation_output_data = await self._run_calculation(
-            should_calculate,
-            calculation_inputs,
-            previous_state,
-        )
-
-        self.calculate_step.value = 1000
-
-        result = await self._merge_calculation_results(
-            should_calculate,
-            calculation_output_data,
-            previous_state,
-        )
+        return calculation_inputs
 
-        asset_record = result.asset_record
-        unrealized_changes = result.unrealized_changes
-        scribbles = result.scribbles
-        account_state = result.account_state
-
-        if not self.only_visible and should_calculate:
-            await self._save_calculation_results(
-                asset_record,
-                unrealized_changes,
-                scribbles,
-                account_state,
+    async def finish(
+        self,
+        calculation_output_data: list[CalculationOutput],
+    ) -> CalculationResult:
+        """Merge outputs of prepared chunks, and store the result."""
+        previous_state = self.previous_state
+        if previous_state is None:
+            msg = "Calculation was not prepared"
+            raise ValueError(msg)
+
+        try:
+            result = await self._merge_calculation_results(
+                self.should_calculate,
+                calculation_output_data,
+                previous_state,
+            )
+        finally:
+            self.release_shared_memories()
+
+        previous_result = self.previous_result
+        segments = None if previous_result is None else previous_result.segments
+        should_save = self.config.should_save
+        if not self.only_visible and self.should_calculate and should_save:
+            segments = await self._save_calculation_results(
+                result,
+                previous_state.calculate_until,
+                segments,
             )
 
-        return CalculationResult(
-            asset_record=asset_record,
-            unrealized_changes=unrealized_changes,
-            scribbles=scribbles,
-            account_state=account_state,
+        return result._replace(segments=segments)
+
+    def measure_progress(self) -> tuple[float, float]:
+        """Get simulated seconds and total seconds of prepared chunks."""
+        needed_index = self.needed_index
+        total_seconds = sum(
+            (needed_index[u - 1] - needed_index[f]).total_seconds()
+            for f, u in self.simulated_row_ranges
         )
+        progress = self.progress
+        progress_memory = self.progress_memory
+        if progress is None or progress_memory is None:
+            return 0.0, total_seconds
+        simulated_seconds = sum_shared_array(progress_memory, progress)
+        return simulated_seconds, total_seconds
 
     async def _play_progress_bar(self) -> None:
         """Animate progress bars."""
@@ -255,234 +775,507 @@ class SimulationCalculator:
 
             await sleep(0.01)
 
-    def _create_blank_states(self) -> BlankStates:
-        """Create blank initial states."""
-        blank_asset_record = create_empty_asset_record()
-        blank_unrealized_changes = create_empty_unrealized_changes()
-        blank_scribbles: dict[Any, Any] = {}
-        blank_account_state = create_empty_account_state(self.target_symbols)
-        blank_virtual_state = VirtualState(
-            available_balance=1,
-            positions={},
-            placements={},
-        )
-        for symbol in self.target_symbols:
-            blank_virtual_state.positions[symbol] = VirtualPosition(
-                amount=0.0,
-                entry_price=0.0,
-            )
-            blank_virtual_state.placements[symbol] = {}
-
-        return BlankStates(
-            asset_record=blank_asset_record,
-            unrealized_changes=blank_unrealized_changes,
-            scribbles=blank_scribbles,
-            account_state=blank_account_state,
-            virtual_state=blank_virtual_state,
-        )
-
     async def _load_or_create_previous_state(
         self,
         blank_states: BlankStates,
     ) -> PreviousState:
-        """Load previous calculation state or create blank state."""
-        if self.only_visible:
-            previous_asset_record = blank_states.asset_record.copy()
-            previous_unrealized_changes = blank_states.unrealized_changes.copy()
-            previous_scribbles = blank_states.scribbles.copy()
-            previous_account_state = blank_states.account_state.model_copy(deep=True)
-            previous_virtual_state = blank_states.virtual_state.model_copy(deep=True)
+        """Load previous calculation state or create blank state.
 
+        Stored results are checked against the current candle data,
+        so that only ranges whose data has changed get calculated again.
+        """
+        if self.only_visible:
             graph_widget = self.widgets.simulation_graph.price_widget
             view_range = graph_widget.getAxis("bottom").range
             view_start = datetime.fromtimestamp(view_range[0], tz=UTC)
             view_end = datetime.fromtimestamp(view_range[1], tz=UTC)
-
             if self.should_draw_all_years:
-                calculate_from = view_start
-                calculate_until = view_end
-            else:
-                calculate_from = max(view_start, self.slice_from)
-                calculate_until = min(view_end, self.slice_until)
+                return self._start_blank(blank_states, view_start, view_end)
+            return self._start_blank(
+                blank_states,
+                max(view_start, self.slice_from),
+                min(view_end, self.slice_until),
+            )
 
+        if self.previous_result is not None:
+            previous_result = self.previous_result
+            previous_state = PreviousState(
+                asset_record=previous_result.asset_record,
+                unrealized_changes=previous_result.unrealized_changes,
+                scribbles=previous_result.scribbles,
+                account_state=previous_result.account_state,
+                virtual_state=previous_result.virtual_state,
+                calculate_from=previous_result.account_state.observed_until,
+                calculate_until=self.slice_until,
+                recalculate_ranges=[],
+                symbol_states=previous_result.symbol_states,
+            )
         else:
-            try:
-                previous_asset_record: pd.DataFrame = await spawn_blocking(
-                    pd.read_pickle,
-                    self.asset_record_path,
-                )
-                previous_unrealized_changes: pd.Series = await spawn_blocking(
-                    pd.read_pickle,
-                    self.unrealized_changes_path,
-                )
-                async with aiofiles.open(self.scribbles_path, "rb") as file:
-                    content = await file.read()
-                    previous_scribbles = pickle.loads(content)
-                async with aiofiles.open(self.account_state_path, "rb") as file:
-                    content = await file.read()
-                    previous_account_state: AccountState = pickle.loads(content)
-                async with aiofiles.open(self.virtual_state_path, "rb") as file:
-                    content = await file.read()
-                    previous_virtual_state: VirtualState = pickle.loads(content)
-
-                calculate_from = previous_account_state.observed_until
-                calculate_until = self.slice_until
-            except FileNotFoundError:
-                previous_asset_record = blank_states.asset_record.copy()
-                previous_unrealized_changes = blank_states.unrealized_changes.copy()
-                previous_scribbles = blank_states.scribbles.copy()
-                previous_account_state = blank_states.account_state.model_copy(
-                    deep=True,
-                )
-                previous_virtual_state = blank_states.virtual_state.model_copy(
-                    deep=True,
-                )
+            previous_state = await self._resume_from_checkpoint(blank_states)
+
+        max_span = self.config.max_span
+        if max_span is not None:
+            calculate_until = min(
+                previous_state.calculate_until,
+                previous_state.calculate_from + max_span,
+            )
+            previous_state = previous_state._replace(calculate_until=calculate_until)
 
-                calculate_from = self.slice_from
-                calculate_until = self.slice_until
+        return previous_state
 
+    def _start_blank(
+        self,
+        blank_states: BlankStates,
+        calculate_from: datetime,
+        calculate_until: datetime,
+    ) -> PreviousState:
+        """Create a state that calculates a range from the beginning."""
         return PreviousState(
-            asset_record=previous_asset_record,
-            unrealized_changes=previous_unrealized_changes,
-            scribbles=previous_scribbles,
-            account_state=previous_account_state,
-            virtual_state=previous_virtual_state,
+            asset_record=blank_states.asset_record.copy(),
+            unrealized_changes=blank_states.unrealized_changes.copy(),
+            scribbles=blank_states.scribbles.copy(),
+            account_state=blank_states.account_state.model_copy(deep=True),
+            virtual_state=blank_states.virtual_state.model_copy(deep=True),
             calculate_from=calculate_from,
             calculate_until=calculate_until,
+            recalculate_ranges=[],
+        )
+
+    async def _resume_from_checkpoint(
+        self,
+        blank_states: BlankStates,
+    ) -> PreviousState:
+        """Continue the stored checkpoint, calculating changed ranges again."""
+        try:
+            checkpoint = await read_checkpoint(self.checkpoint_path)
+        except FileNotFoundError:
+            return self._start_blank(blank_states, self.slice_from, self.slice_until)
+
+        previous_state = PreviousState(
+            asset_record=checkpoint.asset_record,
+            unrealized_changes=checkpoint.unrealized_changes,
+            scribbles=checkpoint.scribbles,
+            account_state=checkpoint.account_state,
+            virtual_state=checkpoint.virtual_state,
+            calculate_from=checkpoint.account_state.observed_until,
+            calculate_until=self.slice_until,
+            recalculate_ranges=[],
+            symbol_states=checkpoint.symbol_states,
+        )
+
+        segments = checkpoint.segments
+        invalid_segments = self._find_invalid_segments(segments)
+        if not invalid_segments:
+            return previous_state
+        if self.strategy.parallel_simulation_chunk_days is None:
+            # Results depend on everything before, so start over
+            return self._start_blank(blank_states, self.slice_from, self.slice_until)
+
+        # Chunks of parallel strategies don't depend on each other
+        previous_state = previous_state._replace(
+            asset_record=self._drop_segments(
+                previous_state.asset_record,
+                invalid_segments,
+            ),
+            unrealized_changes=self._drop_segments(
+                previous_state.unrealized_changes,
+                invalid_segments,
+            ),
+        )
+        if invalid_segments[-1] == segments[-1]:
+            # The last chunk gets continued, so it should start over
+            invalid_segments.pop()
+            previous_state = previous_state._replace(
+                scribbles=blank_states.scribbles.copy(),
+                account_state=blank_states.account_state.model_copy(deep=True),
+                virtual_state=blank_states.virtual_state.model_copy(deep=True),
+                calculate_from=segments[-1].slice_from,
+            )
+        previous_state.recalculate_ranges.extend(
+            (s.slice_from, s.slice_until) for s in invalid_segments
+        )
+        return previous_state
+
+    def _create_segments(
+        self,
+        calculate_until: datetime,
+        previous_segments: list[ResultSegment] | None,
+    ) -> list[ResultSegment]:
+        """Fingerprint candle data of calculated results, chunk by chunk.
+
+        When previous segments are given, they are kept
+        except for the last one, which may have been continued.
+        """
+        segments = list(previous_segments or [])
+        segment_from = segments.pop().slice_from if segments else self.slice_from
+        candle_data = self.year_candle_data[segment_from:calculate_until]
+        index: pd.DatetimeIndex = candle_data.index  # type:ignore
+        parallel_chunk_days = self.strategy.parallel_simulation_chunk_days
+        if parallel_chunk_days is None:
+            division = SEQUENTIAL_SEGMENT_SPAN
+        else:
+            division = timedelta(days=parallel_chunk_days)
+        segments.extend(
+            ResultSegment(
+                slice_from=index[row_from].to_pydatetime(),
+                slice_until=index[row_until - 1].to_pydatetime(),
+                fingerprint=fingerprint_candle_data(
+                    candle_data.iloc[row_from:row_until],
+                ),
+            )
+            for row_from, row_until in divide_rows(index, division)
         )
+        return segments
+
+    def _find_invalid_segments(
+        self,
+        segments: list[ResultSegment],
+    ) -> list[ResultSegment]:
+        """Find segments whose candle data has changed since calculation."""
+        invalid_segments: list[ResultSegment] = []
+        for segment in segments:
+            candle_data = self.year_candle_data[
+                segment.slice_from : segment.slice_until
+            ]
+            if fingerprint_candle_data(candle_data) != segment.fingerprint:
+                invalid_segments.append(segment)
+        return invalid_segments
+
+    def _drop_segments[T: (pd.DataFrame, pd.Series)](
+        self,
+        data: T,
+        segments: list[ResultSegment],
+    ) -> T:
+        """Drop rows within segments, keeping the initial asset row."""
+        index = pd.DatetimeIndex(data.index)
+        times = index.to_numpy("datetime64[ms]").astype(np.int64)
+        mask = np.zeros(len(times), dtype=np.bool_)
+        for segment in segments:
+            segment_from = to_epoch_ms(segment.slice_from)
+            segment_until = to_epoch_ms(segment.slice_until)
+            mask |= (times >= segment_from) & (times <= segment_until)
+        if isinstance(data, pd.DataFrame):
+            mask &= (data["CAUSE"] != "OTHER").to_numpy()
+        return data.loc[~mask]
 
     async def _create_calculation_inputs(
         self,
         should_calculate: bool,
         previous_state: PreviousState,
         blank_states: BlankStates,
+        *,
+        in_background: bool,
     ) -> list[CalculationInput]:
-        """Create calculation input chunks."""
+        """Create calculation input chunks.
+
+        Ranges to calculate again come first, each as a chunk starting blank,
+        followed by chunks that continue from the previous calculation.
+        """
         calculation_inputs: list[CalculationInput] = []
 
         if not should_calculate:
             return calculation_inputs
 
-        sync_manager = get_sync_manager()
-
         calculate_from = previous_state.calculate_from
         calculate_until = previous_state.calculate_until
+        recalculate_ranges = previous_state.recalculate_ranges
 
-        provide_from = calculate_from - timedelta(days=28)
-        year_indicators = await spawn_blocking(
-            make_indicators,
+        needed_from = min([calculate_from, *(r[0] for r in recalculate_ranges)])
+        provide_from = needed_from - INDICATOR_WARMUP
+        year_indicators = await self.indicator_cache.make_indicators(
             strategy=self.strategy,
             target_symbols=self.target_symbols,
             candle_data=self.year_candle_data[provide_from:calculate_until],
+            in_background=in_background,
         )
 
-        needed_candle_data = self.year_candle_data[calculate_from:calculate_until]
-        needed_index: pd.DatetimeIndex = needed_candle_data.index  # type:ignore
-        needed_indicators = year_indicators.reindex(needed_index)
-
+        needed_candle_data = GridFrame.from_frame(
+            self.year_candle_data[needed_from:calculate_until],
+        )
+        needed_index = needed_candle_data.make_index()
+        needed_indicators = GridFrame.from_frame(year_indicators.reindex(needed_index))
+
+        # Place data in shared memory once, so that chunks only carry row ranges
+        self.needed_index = needed_index
+        candle_data = share_frame(needed_candle_data, self.shared_memories)
+        indicators = share_frame(needed_indicators, self.shared_memories)
+        blank_unrealized_changes = np.full(len(needed_index), np.nan, np.float32)
+        unrealized_changes = self._share_values(blank_unrealized_changes)
+        self.shared_unrealized_changes = unrealized_changes
+        cancel_memory, cancel_flag = share_array(np.zeros(1, np.uint8))
+        self.shared_memories.append(cancel_memory)
+        self.cancel_memory = cancel_memory
+
+        chunk_specs = self._create_chunk_specs(
+            needed_index,
+            calculate_from,
+            recalculate_ranges,
+        )
+        should_split_symbols = len(self.symbol_unrealized_changes) > 0
         parallel_chunk_days = self.strategy.parallel_simulation_chunk_days
+        progress = self._share_progress(len(chunk_specs))
 
-        if parallel_chunk_days is None:
-            progress_list = sync_manager.list([0.0])
+        for turn, (row_from, row_until, is_continued) in enumerate(chunk_specs):
+            if parallel_chunk_days is None:
+                # Only the last record is needed to continue fill times
+                chunk_asset_record = previous_state.asset_record.iloc[-1:]
+            else:
+                chunk_asset_record = previous_state.asset_record.iloc[0:0]
+            if is_continued:
+                chunk_scribbles = previous_state.scribbles
+                chunk_account_state = previous_state.account_state
+                chunk_virtual_state = previous_state.virtual_state
+            else:
+                chunk_scribbles = blank_states.scribbles
+                chunk_account_state = blank_states.account_state
+                chunk_virtual_state = blank_states.virtual_state
             calculation_input = CalculationInput(
                 strategy=self.strategy,
-                progress_list=progress_list,
-                target_progress=0,
+                progress=progress,
+                target_progress=turn,
+                cancel_flag=cancel_flag,
                 target_symbols=self.target_symbols,
-                calculation_index=needed_index,
-                chunk_candle_data=needed_candle_data,
-                chunk_indicators=needed_indicators,
-                chunk_asset_record=previous_state.asset_record,
-                chunk_unrealized_changes=previous_state.unrealized_changes,
-                chunk_scribbles=previous_state.scribbles,
-                chunk_account_state=previous_state.account_state,
-                chunk_virtual_state=previous_state.virtual_state,
+                candle_data=candle_data,
+                indicators=indicators,
+                unrealized_changes=unrealized_changes,
+                row_from=row_from,
+                row_until=row_until,
+                chunk_asset_record=chunk_asset_record,
+                chunk_scribbles=chunk_scribbles,
+                chunk_account_state=chunk_account_state,
+                chunk_virtual_state=chunk_virtual_state,
             )
+            if should_split_symbols:
+                calculation_input = self._separate_symbol_input(
+                    calculation_input,
+                    turn,
+                    previous_state.symbol_states or {},
+                )
             calculation_inputs.append(calculation_input)
 
+        return calculation_inputs
+
+    def _create_chunk_specs(
+        self,
+        needed_index: pd.DatetimeIndex,
+        calculate_from: datetime,
+        recalculate_ranges: list[tuple[datetime, datetime]],
+    ) -> list[tuple[int, int, bool]]:
+        """Decide row ranges of chunks, with whether they continue the previous state.
+
+        Symbol-independent strategies without parallel chunks
+        get a separate chunk for each symbol, covering all new rows.
+        """
+        chunk_specs: list[tuple[int, int, bool]] = []
+
+        for range_from, range_until in recalculate_ranges:
+            row_from = int(needed_index.searchsorted(range_from, "left"))
+            row_until = int(needed_index.searchsorted(range_until, "right"))
+            if row_from < row_until:
+                chunk_specs.append((row_from, row_until, False))
+
+        tail_row_from = int(needed_index.searchsorted(calculate_from, "left"))
+        tail_index = needed_index[tail_row_from:]
+        parallel_chunk_days = self.strategy.parallel_simulation_chunk_days
+
+        should_split_symbols = (
+            parallel_chunk_days is None
+            and getattr(self.strategy, "symbol_independent", False)
+            and len(self.target_symbols) > 1
+            and len(tail_index) > 0
+        )
+
+        if should_split_symbols:
+            blank_unrealized_changes = np.full(len(needed_index), np.nan, np.float32)
+            for _ in self.target_symbols:
+                chunk_specs.append((tail_row_from, len(needed_index), True))
+                self.symbol_unrealized_changes.append(
+                    self._share_values(blank_unrealized_changes),
+                )
+
+        elif parallel_chunk_days is None:
+            if len(tail_index) > 0:
+                chunk_specs.append((tail_row_from, len(needed_index), True))
+
         else:
             division = timedelta(days=parallel_chunk_days)
-            chunk_candle_data_list = [
-                chunk_candle_data
-                for _, chunk_candle_data in needed_candle_data.groupby(
-                    pd.Grouper(freq=division, origin="epoch"),  # type:ignore
+            division_seconds = parallel_chunk_days * 24 * 60 * 60
+            for turn, (row_from, row_until) in enumerate(
+                divide_rows(tail_index, division),
+            ):
+                first_timestamp = tail_index[row_from].timestamp()
+                is_continued = turn == 0 and first_timestamp % division_seconds != 0
+                chunk_specs.append(
+                    (tail_row_from + row_from, tail_row_from + row_until, is_continued),
                 )
-            ]
 
-            chunk_count = len(chunk_candle_data_list)
-            progress_list = sync_manager.list([0.0] * chunk_count)
+        self.simulated_row_ranges = [(f, u) for f, u, _ in chunk_specs]
+        self.has_tail_chunks = len(tail_index) > 0
+        return chunk_specs
 
-            for turn, chunk_candle_data in enumerate(chunk_candle_data_list):
-                chunk_index: pd.DatetimeIndex = chunk_candle_data.index  # type:ignore
-                chunk_indicators = needed_indicators.reindex(chunk_index)
-                chunk_asset_record = previous_state.asset_record.iloc[0:0]
-                chunk_unrealized_changes = previous_state.unrealized_changes.iloc[0:0]
-                first_timestamp = chunk_index[0].timestamp()
-                division_seconds = parallel_chunk_days * 24 * 60 * 60
-                if turn == 0 and first_timestamp % division_seconds != 0:
-                    chunk_scribbles = previous_state.scribbles
-                    chunk_account_state = previous_state.account_state
-                    chunk_virtual_state = previous_state.virtual_state
-                else:
-                    chunk_scribbles = blank_states.scribbles
-                    chunk_account_state = blank_states.account_state
-                    chunk_virtual_state = blank_states.virtual_state
-
-                calculation_input = CalculationInput(
-                    strategy=self.strategy,
-                    progress_list=progress_list,
-                    target_progress=turn,
-                    target_symbols=self.target_symbols,
-                    calculation_index=chunk_index,
-                    chunk_candle_data=chunk_candle_data,
-                    chunk_indicators=chunk_indicators,
-                    chunk_asset_record=chunk_asset_record,
-                    chunk_unrealized_changes=chunk_unrealized_changes,
-                    chunk_scribbles=chunk_scribbles,
-                    chunk_account_state=chunk_account_state,
-                    chunk_virtual_state=chunk_virtual_state,
-                )
-                calculation_inputs.append(calculation_input)
+    def _separate_symbol_input(
+        self,
+        calculation_input: CalculationInput,
+        turn: int,
+        symbol_states: dict[str, SymbolState],
+    ) -> CalculationInput:
+        """Narrow a continuing chunk down to a single symbol.
+
+        The symbol continues from its own stored states if there are any,
+        otherwise from its part of the combined states.
+        """
+        symbol = self.target_symbols[turn]
+        symbol_state = symbol_states.get(symbol)
+        if symbol_state is None:
+            symbol_account_state, symbol_virtual_state = separate_symbol_states(
+                calculation_input.chunk_account_state,
+                calculation_input.chunk_virtual_state,
+                symbol,
+            )
+            symbol_state = SymbolState(
+                scribbles=calculation_input.chunk_scribbles,
+                account_state=symbol_account_state,
+                virtual_state=symbol_virtual_state,
+            )
+        self.symbol_wallet_balances.append(symbol_state.account_state.wallet_balance)
+        return calculation_input._replace(
+            target_symbols=[symbol],
+            unrealized_changes=self.symbol_unrealized_changes[turn],
+            chunk_asset_record=calculation_input.chunk_asset_record.iloc[0:0],
+            chunk_scribbles=symbol_state.scribbles,
+            chunk_account_state=symbol_state.account_state,
+            chunk_virtual_state=symbol_state.virtual_state,
+        )
 
-        return calculation_inputs
+    def _share_values(self, values: np.ndarray) -> SharedArray:
+        """Place an array in shared memory for the duration of calculation."""
+        memory, shared_array = share_array(values)
+        self.shared_memories.append(memory)
+        return shared_array
+
+    def _share_progress(self, chunk_count: int) -> SharedArray:
+        """Place progress counters of chunks in shared memory."""
+        memory, shared_array = share_array(np.zeros(chunk_count, FLOAT_DTYPE))
+        self.shared_memories.append(memory)
+        self.progress = shared_array
+        self.progress_memory = memory
+        return shared_array
+
+    def release_shared_memories(self) -> None:
+        """Release shared memory blocks of the calculation.
+
+        Chunks that are still running in other processes,
+        such as when the calculation was cancelled, are told to stop first.
+        """
+        if self.cancel_memory is not None:
+            raise_shared_flag(self.cancel_memory)
+            self.cancel_memory = None
+        for memory in self.shared_memories:
+            release_shared_memory(memory)
+        self.shared_memories.clear()
+        self.progress = None
+        self.progress_memory = None
 
     async def _run_calculation(
         self,
         should_calculate: bool,
         calculation_inputs: list[CalculationInput],
-        previous_state: PreviousState,
     ) -> list[CalculationOutput]:
-        """Execute the actual simulation calculation."""
+        """Execute the actual simulation calculation.
+
+        Chunks are consumed from a queue by as many workers as there are
+        processes, longest first.
+        Their boundaries come from the strategy's chunk days, not from the
+        process count, as account states carry over between rows of a chunk.
+        """
         calculation_output_data: list[CalculationOutput] = []
 
         if not should_calculate:
             return calculation_output_data
 
-        coroutines = [
-            spawn_blocking(simulate_chunk, input_data)
-            for input_data in calculation_inputs
-        ]
-        gathered = gather(*coroutines)
-
-        calculate_from = previous_state.calculate_from
-        calculate_until = previous_state.calculate_until
-        total_seconds = (calculate_until - calculate_from).total_seconds()
-
-        async def update_calculation_step() -> None:
-            progress_list = calculation_inputs[0].progress_list
-            while True:
-                if gathered.done():
-                    return
-                total_progress = sum(progress_list)
-                self.calculate_step.value = math.ceil(
-                    total_progress * 1000 / total_seconds,
-                )
-                await sleep(0.01)
+        # Longer chunks go first so that short ones fill the tail
+        turns = sorted(
+            range(len(calculation_inputs)),
+            key=lambda t: (
+                calculation_inputs[t].row_until - calculation_inputs[t].row_from
+            ),
+            reverse=True,
+        )
 
-        step_task = spawn(update_calculation_step())
+        output_slots: list[CalculationOutput | None] = [None] * len(calculation_inputs)
+        consumer_count = min(PROCESS_COUNT, len(calculation_inputs))
+        busy_seconds = [0.0] * consumer_count
+
+        async def simulate_turn(consumer: int, turn: int) -> None:
+            started_at = perf_counter()
+            duration_recorder = DurationRecorder("SIMULATE_CHUNK")
+            output_data = await spawn_blocking(simulate_chunk, calculation_inputs[turn])
+            duration_recorder.record()
+            busy_seconds[consumer] += perf_counter() - started_at
+            output_slots[turn] = output_data
+
+        started_at = perf_counter()
+        consuming_task = spawn(consume_chunks(turns, simulate_turn, consumer_count))
+        step_task = spawn(self._update_calculation_step(consuming_task))
         self.unique_task.add_done_callback(lambda _: step_task.cancel())
+        partial_task = spawn(self._publish_partial_results(output_slots))
+        self.unique_task.add_done_callback(lambda _: partial_task.cancel())
+
+        try:
+            await consuming_task
+        finally:
+            consuming_task.cancel()
+            # The final result shouldn't be overwritten by a partial one
+            partial_task.cancel()
+
+        elapsed_seconds = max(perf_counter() - started_at, 1e-9)
+        utilization = sum(busy_seconds) / (PROCESS_COUNT * elapsed_seconds)
+        process_utilizations = " ".join(
+            f"{b / elapsed_seconds:.0%}" for b in busy_seconds
+        )
+        logger.info(
+            "Simulated %d chunks in %.1fs, using %.0f%% of %d processes (%s)",
+            len(calculation_inputs),
+            elapsed_seconds,
+            utilization * 100,
+            PROCESS_COUNT,
+            process_utilizations,
+        )
+
+        for output_data in output_slots:
+            if output_data is None:
+                msg = "A simulation chunk was not calculated"
+                raise ValueError(msg)
+            calculation_output_data.append(output_data)
+        return calculation_output_data
+
+    async def _update_calculation_step(self, consuming_task: Task[None]) -> None:
+        """Reflect progress of chunks in the calculation step until they're done."""
+        while not consuming_task.done():
+            simulated_seconds, total_seconds = self.measure_progress()
+            self.calculate_step.value = math.ceil(
+                simulated_seconds * 1000 / max(total_seconds, 1.0),
+            )
+            await sleep(0.01)
 
-        return await gathered
+    async def _publish_partial_results(
+        self,
+        output_slots: list[CalculationOutput | None],
+    ) -> None:
+        """Periodically give results including finished chunks, until cancelled."""
+        on_partial_result = self.on_partial_result
+        # Separately simulated symbols only make sense when combined
+        if on_partial_result is None or self.symbol_unrealized_changes:
+            return
+        published_count = 0
+        while True:
+            await sleep(PARTIAL_RESULT_INTERVAL)
+            finished_count = sum(o is not None for o in output_slots)
+            if finished_count == published_count:
+                continue
+            published_count = finished_count
+            partial_result = await self._merge_partial_results(output_slots)
+            await on_partial_result(partial_result)
 
     async def _merge_calculation_results(
         self,
@@ -491,60 +1284,229 @@ class SimulationCalculator:
         previous_state: PreviousState,
     ) -> CalculationResult:
         """Merge calculation results into final output."""
-        if should_calculate:
-            asset_record = previous_state.asset_record
-            for chunk_ouput_data in calculation_output_data:
-                chunk_asset_record = chunk_ouput_data.chunk_asset_record
-                concat_data = [asset_record, chunk_asset_record]
-                asset_record: pd.DataFrame = pd.concat(concat_data)
-            mask = ~asset_record.index.duplicated()
-            asset_record = asset_record[mask]
-            if not asset_record.index.is_monotonic_increasing:
-                asset_record = await spawn_blocking(sort_data_frame, asset_record)
-
-            unrealized_changes = previous_state.unrealized_changes
-            for chunk_ouput_data in calculation_output_data:
-                chunk_unrealized_changes = chunk_ouput_data.chunk_unrealized_changes
-                concat_data = [unrealized_changes, chunk_unrealized_changes]
-                unrealized_changes: pd.Series = pd.concat(concat_data)
-            mask = ~unrealized_changes.index.duplicated()
-            unrealized_changes = unrealized_changes[mask]
-            if not unrealized_changes.index.is_monotonic_increasing:
-                unrealized_changes = await spawn_blocking(
-                    sort_series,
-                    unrealized_changes,
+        symbol_states = previous_state.symbol_states
+        if self.symbol_unrealized_changes:
+            symbol_states = {
+                symbol: SymbolState(
+                    scribbles=o.chunk_scribbles,
+                    account_state=o.chunk_account_state,
+                    virtual_state=o.chunk_virtual_state,
                 )
+                for symbol, o in zip(
+                    self.target_symbols,
+                    calculation_output_data,
+                    strict=True,
+                )
+            }
+            calculation_output_data = [
+                self._merge_symbol_outputs(calculation_output_data, previous_state),
+            ]
 
-            scribbles = calculation_output_data[-1].chunk_scribbles
-            account_state = calculation_output_data[-1].chunk_account_state
+        if should_calculate:
+            # Rows between recalculated ranges are kept from before
+            new_unrealized_changes = self._read_unrealized_changes(
+                self.simulated_row_ranges,
+            )
+            asset_record = await self._combine_asset_records(
+                previous_state.asset_record,
+                [o.chunk_asset_record for o in calculation_output_data],
+            )
+            unrealized_changes = await self._combine_unrealized_changes(
+                previous_state.unrealized_changes,
+                new_unrealized_changes,
+            )
+
+            if self.has_tail_chunks:
+                if not self.symbol_unrealized_changes:
+                    symbol_states = None
+                scribbles = calculation_output_data[-1].chunk_scribbles
+                account_state = calculation_output_data[-1].chunk_account_state
+                virtual_state = calculation_output_data[-1].chunk_virtual_state
+            else:
+                scribbles = previous_state.scribbles
+                account_state = previous_state.account_state
+                virtual_state = previous_state.virtual_state
 
         else:
             asset_record = previous_state.asset_record
             unrealized_changes = previous_state.unrealized_changes
             scribbles = previous_state.scribbles
             account_state = previous_state.account_state
+            virtual_state = previous_state.virtual_state
 
         return CalculationResult(
             asset_record=asset_record,
             unrealized_changes=unrealized_changes,
             scribbles=scribbles,
             account_state=account_state,
+            virtual_state=virtual_state,
+            symbol_states=symbol_states,
+        )
+
+    async def _merge_partial_results(
+        self,
+        output_slots: list[CalculationOutput | None],
+    ) -> CalculationResult:
+        """Merge chunks that have finished so far, for displaying progress.
+
+        States are kept from before, as the last chunk is not done yet.
+        """
+        previous_state = self.previous_state
+        if previous_state is None:
+            msg = "Calculation was not prepared"
+            raise ValueError(msg)
+
+        finished_row_ranges: list[tuple[int, int]] = []
+        chunk_asset_records: list[pd.DataFrame] = []
+        for row_range, output_data in zip(
+            self.simulated_row_ranges,
+            output_slots,
+            strict=True,
+        ):
+            if output_data is not None:
+                finished_row_ranges.append(row_range)
+                chunk_asset_records.append(output_data.chunk_asset_record)
+
+        # Read shared memory before yielding, while the calculation still owns it
+        new_unrealized_changes = self._read_unrealized_changes(finished_row_ranges)
+        asset_record = await self._combine_asset_records(
+            previous_state.asset_record,
+            chunk_asset_records,
+        )
+        unrealized_changes = await self._combine_unrealized_changes(
+            previous_state.unrealized_changes,
+            new_unrealized_changes,
+        )
+
+        return CalculationResult(
+            asset_record=asset_record,
+            unrealized_changes=unrealized_changes,
+            scribbles=previous_state.scribbles,
+            account_state=previous_state.account_state,
+            virtual_state=previous_state.virtual_state,
+            symbol_states=previous_state.symbol_states,
+        )
+
+    def _read_unrealized_changes(
+        self,
+        row_ranges: list[tuple[int, int]],
+    ) -> pd.Series:
+        """Read unrealized changes of given row ranges from shared memory."""
+        shared_unrealized_changes = self.shared_unrealized_changes
+        if shared_unrealized_changes is None:
+            msg = "Unrealized changes were not placed in shared memory"
+            raise ValueError(msg)
+        needed_index = self.needed_index
+        is_simulated = np.zeros(len(needed_index), dtype=np.bool_)
+        for row_from, row_until in row_ranges:
+            is_simulated[row_from:row_until] = True
+        values = read_shared_rows(shared_unrealized_changes, 0, len(needed_index))
+        return pd.Series(values[is_simulated], index=needed_index[is_simulated])
+
+    async def _combine_asset_records(
+        self,
+        previous_asset_record: pd.DataFrame,
+        chunk_asset_records: list[pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Combine asset records of chunks with a single concatenation."""
+        appended_record = await to_thread(
+            _append_new_rows,
+            previous_asset_record,
+            chunk_asset_records,
+        )
+        if appended_record is not None:
+            return appended_record
+        asset_record = pd.concat([previous_asset_record, *chunk_asset_records])
+        asset_record = asset_record[~asset_record.index.duplicated()]
+        if not asset_record.index.is_monotonic_increasing:
+            asset_record = await spawn_blocking(sort_data_frame, asset_record)
+        return asset_record
+
+    async def _combine_unrealized_changes(
+        self,
+        previous_unrealized_changes: pd.Series,
+        new_unrealized_changes: pd.Series,
+    ) -> pd.Series:
+        """Combine new unrealized changes with previous ones."""
+        appended_changes = await to_thread(
+            _append_new_rows,
+            previous_unrealized_changes,
+            [new_unrealized_changes],
+        )
+        if appended_changes is not None:
+            return appended_changes
+        concat_data = [previous_unrealized_changes, new_unrealized_changes]
+        unrealized_changes: pd.Series = pd.concat(concat_data)
+        unrealized_changes = unrealized_changes[~unrealized_changes.index.duplicated()]
+        if not unrealized_changes.index.is_monotonic_increasing:
+            unrealized_changes = await spawn_blocking(sort_series, unrealized_changes)
+        return unrealized_changes
+
+    def _merge_symbol_outputs(
+        self,
+        symbol_outputs: list[CalculationOutput],
+        previous_state: PreviousState,
+    ) -> CalculationOutput:
+        """Combine separately simulated symbols into a single output.
+
+        Unrealized changes of symbols are added up,
+        as each of them is relative to the same wallet.
+        """
+        shared_unrealized_changes = self.shared_unrealized_changes
+        if shared_unrealized_changes is None:
+            msg = "Unrealized changes were not placed in shared memory"
+            raise ValueError(msg)
+        row_from, row_until = self.simulated_row_ranges[0]
+        unrealized_changes = np.zeros(row_until - row_from, np.float32)
+        for symbol_unrealized_changes in self.symbol_unrealized_changes:
+            unrealized_changes += read_shared_rows(
+                symbol_unrealized_changes,
+                row_from,
+                row_until,
+            )
+        write_shared_rows(shared_unrealized_changes, row_from, unrealized_changes)
+
+        return merge_symbol_outputs(
+            previous_state.asset_record,
+            symbol_outputs,
+            self.target_symbols,
+            previous_state.account_state.wallet_balance,
+            self.symbol_wallet_balances,
         )
 
     async def _save_calculation_results(
         self,
-        asset_record: pd.DataFrame,
-        unrealized_changes: pd.Series,
-        scribbles: dict[Any, Any],
-        account_state: AccountState,
-    ) -> None:
-        """Save calculation results to disk."""
-        await spawn_blocking(asset_record.to_pickle, self.asset_record_path)
-        await spawn_blocking(unrealized_changes.to_pickle, self.unrealized_changes_path)
-        async with aiofiles.open(self.scribbles_path, "wb") as file:
-            content = pickle.dumps(scribbles)
-            await file.write(content)
-        async with aiofiles.open(self.account_state_path, "wb") as file:
-            content = pickle.dumps(account_state)
-            await file.write(content)
-        # Note: virtual_state is not saved in the original implementation
+        result: CalculationResult,
+        calculate_until: datetime,
+        previous_segments: list[ResultSegment] | None,
+    ) -> list[ResultSegment]:
+        """Save calculation results to disk as a single checkpoint.
+
+        Segments are saved along with results,
+        so that changes in candle data can be detected later.
+        """
+        segments = await to_thread(
+            self._create_segments,
+            calculate_until,
+            previous_segments,
+        )
+        checkpoint = SimulationCheckpoint(
+            asset_record=result.asset_record,
+            unrealized_changes=result.unrealized_changes,
+            scribbles=result.scribbles,
+            account_state=result.account_state,
+            virtual_state=result.virtual_state,
+            segments=segments,
+            symbol_states=result.symbol_states,
+        )
+        await write_checkpoint(self.checkpoint_path, checkpoint)
+
+        for legacy_path in get_legacy_result_paths(
+            self.workerpath,
+            self.strategy,
+            self.year,
+        ):
+            if await aiofiles.os.path.isfile(legacy_path):
+                await aiofiles.os.remove(legacy_path)
+
+        return segments
@@ -9,9 +9,12 @@ from .download_fill_option import (
     DownloadYearRange,
 )
 from .long_text_view import LongTextView
+from .parameter_sweep_input import ParameterSweepInput
 from .strategy_basic_input import StrategyBasicInput
 from .strategy_develop_input import StrategyDevelopInput
+from .sweep_ranking_view import SweepRankingView
 from .token_selection import TokenSelection
+from .year_selection import YearSelection
 
 __all__ = [
     "CoinSelection",
@@ -21,7 +24,10 @@ __all__ = [
     "DownloadFillOptionChooser",
     "DownloadYearRange",
     "LongTextView",
+    "ParameterSweepInput",
     "StrategyBasicInput",
     "StrategyDevelopInput",
+    "SweepRankingView",
     "TokenSelection",
+    "YearSelection",
 ]
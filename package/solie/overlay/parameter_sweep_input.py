@@ -0,0 +1,186 @@
+"""Parameter sweep grid input overlay."""
+
+from asyncio import Event
+from math import prod
+from re import fullmatch
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QDoubleSpinBox,
+    QFormLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSizePolicy,
+    QSpacerItem,
+    QSpinBox,
+    QTextEdit,
+    QVBoxLayout,
+    QWidget,
+)
+
+from solie.common import outsource
+from solie.utility import AbortRules, SavedStrategy, Strategy, SweepOptions
+from solie.widget import ask
+
+MAX_SWEEP_VARIANTS = 256
+
+
+def parse_parameter_grid(text: str) -> dict[str, list[float]]:
+    """Parse lines like `period = 10, 20, 30` into a parameter grid."""
+    grid: dict[str, list[float]] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        name, separator, values_text = line.partition("=")
+        name = name.strip()
+        if not separator or not fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+            msg = f"Line `{line.strip()}` should be like `period = 10, 20, 30`"
+            raise ValueError(msg)
+        try:
+            values = [float(v) for v in values_text.split(",") if v.strip()]
+        except ValueError:
+            msg = f"Values of parameter `{name}` should be numbers"
+            raise ValueError(msg) from None
+        if not values:
+            msg = f"Parameter `{name}` should have at least one value"
+            raise ValueError(msg)
+        grid[name] = values
+    return grid
+
+
+class ParameterSweepInput:
+    """Overlay for writing the grid of parameters to sweep."""
+
+    title = "Sweep parameters of your strategy"
+    close_button = True
+    done_event = Event()
+
+    def __init__(self, strategy: Strategy) -> None:
+        """Initialize parameter sweep input overlay."""
+        super().__init__()
+        self.widget = QWidget()
+        self.result: SweepOptions | None = None
+
+        full_layout = QHBoxLayout(self.widget)
+        cards_layout = QVBoxLayout()
+        full_layout.addLayout(cards_layout)
+
+        self._add_spacer(cards_layout)
+
+        card = QGroupBox()
+        card.setFixedWidth(720)
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(80, 40, 80, 40)
+        cards_layout.addWidget(card)
+
+        explain_label = QLabel(
+            "Write one parameter in each line, with the values to try."
+            " Every combination of values is simulated on the selected year"
+            " from the beginning, and ranked by total yield. Saved strategies"
+            " read them from `parameters` in their scripts, while fixed"
+            " strategies receive them as attributes.",
+        )
+        explain_label.setWordWrap(True)
+        card_layout.addWidget(explain_label)
+
+        self.grid_input = QTextEdit()
+        self.grid_input.setAcceptRichText(False)
+        if isinstance(strategy, SavedStrategy):
+            lines = [f"{n} = {v}" for n, v in strategy.parameters.items()]
+            self.grid_input.setPlainText("\n".join(lines))
+        self.grid_input.setPlaceholderText("period = 10, 20, 30")
+        card_layout.addWidget(self.grid_input)
+
+        abort_label = QLabel(
+            "Variants that break one of these rules are aborted early"
+            " and placed at the bottom of the ranking. Zero means no limit.",
+        )
+        abort_label.setWordWrap(True)
+        card_layout.addWidget(abort_label)
+
+        this_layout = QFormLayout()
+        card_layout.addLayout(this_layout)
+
+        self.max_drawdown_input = QDoubleSpinBox()
+        self.max_drawdown_input.setSuffix("%")
+        self.max_drawdown_input.setRange(0.0, 100.0)
+        self.max_drawdown_input.setButtonSymbols(QSpinBox.ButtonSymbols.NoButtons)
+        this_layout.addRow("Maximum drawdown", self.max_drawdown_input)
+
+        self.min_wallet_balance_input = QDoubleSpinBox()
+        self.min_wallet_balance_input.setSuffix(" USDT")
+        self.min_wallet_balance_input.setRange(0.0, 1_000_000_000.0)
+        self.min_wallet_balance_input.setButtonSymbols(
+            QSpinBox.ButtonSymbols.NoButtons,
+        )
+        this_layout.addRow("Minimum wallet balance", self.min_wallet_balance_input)
+
+        self.max_trade_count_input = QSpinBox()
+        self.max_trade_count_input.setRange(0, 1_000_000_000)
+        self.max_trade_count_input.setButtonSymbols(QSpinBox.ButtonSymbols.NoButtons)
+        this_layout.addRow("Maximum trade count", self.max_trade_count_input)
+
+        confirm_button = QPushButton("Start sweep", card)
+        confirm_button.setSizePolicy(
+            QSizePolicy.Policy.Fixed,
+            QSizePolicy.Policy.Fixed,
+        )
+        outsource(confirm_button.clicked, self._confirm)
+        card_layout.addWidget(confirm_button)
+        card_layout.setAlignment(confirm_button, Qt.AlignmentFlag.AlignCenter)
+
+        self._add_spacer(cards_layout)
+
+    def _add_spacer(self, layout: QVBoxLayout) -> None:
+        """Add expanding spacer to layout."""
+        spacer = QSpacerItem(
+            0,
+            0,
+            QSizePolicy.Policy.Minimum,
+            QSizePolicy.Policy.Expanding,
+        )
+        layout.addItem(spacer)
+
+    async def _confirm(self) -> None:
+        """Validate the grid and finish."""
+        try:
+            grid = parse_parameter_grid(self.grid_input.toPlainText())
+        except ValueError as error:
+            await ask("Parameter grid is wrong.", str(error), ["Okay"])
+            return
+
+        if not grid:
+            await ask(
+                "No parameters to sweep.",
+                "You should write at least one parameter with its values.",
+                ["Okay"],
+            )
+            return
+
+        variant_count = prod(len(v) for v in grid.values())
+        if variant_count > MAX_SWEEP_VARIANTS:
+            await ask(
+                "Too many combinations.",
+                f"This grid makes {variant_count} combinations, but a sweep can"
+                f" simulate at most {MAX_SWEEP_VARIANTS} of them at once.",
+                ["Okay"],
+            )
+            return
+
+        max_drawdown = self.max_drawdown_input.value() / 100
+        min_wallet_balance = self.min_wallet_balance_input.value()
+        max_trade_count = self.max_trade_count_input.value()
+        abort_rules = AbortRules(
+            max_drawdown=max_drawdown or None,
+            min_wallet_balance=min_wallet_balance or None,
+            max_trade_count=max_trade_count or None,
+        )
+
+        self.result = SweepOptions(grid, abort_rules)
+        self.done_event.set()
+
+    async def confirm_closing(self) -> bool:
+        """Confirm if overlay can be closed."""
+        return True
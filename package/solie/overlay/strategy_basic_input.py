@@ -26,6 +26,8 @@ from solie.common import PACKAGE_PATH, outsource
 from solie.utility import RiskLevel, Strategy, is_left_version_higher
 from solie.widget import HorizontalDivider, ask
 
+CANDLE_SECONDS = 10
+
 
 class StrategyBasicInput:
     """Overlay for editing strategy basic information."""
@@ -192,6 +194,22 @@ class StrategyBasicInput:
         self.chunk_division_input.setValue(strategy.parallel_simulation_chunk_days or 0)
         this_layout.addRow("Chunk division", self.chunk_division_input)
 
+        self.decision_interval_input = QSpinBox()
+        self.decision_interval_input.setSuffix(" seconds")
+        self.decision_interval_input.setMinimum(CANDLE_SECONDS)
+        self.decision_interval_input.setMaximum(86400)
+        self.decision_interval_input.setSingleStep(CANDLE_SECONDS)
+        self.decision_interval_input.setButtonSymbols(QSpinBox.ButtonSymbols.NoButtons)
+        decision_interval = getattr(strategy, "decision_interval", None)
+        self.decision_interval_input.setValue(decision_interval or CANDLE_SECONDS)
+        this_layout.addRow("Decision interval", self.decision_interval_input)
+
+        self.symbol_independent_input = QCheckBox()
+        self.symbol_independent_input.setChecked(
+            getattr(strategy, "symbol_independent", False),
+        )
+        this_layout.addRow("Symbols independent", self.symbol_independent_input)
+
     def _build_confirmation_card(self, cards_layout: QVBoxLayout) -> None:
         """Build the confirmation button card."""
         card = QGroupBox()
@@ -248,6 +266,23 @@ class StrategyBasicInput:
         parallel_chunk_days = self.chunk_division_input.value() if parallel else None
         strategy.parallel_simulation_chunk_days = parallel_chunk_days
 
+        decision_interval = self.decision_interval_input.value()
+        if decision_interval % CANDLE_SECONDS != 0:
+            await ask(
+                "Decision interval is wrong.",
+                "Decision interval should be a multiple of 10 seconds,"
+                " which is the length of a single candle.",
+                ["Okay"],
+            )
+            return
+        # These are optional attributes outside the `Strategy` protocol
+        is_every_candle = decision_interval == CANDLE_SECONDS
+        decision_interval = None if is_every_candle else decision_interval
+        strategy.decision_interval = decision_interval  # type:ignore
+
+        symbol_independent = self.symbol_independent_input.isChecked()
+        strategy.symbol_independent = symbol_independent  # type:ignore
+
         self.done_event.set()
 
     async def confirm_closing(self) -> bool:
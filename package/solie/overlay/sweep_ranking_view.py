@@ -0,0 +1,66 @@
+"""Parameter sweep ranking overlay."""
+
+from asyncio import Event
+
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from solie.utility import SweepRanking
+
+RANKING_HEADERS = (
+    "Parameters",
+    "Total yield",
+    "Max drawdown",
+    "Lowest unrealized profit",
+    "Transaction count",
+    "Status",
+)
+
+
+class SweepRankingView:
+    """Overlay for viewing variants of a parameter sweep, ranked by yield."""
+
+    title = "These are the results of the parameter sweep"
+    close_button = True
+    done_event = Event()
+
+    def __init__(self, rankings: list[SweepRanking]) -> None:
+        """Initialize sweep ranking view overlay."""
+        super().__init__()
+        self.widget = QWidget()
+        self.result = None
+
+        full_layout = QVBoxLayout(self.widget)
+
+        table = QTableWidget(len(rankings), len(RANKING_HEADERS))
+        table.setHorizontalHeaderLabels(RANKING_HEADERS)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents,
+        )
+        full_layout.addWidget(table)
+
+        for row, ranking in enumerate(rankings):
+            parameters_text = ", ".join(
+                f"{n} = {v:g}" for n, v in ranking.parameters.items()
+            )
+            texts = (
+                parameters_text,
+                f"{ranking.total_yield:+.4f}%",
+                f"{ranking.max_drawdown:.4f}%",
+                f"{ranking.min_unrealized_change:+.4f}%",
+                str(ranking.transaction_count),
+                "Aborted" if ranking.is_aborted else "Complete",
+            )
+            for column, text in enumerate(texts):
+                table.setItem(row, column, QTableWidgetItem(text))
+
+    async def confirm_closing(self) -> bool:
+        """Confirm if overlay can be closed."""
+        return True
@@ -0,0 +1,104 @@
+"""Year selection overlay for calculating several years together."""
+
+from asyncio import Event
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QGridLayout,
+    QGroupBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSizePolicy,
+    QSpacerItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from solie.common import outsource
+from solie.widget import ask
+
+YEAR_COLUMNS = 4
+
+
+class YearSelection:
+    """Overlay for choosing years to calculate simulation on."""
+
+    title = "Choose years to calculate"
+    close_button = True
+    done_event = Event()
+
+    def __init__(self, years: list[int]) -> None:
+        """Initialize year selection overlay."""
+        super().__init__()
+        self.widget = QWidget()
+        self.result: list[int] | None = None
+
+        full_layout = QHBoxLayout(self.widget)
+        cards_layout = QVBoxLayout()
+        full_layout.addLayout(cards_layout)
+
+        self._add_spacer(cards_layout)
+
+        card = QGroupBox()
+        card.setFixedWidth(720)
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(80, 40, 80, 40)
+        cards_layout.addWidget(card)
+
+        explain_label = QLabel(
+            "Chunks of all chosen years are calculated together in parallel,"
+            " and the result of each year is saved separately.",
+        )
+        explain_label.setWordWrap(True)
+        card_layout.addWidget(explain_label)
+
+        checkbox_layout = QGridLayout()
+        card_layout.addLayout(checkbox_layout)
+        self.year_checkboxes: dict[int, QCheckBox] = {}
+        for turn, year in enumerate(sorted(years)):
+            checkbox = QCheckBox(str(year))
+            checkbox.setChecked(True)
+            row, column = divmod(turn, YEAR_COLUMNS)
+            checkbox_layout.addWidget(checkbox, row, column)
+            self.year_checkboxes[year] = checkbox
+
+        confirm_button = QPushButton("Calculate", card)
+        confirm_button.setSizePolicy(
+            QSizePolicy.Policy.Fixed,
+            QSizePolicy.Policy.Fixed,
+        )
+        outsource(confirm_button.clicked, self._confirm)
+        card_layout.addWidget(confirm_button)
+        card_layout.setAlignment(confirm_button, Qt.AlignmentFlag.AlignCenter)
+
+        self._add_spacer(cards_layout)
+
+    def _add_spacer(self, layout: QVBoxLayout) -> None:
+        """Add expanding spacer to layout."""
+        spacer = QSpacerItem(
+            0,
+            0,
+            QSizePolicy.Policy.Minimum,
+            QSizePolicy.Policy.Expanding,
+        )
+        layout.addItem(spacer)
+
+    async def _confirm(self) -> None:
+        """Check that at least one year is chosen and finish."""
+        years = [y for y, c in self.year_checkboxes.items() if c.isChecked()]
+        if not years:
+            await ask(
+                "No years chosen.",
+                "You should choose at least one year to calculate.",
+                ["Okay"],
+            )
+            return
+
+        self.result = years
+        self.done_event.set()
+
+    async def confirm_closing(self) -> bool:
+        """Confirm if overlay can be closed."""
+        return True
@@ -13,7 +13,10 @@ from .compare_versions import is_left_version_higher
 from .constants import (
     COLUMN_PARTS_COUNT,
     EXIT_DIALOG_ANSWER,
+    EXPOSURE_LOOKBACK,
     HTTP_OK,
+    LIVE_CALCULATION_SPAN,
+    LIVE_CANDLE_DELAY,
     LONG_SYMBOL_LIST_THRESHOLD,
     MAX_PREPARATION_STEPS,
     MAX_REQUEST_RETRIES,
@@ -36,12 +39,14 @@ from .constants import (
 )
 from .convert import list_to_dict, slice_deque
 from .data_models import (
+    AbortRules,
     AccountState,
     AggregateTrade,
     BoardLockOptions,
     BookTicker,
     Decision,
     DecisionInput,
+    ExposureInput,
     IndicatorInput,
     ManagementSettings,
     MarkPrice,
@@ -53,11 +58,16 @@ from .data_models import (
     SimulationSettings,
     SimulationSummary,
     Strategy,
+    SweepOptions,
+    SweepRanking,
     TransactionSettings,
+    VectorizedStrategy,
     VirtualPlacement,
     VirtualPosition,
     VirtualState,
 )
+from .grid_frame import GridFrame
+from .lazy_row import LazyRow
 from .log_handler import LogHandler
 from .pandas_related import combine_candle_data
 from .percent_axis_item import PercentAxisItem
@@ -74,7 +84,15 @@ from .standardize import (
 )
 from .syntax_highlighter import SyntaxHighlighter
 from .time_axis_item import TimeAxisItem
-from .timing import DurationRecorder, to_moment
+from .timing import (
+    MOMENT_MS,
+    DurationRecorder,
+    from_epoch_ms,
+    now_epoch_ms,
+    to_epoch_ms,
+    to_moment,
+    to_moment_ms,
+)
 from .user_settings import (
     DataSettings,
     SavedStrategies,
@@ -89,7 +107,10 @@ from .user_settings import (
 __all__ = [
     "COLUMN_PARTS_COUNT",
     "EXIT_DIALOG_ANSWER",
+    "EXPOSURE_LOOKBACK",
     "HTTP_OK",
+    "LIVE_CALCULATION_SPAN",
+    "LIVE_CANDLE_DELAY",
     "LONG_SYMBOL_LIST_THRESHOLD",
     "MAX_PREPARATION_STEPS",
     "MAX_REQUEST_RETRIES",
@@ -99,6 +120,7 @@ __all__ = [
     "MIN_SELECTED_COINS",
     "MIN_SERIES_LENGTH",
     "MIN_SERVER_TIME_SAMPLES",
+    "MOMENT_MS",
     "PROGRESS_BAR_MAX",
     "SECONDS_PER_DAY",
     "SECONDS_PER_HOUR",
@@ -109,6 +131,7 @@ __all__ = [
     "TWENTY_SECONDS",
     "TWO_MINUTES",
     "TWO_SECONDS",
+    "AbortRules",
     "AccountState",
     "AggregateTrade",
     "ApiRequestError",
@@ -121,7 +144,10 @@ __all__ = [
     "Decision",
     "DecisionInput",
     "DurationRecorder",
+    "ExposureInput",
+    "GridFrame",
     "IndicatorInput",
+    "LazyRow",
     "LogHandler",
     "ManagementSettings",
     "MarkPrice",
@@ -139,9 +165,12 @@ __all__ = [
     "SimulationSummary",
     "SolieConfig",
     "Strategy",
+    "SweepOptions",
+    "SweepRanking",
     "SyntaxHighlighter",
     "TimeAxisItem",
     "TransactionSettings",
+    "VectorizedStrategy",
     "VirtualPlacement",
     "VirtualPosition",
     "VirtualState",
@@ -154,9 +183,11 @@ __all__ = [
     "create_empty_unrealized_changes",
     "create_strategy_code_name",
     "format_numeric",
+    "from_epoch_ms",
     "internet_connected",
     "is_left_version_higher",
     "list_to_dict",
+    "now_epoch_ms",
     "read_data_settings",
     "read_datapath",
     "save_data_settings",
@@ -165,7 +196,9 @@ __all__ = [
     "sort_data_frame",
     "sort_series",
     "start_monitoring_internet",
+    "to_epoch_ms",
     "to_moment",
+    "to_moment_ms",
     "when_internet_connected",
     "when_internet_disconnected",
 ]
@@ -26,6 +26,8 @@ PROGRESS_BAR_MAX = 1000
 # Calculation/Simulation
 MAX_PREPARATION_STEPS = 6
 MIN_PEAK_COUNT = 12
+LIVE_CANDLE_DELAY = 60  # Seconds to wait for late candle data
+LIVE_CALCULATION_SPAN = 604800  # Seconds to calculate at most per step
 
 # Data Collection
 MAX_REQUEST_RETRIES = 10
@@ -33,6 +35,7 @@ MIN_SERVER_TIME_SAMPLES = 30
 
 # Decision Constants
 COLUMN_PARTS_COUNT = 3
+EXPOSURE_LOOKBACK = 8640  # Rows given to vectorized strategies when trading live
 
 # Magic Number Replacements
 MIN_SERIES_LENGTH = 2
@@ -4,6 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, NamedTuple, Protocol, runtime_checkable
 
+import numpy as np
 import pandas as pd
 from pydantic import BaseModel
 
@@ -211,6 +212,38 @@ class RiskLevel(Enum):
     HIGH = 2
 
 
+class AbortRules(NamedTuple):
+    """Criteria for giving up on a simulation chunk that is hopeless.
+
+    Criteria set to `None` are not checked.
+    """
+
+    max_drawdown: float | None = None
+    """Ratio of equity lost from its peak, including unrealized profit"""
+    min_wallet_balance: float | None = None
+    """Wallet balance relative to the initial asset of 1"""
+    max_trade_count: int | None = None
+    """Number of automatic trades filled within the chunk"""
+
+
+class SweepOptions(NamedTuple):
+    """Grid of parameters to sweep, with rules for aborting variants."""
+
+    grid: dict[str, list[float]]
+    abort_rules: AbortRules
+
+
+class SweepRanking(NamedTuple):
+    """Performance of a strategy variant in a parameter sweep."""
+
+    parameters: dict[str, float]
+    total_yield: float  # Percent
+    max_drawdown: float  # Percent
+    min_unrealized_change: float  # Percent
+    transaction_count: int
+    is_aborted: bool
+
+
 class IndicatorInput(NamedTuple):
     """Input data for creating indicators."""
 
@@ -231,9 +264,27 @@ class DecisionInput(NamedTuple):
     new_decisions: dict[str, dict[OrderType, Decision]]
 
 
+class ExposureInput(NamedTuple):
+    """Input data for deciding target exposures over whole arrays."""
+
+    target_symbols: list[str]
+    candle_data: pd.DataFrame
+    indicators: pd.DataFrame
+    new_exposures: dict[str, np.ndarray]
+    """Signed ratios of the wallet balance to hold, filled with `NaN` at first"""
+
+
 @runtime_checkable
 class Strategy(Protocol):
-    """Protocol for trading strategy implementation."""
+    """Protocol for trading strategy implementation.
+
+    A strategy can optionally have `decision_interval`,
+    seconds between decisions or `None` to decide on every candle,
+    `symbol_independent`, whether each symbol is traded
+    without looking at other symbols, and `parameters`, tunable values
+    that tell variants of the strategy apart. These are read with `getattr`
+    so that strategies written before them still work.
+    """
 
     code_name: str
     readable_name: str
@@ -249,3 +300,24 @@ class Strategy(Protocol):
     def create_decisions(self, given: DecisionInput) -> None:
         """Create trading decisions from indicators."""
         ...
+
+
+@runtime_checkable
+class VectorizedStrategy(Strategy, Protocol):
+    """Protocol for strategies that decide over whole arrays at once.
+
+    Instead of making decisions moment by moment, the strategy fills
+    target exposures of every row, which are positive for long positions,
+    negative for short positions, zero for no position, and `NaN` to keep
+    the position as is. Each row should only depend on data until that row.
+    `create_decisions` is not called for these strategies.
+
+    When trading live, exposures are created over recent rows
+    and the last one is followed. A strategy can optionally have
+    `exposure_lookback`, the number of rows that a row's exposure depends on,
+    if it needs more rows than `EXPOSURE_LOOKBACK`.
+    """
+
+    def create_exposures(self, given: ExposureInput) -> None:
+        """Create target exposures from candle data and indicators."""
+        ...
@@ -0,0 +1,114 @@
+"""Time series container for data on a regular time grid."""
+
+from typing import Self
+
+import numpy as np
+import pandas as pd
+
+from .timing import MOMENT_MS, from_epoch_ms
+
+
+class GridFrame:
+    """Columns of `float32` values sampled on a regular time grid.
+
+    Instead of an index with a timestamp for every row,
+    only the time of the first row and the step between rows are stored,
+    both in epoch milliseconds. Times are turned into row offsets
+    with arithmetic, and slices are views that don't copy values.
+    """
+
+    def __init__(
+        self,
+        start: int,
+        step: int,
+        values: np.ndarray,
+        columns: list[str],
+    ) -> None:
+        """Initialize with the grid and values of shape `(rows, columns)`."""
+        if step <= 0:
+            msg = "The step of the grid should be bigger than zero"
+            raise ValueError(msg)
+        if values.shape[1:] != (len(columns),):
+            msg = "Values should have a column for each column name"
+            raise ValueError(msg)
+        self.start = start
+        self.step = step
+        self.values = values
+        self.columns = columns
+        self._column_slots = {c: i for i, c in enumerate(columns)}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, step: int = MOMENT_MS) -> Self:
+        """Place a data frame with a datetime index on the grid.
+
+        Rows missing from the grid are filled with `NaN`.
+        Values are not copied if the frame is already a regular grid
+        made of a single `float32` block.
+        """
+        columns = [str(c) for c in frame.columns]
+        if len(frame) == 0:
+            return cls(0, step, np.empty((0, len(columns)), np.float32), columns)
+
+        index: pd.DatetimeIndex = frame.index  # type:ignore
+        moments = index.to_numpy("datetime64[ms]").astype(np.int64)
+        start = int(moments.min())
+        start -= start % step
+        frame_values = frame.to_numpy(dtype=np.float32)
+
+        row_offsets = moments - start
+        if np.array_equal(row_offsets, np.arange(len(moments)) * step):
+            return cls(start, step, frame_values, columns)
+
+        row_count = int(row_offsets.max()) // step + 1
+        values = np.full((row_count, len(columns)), np.nan, dtype=np.float32)
+        values[row_offsets // step] = frame_values
+        return cls(start, step, values, columns)
+
+    def __len__(self) -> int:
+        """Get the number of rows."""
+        return len(self.values)
+
+    def locate(self, moment: int) -> int:
+        """Get the offset of the first row at or after a moment."""
+        offset = -((self.start - moment) // self.step)
+        return min(max(offset, 0), len(self.values))
+
+    def slice_time(self, slice_from: int, slice_until: int) -> Self:
+        """Get rows from and until moments, both inclusive, without copying."""
+        row_from = self.locate(slice_from)
+        row_until = max(self.locate(slice_until + 1), row_from)
+        return type(self)(
+            self.start + row_from * self.step,
+            self.step,
+            self.values[row_from:row_until],
+            self.columns,
+        )
+
+    def to_numpy(self) -> np.ndarray:
+        """Get values of shape `(rows, columns)` without copying."""
+        return self.values
+
+    def column(self, name: str) -> np.ndarray:
+        """Get values of a column as a view."""
+        return self.values[:, self._column_slots[name]]
+
+    def times(self) -> np.ndarray:
+        """Get epoch milliseconds of each row."""
+        return self.start + np.arange(len(self.values), dtype=np.int64) * self.step
+
+    def make_index(self) -> pd.DatetimeIndex:
+        """Build a pandas index of the grid on demand."""
+        return pd.date_range(
+            from_epoch_ms(self.start),
+            periods=len(self.values),
+            freq=pd.Timedelta(milliseconds=self.step),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """View the values as a pandas data frame, without copying them."""
+        return pd.DataFrame(
+            self.values,
+            index=self.make_index(),
+            columns=self.columns,
+            copy=False,
+        )
@@ -0,0 +1,119 @@
+"""Dictionary view over a row of numeric values."""
+
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING, Any, SupportsFloat
+
+if TYPE_CHECKING:
+    from _collections_abc import dict_items, dict_keys, dict_values
+
+
+class LazyRow(dict[str, float]):
+    """Dictionary that converts values of a row only when they are accessed.
+
+    Column names are mapped to positions in the row.
+    Because this is a real `dict`, it can be passed wherever `dict[str, float]`
+    is expected, and it turns into a plain dictionary once fully read.
+    """
+
+    def __init__(
+        self,
+        columns: dict[str, int],
+        values: Sequence[SupportsFloat],
+    ) -> None:
+        """Initialize with a column position map and row values."""
+        super().__init__()
+        self._columns = columns
+        self._values = values
+        self._is_filled = False
+
+    def __missing__(self, key: str) -> float:
+        """Convert the value of a column that wasn't read yet."""
+        if self._is_filled:
+            raise KeyError(key)
+        value = float(self._values[self._columns[key]])
+        super().__setitem__(key, value)
+        return value
+
+    def _fill(self) -> None:
+        """Convert values of all columns that weren't read yet."""
+        if self._is_filled:
+            return
+        # Rebuild in column order, keeping values that were already assigned
+        assigned = dict(super().items())
+        super().clear()
+        for key, position in self._columns.items():
+            value = assigned.pop(key, None)
+            if value is None:
+                value = float(self._values[position])
+            super().__setitem__(key, value)
+        super().update(assigned)
+        self._is_filled = True
+
+    def __contains__(self, key: object) -> bool:
+        """Check whether the column exists."""
+        if self._is_filled:
+            return super().__contains__(key)
+        return key in self._columns or super().__contains__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of a column, or the default if it doesn't exist."""
+        if key in self:
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over column names."""
+        self._fill()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        """Return the number of columns."""
+        self._fill()
+        return super().__len__()
+
+    def __repr__(self) -> str:
+        """Represent as a plain dictionary."""
+        self._fill()
+        return super().__repr__()
+
+    def __eq__(self, other: object) -> bool:
+        """Compare as a plain dictionary."""
+        self._fill()
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __delitem__(self, key: str) -> None:
+        """Remove a column."""
+        self._fill()
+        super().__delitem__(key)
+
+    def keys(self) -> "dict_keys[str, float]":
+        """Return column names."""
+        self._fill()
+        return super().keys()
+
+    def values(self) -> "dict_values[str, float]":
+        """Return converted values."""
+        self._fill()
+        return super().values()
+
+    def items(self) -> "dict_items[str, float]":
+        """Return pairs of column names and converted values."""
+        self._fill()
+        return super().items()
+
+    def pop(self, key: str, *args: Any) -> Any:
+        """Remove a column and return its value."""
+        self._fill()
+        return super().pop(key, *args)
+
+    def popitem(self) -> tuple[str, float]:
+        """Remove and return the last column."""
+        self._fill()
+        return super().popitem()
+
+    def copy(self) -> dict[str, float]:
+        """Return a plain dictionary with all values converted."""
+        self._fill()
+        return dict(super().items())
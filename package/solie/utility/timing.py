@@ -1,10 +1,13 @@
 """Performance timing and duration recording utilities."""
 
 from collections import deque
-from datetime import datetime, timedelta
-from time import perf_counter
+from datetime import UTC, datetime, timedelta
+from time import perf_counter, time_ns
 from typing import ClassVar, NamedTuple
 
+MOMENT_MS = 10_000
+_UNIX_EPOCH = datetime.fromtimestamp(0.0, tz=UTC)
+
 
 class DurationRecord(NamedTuple):
     """Record of task duration with timestamp."""
@@ -63,3 +66,27 @@ def to_moment(exact_time: datetime) -> datetime:
     """
     moment = exact_time.replace(microsecond=0)
     return moment - timedelta(seconds=moment.second % 10)
+
+
+def to_moment_ms(exact_time_ms: int) -> int:
+    """Convert epoch milliseconds to the moment they belong to."""
+    return exact_time_ms - exact_time_ms % MOMENT_MS
+
+
+def to_epoch_ms(exact_time: datetime) -> int:
+    """Convert a timezone-aware time to integer epoch milliseconds.
+
+    Epoch milliseconds are used in hot paths instead of `datetime`
+    to avoid creating objects, and converted back only at the boundaries.
+    """
+    return (exact_time - _UNIX_EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_ms(epoch_ms: int) -> datetime:
+    """Convert integer epoch milliseconds to a time in UTC."""
+    return _UNIX_EPOCH + timedelta(milliseconds=epoch_ms)
+
+
+def now_epoch_ms() -> int:
+    """Get the current time as integer epoch milliseconds."""
+    return time_ns() // 1_000_000
@@ -65,8 +65,11 @@ class SavedStrategy(BaseModel):
     description: str = "A blank strategy template before being written"
     risk_level: RiskLevel = RiskLevel.HIGH
     parallel_simulation_chunk_days: int | None = 30
+    decision_interval: int | None = None
+    symbol_independent: bool = False
     indicator_script: str = "pass"
     decision_script: str = "pass"
+    parameters: dict[str, float] = {}
 
     _compiled_indicator_script: CodeType | None = None
     _compiled_decision_script: CodeType | None = None
@@ -86,6 +89,7 @@ class SavedStrategy(BaseModel):
             "target_symbols": target_symbols,
             "candle_data": candle_data,
             "new_indicators": new_indicators,
+            "parameters": self.parameters,
         }
         exec(code, namespace)
 
@@ -112,6 +116,7 @@ class SavedStrategy(BaseModel):
             "account_state": account_state,
             "scribbles": scribbles,
             "decisions": new_decisions,
+            "parameters": self.parameters,
         }
         exec(code, namespace)
 
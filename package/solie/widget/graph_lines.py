@@ -21,6 +21,7 @@ from solie.utility import (
     MIN_SERIES_LENGTH,
     AggregateTrade,
     BookTicker,
+    GridFrame,
     MarkPrice,
     PercentAxisItem,
     TimeAxisItem,
@@ -34,6 +35,17 @@ class LinePair(NamedTuple):
     line_b: PlotDataItem
 
 
+def _extend_line(line: PlotDataItem, data_x: np.ndarray, data_y: np.ndarray) -> None:
+    """Add points after those already in a plot line."""
+    if len(data_x) == 0:
+        return
+    before_x, before_y = line.getOriginalDataset()
+    if before_x is not None and before_y is not None:
+        data_x = np.concatenate((before_x, data_x))
+        data_y = np.concatenate((before_y, data_y))
+    line.setData(data_x, data_y)
+
+
 class GraphLines:
     """Widget for plotting price, volume, and asset graphs."""
 
@@ -355,7 +367,7 @@ class GraphLines:
     async def update_heavy_lines(
         self,
         symbol: str,
-        candle_data: pd.DataFrame,
+        candle_data: GridFrame,
         asset_record: pd.DataFrame,
         unrealized_changes: pd.Series,
     ) -> None:
@@ -375,14 +387,14 @@ class GraphLines:
     def _prepare_candle_arrays(
         self,
         symbol: str,
-        candle_data: pd.DataFrame,
+        candle_data: GridFrame,
     ) -> dict[str, np.ndarray]:
         """Prepare numpy arrays from candle data."""
-        index_ar = candle_data.index.to_numpy(dtype=np.int64) / 10**9
-        open_ar = candle_data[f"{symbol}/OPEN"].to_numpy()
-        close_ar = candle_data[f"{symbol}/CLOSE"].to_numpy()
-        high_ar = candle_data[f"{symbol}/HIGH"].to_numpy()
-        low_ar = candle_data[f"{symbol}/LOW"].to_numpy()
+        index_ar = candle_data.times() / 10**3
+        open_ar = candle_data.column(f"{symbol}/OPEN")
+        close_ar = candle_data.column(f"{symbol}/CLOSE")
+        high_ar = candle_data.column(f"{symbol}/HIGH")
+        low_ar = candle_data.column(f"{symbol}/LOW")
 
         length = len(index_ar)
         nan_ar = np.empty(length)
@@ -459,28 +471,23 @@ class GraphLines:
     async def _update_wobbles_and_volume(
         self,
         symbol: str,
-        candle_data: pd.DataFrame,
+        candle_data: GridFrame,
     ) -> None:
         """Update wobbles and volume lines."""
+        data_x = candle_data.times() / 10**3
+
         # High wobble
-        sr = candle_data[f"{symbol}/HIGH"]
-        data_x = sr.index.to_numpy(dtype=np.int64) / 10**9
-        data_y = sr.to_numpy(dtype=np.float32)
+        data_y = candle_data.column(f"{symbol}/HIGH")
         self.wobbles.line_a.setData(data_x, data_y)
         await sleep(0.0)
 
         # Low wobble
-        sr = candle_data[f"{symbol}/LOW"]
-        data_x = sr.index.to_numpy(dtype=np.int64) / 10**9
-        data_y = sr.to_numpy(dtype=np.float32)
+        data_y = candle_data.column(f"{symbol}/LOW")
         self.wobbles.line_b.setData(data_x, data_y)
         await sleep(0.0)
 
         # Volume
-        sr = candle_data[f"{symbol}/VOLUME"]
-        sr = sr.fillna(value=0)
-        data_x = sr.index.to_numpy(dtype=np.int64) / 10**9
-        data_y = sr.to_numpy(dtype=np.float32)
+        data_y = np.nan_to_num(candle_data.column(f"{symbol}/VOLUME"), nan=0.0)
         self.volume.setData(data_x, data_y)
         await sleep(0.0)
 
@@ -526,10 +533,48 @@ class GraphLines:
         self.buy.setData(data_x, data_y)
         await sleep(0.0)
 
-    async def update_custom_lines(self, symbol: str, indicators: pd.DataFrame) -> None:
+    async def append_asset_lines(
+        self,
+        symbol: str,
+        asset_record: pd.DataFrame,
+        unrealized_changes: pd.Series,
+        last_asset: float,
+    ) -> None:
+        """Extend asset lines with rows after those already drawn.
+
+        Asset with unrealized profit continues from `last_asset`,
+        which was the result asset before the first new row.
+        """
+        # Result asset
+        sr = asset_record["RESULT_ASSET"]
+        data_x = sr.index.to_numpy(dtype=np.int64) / 10**9
+        data_y = sr.to_numpy(dtype=np.float32)
+        _extend_line(self.asset, data_x, data_y)
+        await sleep(0.0)
+
+        # Asset with unrealized profit
+        moments = unrealized_changes.index
+        held_sr = sr.reindex(sr.index.union(moments)).ffill().reindex(moments)
+        held_sr = held_sr.fillna(last_asset).astype(np.float64)
+        held_sr = held_sr * (1 + unrealized_changes)
+        data_x = moments.to_numpy(dtype=np.int64) / 10**9 + 5
+        data_y = held_sr.to_numpy(dtype=np.float32)
+        _extend_line(self.asset_with_unrealized_profit, data_x, data_y)
+        await sleep(0.0)
+
+        # Trades
+        df = asset_record.loc[asset_record["SYMBOL"] == symbol]
+        for side, line in (("SELL", self.sell), ("BUY", self.buy)):
+            sr = df.loc[df["SIDE"] == side, "FILL_PRICE"]
+            data_x = sr.index.to_numpy(dtype=np.int64) / 10**9
+            data_y = sr.to_numpy(dtype=np.float32)
+            _extend_line(line, data_x, data_y)
+        await sleep(0.0)
+
+    async def update_custom_lines(self, symbol: str, indicators: GridFrame) -> None:
         """Update custom indicator lines."""
-        columns = [str(n) for n in indicators.columns]
-        data_x = indicators.index.to_numpy(dtype=np.int64) / 10**9
+        columns = indicators.columns
+        data_x = indicators.times() / 10**3
         data_x += 5
 
         chosen_columns = [n for n in columns if n.startswith(f"{symbol}/PRICE")]
@@ -538,8 +583,7 @@ class GraphLines:
                 widget.clear()
                 continue
             column = chosen_columns[index]
-            sr = indicators[column]
-            data_y = sr.to_numpy(dtype=np.float32)
+            data_y = indicators.column(column)
             inside_strings = re.findall(r"\(([^)]+)", column)
             color = "#AAAAAA" if len(inside_strings) == 0 else inside_strings[0]
             widget.setPen(color)
@@ -552,8 +596,7 @@ class GraphLines:
                 widget.clear()
                 continue
             column = chosen_columns[index]
-            sr = indicators[column]
-            data_y = sr.to_numpy(dtype=np.float32)
+            data_y = indicators.column(column)
             inside_strings = re.findall(r"\(([^)]+)", column)
             color = "#AAAAAA" if len(inside_strings) == 0 else inside_strings[0]
             widget.setPen(color)
@@ -566,8 +609,7 @@ class GraphLines:
                 widget.clear()
                 continue
             column = chosen_columns[index]
-            sr = indicators[column]
-            data_y = sr.to_numpy(dtype=np.float32)
+            data_y = indicators.column(column)
             inside_strings = re.findall(r"\(([^)]+)", column)
             color = "#AAAAAA" if len(inside_strings) == 0 else inside_strings[0]
             widget.setPen(color)
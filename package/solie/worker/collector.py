@@ -3,7 +3,7 @@
 import math
 import random
 import webbrowser
-from asyncio import Lock, gather, sleep
+from asyncio import Lock, gather, sleep, to_thread
 from collections import deque
 from datetime import UTC, datetime, timedelta
 from logging import getLogger
@@ -21,9 +21,18 @@ from solie.common import UniqueTask, outsource, spawn, spawn_blocking
 from solie.logic import (
     DownloadPreset,
     DownloadUnitSize,
+    append_candle_journal,
+    collect_moment_aggtrades,
     download_aggtrade_csv,
     fill_holes_with_aggtrades,
+    get_archive_folder,
+    get_journal_path,
     process_aggtrade_csv,
+    read_archive_manifest,
+    read_candle_archive,
+    read_candle_journal,
+    update_candle_archive,
+    write_candle_archive,
 )
 from solie.overlay import (
     DonationGuide,
@@ -33,6 +42,7 @@ from solie.overlay import (
 )
 from solie.utility import (
     MAX_REQUEST_RETRIES,
+    MOMENT_MS,
     PROGRESS_BAR_MAX,
     AggregateTrade,
     ApiRequester,
@@ -45,10 +55,14 @@ from solie.utility import (
     combine_candle_data,
     create_empty_candle_data,
     format_numeric,
+    from_epoch_ms,
     internet_connected,
+    now_epoch_ms,
     slice_deque,
     sort_data_frame,
+    to_epoch_ms,
     to_moment,
+    to_moment_ms,
     when_internet_disconnected,
 )
 from solie.widget import overlay
@@ -58,6 +72,8 @@ from .united import team
 
 logger = getLogger(__name__)
 
+HOLE_FILL_DAYS = 2
+
 
 class Collector:
     """Worker for collecting market data from Binance."""
@@ -72,6 +88,7 @@ class Collector:
         self._markets_gone = set[str]()  # Symbols
 
         self._download_fill_task = UniqueTask()
+        self._compaction_lock = Lock()
 
         self._api_requester = ApiRequester()
 
@@ -116,9 +133,9 @@ class Collector:
             minute="*",
         )
         self._scheduler.add_job(
-            self._save_candle_data,
+            self._compact_candle_journal,
             trigger="cron",
-            hour="*",
+            hour="*/6",
         )
 
         self._mark_price_streamer = ApiStreamer(
@@ -168,19 +185,16 @@ class Collector:
     async def load_work(self) -> None:
         """Load saved candle data from disk."""
         await aiofiles.os.makedirs(self._workerpath, exist_ok=True)
+        await self._recover_candle_journals()
 
         current_year = datetime.now(UTC).year
         async with self.candle_data.write_lock as cell:
-            filepath = self._workerpath / f"candle_data_{current_year}.pickle"
-            if await aiofiles.os.path.isfile(filepath):
-                df: pd.DataFrame = await spawn_blocking(pd.read_pickle, filepath)
-                if not df.index.is_monotonic_increasing:
-                    df = await spawn_blocking(sort_data_frame, df)
-                cell.data = df
+            if current_year in await self.check_saved_years():
+                cell.data = await self.read_saved_candle_data(current_year)
 
     async def dump_work(self) -> None:
         """Save candle data to disk."""
-        await self._save_candle_data()
+        await self._compact_candle_journal()
 
     async def _organize_data(self) -> None:
         duration_recorder = DurationRecorder("ORGANIZE_COLLECTOR_DATA")
@@ -195,24 +209,108 @@ class Collector:
 
         duration_recorder.record()
 
-    async def _save_candle_data(self) -> None:
+    async def _compact_candle_journal(self, *, rewrite: bool = False) -> None:
+        """Move candle rows of this year from the journal into the archive.
+
+        Only rows that new candles or hole filling could have changed
+        are written in place, unless the whole year should be rewritten.
+        """
         current_year = datetime.now(UTC).year
-        filepath = self._workerpath / f"candle_data_{current_year}.pickle"
-        filepath_new = self._workerpath / f"candle_data_{current_year}.pickle.new"
-        filepath_backup = self._workerpath / f"candle_data_{current_year}.pickle.backup"
+        journal_path = get_journal_path(self._workerpath, current_year)
+        compacting_path = journal_path.with_name(f"{journal_path.name}.old")
+        folder = get_archive_folder(self._workerpath, current_year)
+
+        async with self._compaction_lock:
+            rewrite_from: datetime | None = None
+            if not rewrite and await aiofiles.os.path.isdir(folder):
+                manifest = read_archive_manifest(folder)
+                archive_until = manifest.start + manifest.row_count * manifest.step
+                recent_from = to_moment(datetime.now(UTC))
+                recent_from -= timedelta(days=HOLE_FILL_DAYS)
+                rewrite_from = min(from_epoch_ms(archive_until), recent_from)
 
-        async with self.candle_data.read_lock as cell:
-            mask = cell.data.index.year == current_year  # type:ignore
-            year_df: pd.DataFrame = cell.data[mask].copy()
+            async with self.candle_data.read_lock as cell:
+                mask = cell.data.index.year == current_year  # type:ignore
+                if rewrite_from is not None:
+                    mask &= cell.data.index >= rewrite_from
+                year_df: pd.DataFrame = cell.data[mask].copy()
+                # Candles added from now on go to a new journal
+                if await aiofiles.os.path.isfile(journal_path):
+                    await aiofiles.os.replace(journal_path, compacting_path)
+
+            if rewrite_from is None:
+                # The snapshot already holds the whole year
+                await spawn_blocking(write_candle_archive, folder, year_df)
+            elif not await spawn_blocking(update_candle_archive, folder, year_df):
+                async with self.candle_data.read_lock as cell:
+                    mask = cell.data.index.year == current_year  # type:ignore
+                    year_df = cell.data[mask].copy()
+                await spawn_blocking(write_candle_archive, folder, year_df)
+
+            if await aiofiles.os.path.isfile(compacting_path):
+                await aiofiles.os.remove(compacting_path)
+
+    async def _recover_candle_journals(self) -> None:
+        """Move candle rows left in journals by an unexpected exit into archives."""
+        journal_years: set[int] = set()
+        for filename in await aiofiles.os.listdir(self._workerpath):
+            if not filename.startswith("candle_journal_"):
+                continue
+            year_text = filename.removeprefix("candle_journal_").partition(".")[0]
+            if year_text.isdigit():
+                journal_years.add(int(year_text))
+
+        for year in sorted(journal_years):
+            await self._recover_candle_journal(year)
+
+    async def _recover_candle_journal(self, year: int) -> None:
+        journal_path = get_journal_path(self._workerpath, year)
+        compacting_path = journal_path.with_name(f"{journal_path.name}.old")
+        # Newer rows go first because they take precedence when combined
+        journal_dfs: list[pd.DataFrame] = []
+        for filepath in (journal_path, compacting_path):
+            if await aiofiles.os.path.isfile(filepath):
+                journal_df = await spawn_blocking(read_candle_journal, filepath)
+                if len(journal_df) > 0:
+                    journal_dfs.append(journal_df)
 
-        await spawn_blocking(year_df.to_pickle, filepath_new)
+        if journal_dfs:
+            await self._store_journal_rows(year, journal_dfs)
+            logger.info("Recovered candle data of year %d from journal", year)
+
+        for filepath in (journal_path, compacting_path):
+            if await aiofiles.os.path.isfile(filepath):
+                await aiofiles.os.remove(filepath)
+
+    async def _store_journal_rows(
+        self,
+        year: int,
+        journal_dfs: list[pd.DataFrame],
+    ) -> None:
+        folder = get_archive_folder(self._workerpath, year)
+        journal_df = await spawn_blocking(combine_candle_data, journal_dfs)
+        has_saved_data = year in await self.check_saved_years()
+        if has_saved_data and not await aiofiles.os.path.isdir(folder):
+            await self._archive_legacy_pickle(year)
+
+        if has_saved_data:
+            saved_df = await to_thread(
+                read_candle_archive,
+                folder,
+                slice_from=journal_df.index[0],
+            )
+            recent_df = await spawn_blocking(
+                combine_candle_data,
+                [journal_df, saved_df],
+            )
+            if await spawn_blocking(update_candle_archive, folder, recent_df):
+                return
 
-        if await aiofiles.os.path.isfile(filepath_backup):
-            await aiofiles.os.remove(filepath_backup)
-        if await aiofiles.os.path.isfile(filepath):
-            await aiofiles.os.rename(filepath, filepath_backup)
-        if await aiofiles.os.path.isfile(filepath_new):
-            await aiofiles.os.rename(filepath_new, filepath)
+        year_dfs = [journal_df]
+        if has_saved_data:
+            year_dfs.append(await to_thread(read_candle_archive, folder))
+        year_df = await spawn_blocking(combine_candle_data, year_dfs)
+        await spawn_blocking(write_candle_archive, folder, year_df)
 
     async def get_exchange_information(self) -> None:
         """Fetch exchange information from Binance."""
@@ -246,7 +344,7 @@ class Collector:
             return
 
         current_moment = to_moment(datetime.now(UTC))
-        split_moment = current_moment - timedelta(days=2)
+        split_moment = current_moment - timedelta(days=HOLE_FILL_DAYS)
         target_symbols = self._window.data_settings.target_symbols
 
         # only the recent part
@@ -350,17 +448,14 @@ class Collector:
 
         # Fill the gaps
         last_fetched_id = max(aggtrades.keys())
-        last_fetched_time = datetime.fromtimestamp(
-            aggtrades[last_fetched_id].timestamp / 1000,
-            tz=UTC,
-        )
+        last_fetched_time = aggtrades[last_fetched_id].timestamp
 
         await spawn_blocking(
             fill_holes_with_aggtrades,
             symbol,
             recent_candle_data,
             aggtrades,
-            moment_to_fill_from,
+            to_epoch_ms(moment_to_fill_from),
             last_fetched_time,
         )
         return True
@@ -372,13 +467,14 @@ class Collector:
     ) -> dict[int, AggregateTrade] | None:
         """Fetch aggregate trades to fill a data gap."""
         aggtrades: dict[int, AggregateTrade] = {}
-        last_fetched_time = moment_to_fill_from
+        fill_from = to_epoch_ms(moment_to_fill_from)
+        last_fetched_time = fill_from
 
-        while last_fetched_time < moment_to_fill_from + timedelta(seconds=10):
+        while last_fetched_time < fill_from + MOMENT_MS:
             # intend to fill at least one 10 second candle bar
             payload = {
                 "symbol": symbol,
-                "startTime": int(last_fetched_time.timestamp() * 1000),
+                "startTime": last_fetched_time,
                 "limit": 1000,
             }
             response = await self._api_requester.binance(
@@ -402,10 +498,7 @@ class Collector:
                 aggtrades[aggtrade_id] = aggtrade
 
             last_fetched_id = max(aggtrades.keys())
-            last_fetched_time = datetime.fromtimestamp(
-                aggtrades[last_fetched_id].timestamp / 1000,
-                tz=UTC,
-            )
+            last_fetched_time = aggtrades[last_fetched_id].timestamp
 
         return aggtrades
 
@@ -720,8 +813,9 @@ class Collector:
         """Save downloaded data to disk or merge with current data."""
         if preset_year < current_year:
             await spawn_blocking(
-                combined_df.to_pickle,
-                self._workerpath / f"candle_data_{preset_year}.pickle",
+                write_candle_archive,
+                get_archive_folder(self._workerpath, preset_year),
+                combined_df,
             )
             logger.info("Saved candle data of year %d to disk", preset_year)
         else:
@@ -730,7 +824,7 @@ class Collector:
                     combine_candle_data,
                     [combined_df, cell_worker.data],
                 )
-            await self._save_candle_data()
+            await self._compact_candle_journal(rewrite=True)
             logger.info("Filled the candle data with the downloaded history data")
 
         spawn(team.transactor.display_lines())
@@ -797,10 +891,8 @@ class Collector:
     async def _add_candle_data(self) -> None:
         duration_recorder = DurationRecorder("ADD_CANDLE_DATA")
 
-        current_moment = to_moment(datetime.now(UTC))
-        before_moment = current_moment - timedelta(seconds=10.0)
-        collect_from = int(before_moment.timestamp()) * 1000
-        collect_to = int(current_moment.timestamp()) * 1000
+        collect_to = to_moment_ms(now_epoch_ms())
+        collect_from = collect_to - MOMENT_MS
         aggregate_trades = self.aggregate_trades
 
         # Ensure that the data have been watched for long enough.
@@ -809,26 +901,18 @@ class Collector:
             return
 
         # Collect trades that should be included in the candle.
-        collected_aggregate_trades: list[AggregateTrade] = []
-        for aggregate_trade in reversed(aggregate_trades):
-            if aggregate_trade.timestamp < collect_from - 1000:
-                # Go additional 1000 milliseconds backward.
-                break
-            collected_aggregate_trades.append(aggregate_trade)
-        if len(collected_aggregate_trades) == 0:
+        target_symbols = self._window.data_settings.target_symbols
+        trades_by_symbol = collect_moment_aggtrades(
+            aggregate_trades,
+            target_symbols,
+            collect_from,
+        )
+        if trades_by_symbol is None:
             return
-        collected_aggregate_trades.reverse()  # Sort by time
-        collected_aggregate_trades = [
-            t
-            for t in collected_aggregate_trades
-            if collect_from < t.timestamp < collect_to
-        ]
 
         new_values: dict[str, float] = {}
-        for symbol in self._window.data_settings.target_symbols:
-            symbol_aggregate_trades = [
-                t for t in collected_aggregate_trades if t.symbol == symbol
-            ]
+        for symbol in target_symbols:
+            symbol_aggregate_trades = trades_by_symbol[symbol]
             self.aggtrade_candle_sizes[symbol] = len(symbol_aggregate_trades)
 
             if len(symbol_aggregate_trades) > 0:
@@ -856,12 +940,23 @@ class Collector:
             new_values[f"{symbol}/CLOSE"] = close_price
             new_values[f"{symbol}/VOLUME"] = sum_volume
 
+        before_moment = from_epoch_ms(collect_from)
         async with self.candle_data.write_lock as cell:
             for column_name, new_data_value in new_values.items():
                 cell.data.loc[before_moment, column_name] = np.float32(new_data_value)
             if not cell.data.index.is_monotonic_increasing:
                 cell.data = await spawn_blocking(sort_data_frame, cell.data)
 
+        # Written after the row is in memory, so that compaction either
+        # includes the row or leaves it in the new journal.
+        # A thread is used so that it doesn't wait behind simulation chunks.
+        await to_thread(
+            append_candle_journal,
+            get_journal_path(self._workerpath, before_moment.year),
+            collect_from,
+            new_values,
+        )
+
         duration_recorder.record()
 
     async def _stop_filling_candle_data(self) -> None:
@@ -871,15 +966,37 @@ class Collector:
         await overlay(DonationGuide())
 
     async def check_saved_years(self) -> list[int]:
-        """Get list of years with saved candle data."""
-        return [
-            int(format_numeric(filename))
-            for filename in await aiofiles.os.listdir(self._workerpath)
-            if filename.startswith("candle_data_") and filename.endswith(".pickle")
-        ]
+        """Get list of years with saved candle data.
+
+        Pickles saved by older versions are also counted.
+        """
+        saved_years: set[int] = set()
+        for filename in await aiofiles.os.listdir(self._workerpath):
+            if not filename.startswith("candle_data_"):
+                continue
+            is_archive = filename.removeprefix("candle_data_").isdigit()
+            if is_archive or filename.endswith(".pickle"):
+                saved_years.add(int(format_numeric(filename)))
+        return sorted(saved_years)
+
+    async def read_saved_candle_data(
+        self,
+        year: int,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Read saved candle data for specific year.
+
+        Only the chosen columns are read from the memory-mapped archive.
+        A pickle saved by an older version is turned into an archive first.
+        """
+        folder = get_archive_folder(self._workerpath, year)
+        if not await aiofiles.os.path.isdir(folder):
+            await self._archive_legacy_pickle(year)
+        return await to_thread(read_candle_archive, folder, columns)
 
-    async def read_saved_candle_data(self, year: int) -> pd.DataFrame:
-        """Read saved candle data for specific year."""
+    async def _archive_legacy_pickle(self, year: int) -> None:
         filepath = self._workerpath / f"candle_data_{year}.pickle"
         candle_data: pd.DataFrame = await spawn_blocking(pd.read_pickle, filepath)
-        return candle_data
+        folder = get_archive_folder(self._workerpath, year)
+        await spawn_blocking(write_candle_archive, folder, candle_data)
+        logger.info("Moved candle data of year %d into an archive", year)
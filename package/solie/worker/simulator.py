@@ -1,12 +1,12 @@
 """Trading strategy simulation worker."""
 
-import pickle
+import math
+from asyncio import sleep, to_thread
 from datetime import UTC, datetime, timedelta
 from typing import Any, NamedTuple
 
 import aiofiles
 import aiofiles.os
-import numpy as np
 import pandas as pd
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from PySide6.QtWidgets import QMenu
@@ -15,26 +15,46 @@ from scipy.signal import find_peaks
 from solie.common import UniqueTask, outsource, spawn, spawn_blocking
 from solie.logic import (
     CalculationConfig,
+    CalculationContext,
+    CalculationResult,
+    IndicatorCache,
+    MultiYearCalculator,
+    ParameterSweep,
     SimulationCalculator,
     WidgetReferences,
-    make_indicators,
+    calculate_asset_changes,
+    find_live_window_from,
+    get_legacy_result_paths,
+    make_result_prefix,
+    read_checkpoint,
+)
+from solie.overlay import (
+    ParameterSweepInput,
+    SweepRankingView,
+    YearSelection,
 )
 from solie.utility import (
+    LIVE_CALCULATION_SPAN,
+    LIVE_CANDLE_DELAY,
     MIN_PEAK_COUNT,
-    AccountState,
+    PROGRESS_BAR_MAX,
     DurationRecorder,
+    GridFrame,
     PositionDirection,
     RWLock,
     SimulationSettings,
     SimulationSummary,
+    Strategy,
+    SweepOptions,
     create_empty_account_state,
     create_empty_asset_record,
+    create_empty_candle_data,
     create_empty_unrealized_changes,
     sort_data_frame,
     sort_series,
     to_moment,
 )
-from solie.widget import ask
+from solie.widget import ask, overlay
 from solie.window import Window
 
 from .united import team
@@ -90,6 +110,7 @@ class Simulator:
         self._window = window
         self._scheduler = scheduler
         self._workerpath = window.datapath / "simulator"
+        self._indicator_cache = IndicatorCache(self._workerpath / "indicator_cache")
 
         self._line_display_task = UniqueTask()
         self._range_display_task = UniqueTask()
@@ -97,6 +118,13 @@ class Simulator:
 
         self._viewing_symbol = window.data_settings.target_symbols[0]
         self._should_draw_all_years = False
+        self._should_follow_live = False
+
+        # Latest stored result, which live calculation continues from
+        self._live_result: CalculationResult | None = None
+        self._live_result_prefix: str | None = None
+        # Result that the presented data comes from, if it's a calculated one
+        self._presented_result: CalculationResult | None = None
 
         self._simulation_settings = SimulationSettings(
             year=datetime.now(UTC).year,
@@ -128,6 +156,11 @@ class Simulator:
             hour="*",
             kwargs={"periodic": True},
         )
+        self._scheduler.add_job(
+            self._follow_live_candles,
+            trigger="cron",
+            second="*/10",
+        )
 
         self._connect_ui_events()
 
@@ -163,6 +196,11 @@ class Simulator:
         job = self._update_viewing_symbol
         outsource(window.comboBox_6.currentIndexChanged, job)
 
+        self._connect_menu_actions()
+
+    def _connect_menu_actions(self) -> None:
+        window = self._window
+
         action_menu = QMenu(window)
         window.pushButton_11.setMenu(action_menu)
 
@@ -170,10 +208,24 @@ class Simulator:
         job = self._simulate_only_visible
         new_action = action_menu.addAction(text)
         outsource(new_action.triggered, job)
+        text = "Calculate on multiple years at once"
+        job = self._calculate_years
+        new_action = action_menu.addAction(text)
+        outsource(new_action.triggered, job)
+        text = "Sweep parameters of this strategy"
+        job = self._sweep_parameters
+        new_action = action_menu.addAction(text)
+        outsource(new_action.triggered, job)
         text = "Stop calculation"
         job = self._stop_calculation
         new_action = action_menu.addAction(text)
         outsource(new_action.triggered, job)
+        text = "Keep calculation up to date with live candles"
+        job = self._toggle_live_following
+        new_action = action_menu.addAction(text)
+        new_action.setCheckable(True)
+        outsource(new_action.toggled, job)
+        self._live_following_action = new_action
         text = "Find spots with lowest unrealized profit"
         job = self._analyze_unrealized_peaks
         new_action = action_menu.addAction(text)
@@ -256,10 +308,12 @@ class Simulator:
         years: list[int],
         slice_from: datetime,
     ) -> CandleDataPair:
-        """Load candle data for specified years."""
+        """Load candle data of the viewing symbol for specified years."""
+        empty_candle_data = create_empty_candle_data([self._viewing_symbol])
+        columns = [str(c) for c in empty_candle_data.columns]
         divided_datas: list[pd.DataFrame] = []
         for year in years:
-            more_df = await team.collector.read_saved_candle_data(year)
+            more_df = await team.collector.read_saved_candle_data(year, columns)
             divided_datas.append(more_df)
         candle_data_original = await spawn_blocking(pd.concat, divided_datas)
         if not candle_data_original.index.is_monotonic_increasing:
@@ -388,20 +442,22 @@ class Simulator:
 
         await self._window.simulation_graph.update_heavy_lines(
             symbol=symbol,
-            candle_data=candle_pair.sliced,
+            candle_data=GridFrame.from_frame(candle_pair.sliced),
             asset_record=asset_record,
             unrealized_changes=unrealized_changes,
         )
 
-        indicators = await spawn_blocking(
-            make_indicators,
+        indicators = await self._indicator_cache.make_indicators(
             strategy=strategy,
             target_symbols=[self._viewing_symbol],
             candle_data=candle_pair.original,
         )
         indicators = indicators[time_range.slice_from : time_range.slice_until]
 
-        await self._window.simulation_graph.update_custom_lines(symbol, indicators)
+        await self._window.simulation_graph.update_custom_lines(
+            symbol,
+            GridFrame.from_frame(indicators),
+        )
         duration_recorder.record()
         await self._set_minimum_view_range()
 
@@ -415,6 +471,7 @@ class Simulator:
             create_empty_unrealized_changes(),
         )
         self._simulation_summary = None
+        self._presented_result = None
 
         await self.present()
 
@@ -548,6 +605,19 @@ class Simulator:
         range_down = widget.getAxis("left").range[0]
         widget.plotItem.vb.setLimits(minYRange=range_down * 0.005)  # type:ignore
 
+    def _make_calculation_context(self, unique_task: UniqueTask) -> CalculationContext:
+        widgets = WidgetReferences(
+            pre_progressbar=self._window.progressBar_4,
+            main_progressbar=self._window.progressBar,
+            simulation_graph=self._window.simulation_graph,
+        )
+        return CalculationContext(
+            unique_task=unique_task,
+            workerpath=self._workerpath,
+            widgets=widgets,
+            indicator_cache=self._indicator_cache,
+        )
+
     async def _calculate(self, only_visible: bool = False) -> None:
         unique_task = self._calculation_task
         unique_task.spawn(self._calculate_real(unique_task, only_visible))
@@ -571,22 +641,218 @@ class Simulator:
             should_draw_all_years=self._should_draw_all_years,
         )
 
-        widgets = WidgetReferences(
-            pre_progressbar=self._window.progressBar_4,
-            main_progressbar=self._window.progressBar,
-            simulation_graph=self._window.simulation_graph,
-        )
+        async def present_partial_result(result: CalculationResult) -> None:
+            await self._apply_calculation_result(year, strategy, result)
 
         calculator = SimulationCalculator(
-            unique_task=unique_task,
+            context=self._make_calculation_context(unique_task),
             config=config,
-            workerpath=self._workerpath,
             year_candle_data=year_candle_data,
-            widgets=widgets,
+            on_partial_result=present_partial_result,
         )
 
         result = await calculator.calculate()
 
+        if not only_visible:
+            self._live_result = result
+            self._live_result_prefix = make_result_prefix(
+                strategy,
+                config.target_symbols,
+                year,
+            )
+
+        await self._apply_calculation_result(year, strategy, result)
+
+    async def _calculate_years(self) -> None:
+        years = await team.collector.check_saved_years()
+        chosen_years = await overlay(YearSelection(years))
+        if chosen_years is None:
+            return
+        unique_task = self._calculation_task
+        unique_task.spawn(self._calculate_years_real(unique_task, chosen_years))
+
+    async def _calculate_years_real(
+        self,
+        unique_task: UniqueTask,
+        years: list[int],
+    ) -> None:
+        strategy_index = self._simulation_settings.strategy_index
+        strategy = team.strategist.strategies[strategy_index]
+        target_symbols = self._window.data_settings.target_symbols
+
+        configs = [
+            CalculationConfig(
+                year=year,
+                strategy=strategy,
+                target_symbols=target_symbols,
+                only_visible=False,
+                should_draw_all_years=self._should_draw_all_years,
+            )
+            for year in sorted(years)
+        ]
+
+        calculator = MultiYearCalculator(
+            context=self._make_calculation_context(unique_task),
+            configs=configs,
+            read_candle_data=team.collector.read_saved_candle_data,
+        )
+
+        progressbar = self._window.progressBar
+
+        async def play_progress_bar() -> None:
+            while True:
+                progress = calculator.get_progress()
+                progressbar.setValue(math.ceil(progress * PROGRESS_BAR_MAX))
+                await sleep(0.1)
+
+        bar_task = spawn(play_progress_bar())
+        try:
+            results = await calculator.calculate()
+        finally:
+            bar_task.cancel()
+            progressbar.setValue(0)
+
+        # Results of other years are drawn from their stored files
+        year = self._simulation_settings.year
+        result = results.get(year)
+        if result is None:
+            return
+
+        self._live_result = result
+        self._live_result_prefix = make_result_prefix(strategy, target_symbols, year)
+
+        await self._apply_calculation_result(year, strategy, result)
+
+    async def _sweep_parameters(self) -> None:
+        strategy_index = self._simulation_settings.strategy_index
+        strategy = team.strategist.strategies[strategy_index]
+        sweep_options = await overlay(ParameterSweepInput(strategy))
+        if sweep_options is None:
+            return
+        self._calculation_task.spawn(
+            self._sweep_parameters_real(strategy, sweep_options),
+        )
+
+    async def _sweep_parameters_real(
+        self,
+        strategy: Strategy,
+        sweep_options: SweepOptions,
+    ) -> None:
+        year = self._simulation_settings.year
+        year_candle_data = await team.collector.read_saved_candle_data(year)
+
+        try:
+            sweep = ParameterSweep(
+                strategy=strategy,
+                options=sweep_options,
+                settings=self._simulation_settings,
+                target_symbols=self._window.data_settings.target_symbols,
+                indicator_cache=self._indicator_cache,
+            )
+        except ValueError as error:
+            await ask("Parameters don't match the strategy.", str(error), ["Okay"])
+            return
+
+        progressbar = self._window.progressBar
+
+        async def play_progress_bar() -> None:
+            while True:
+                progress = sweep.get_progress()
+                progressbar.setValue(math.ceil(progress * PROGRESS_BAR_MAX))
+                await sleep(0.1)
+
+        bar_task = spawn(play_progress_bar())
+        try:
+            rankings = await sweep.run(year_candle_data)
+        finally:
+            bar_task.cancel()
+            progressbar.setValue(0)
+
+        await overlay(SweepRankingView(rankings))
+
+    async def _toggle_live_following(self) -> None:
+        self._should_follow_live = self._live_following_action.isChecked()
+        await self._follow_live_candles()
+
+    async def _follow_live_candles(self) -> None:
+        if not self._should_follow_live:
+            return
+        if self._simulation_settings.year != datetime.now(UTC).year:
+            return
+        # Calculation started by the user takes precedence
+        if self._calculation_task.is_running():
+            return
+        unique_task = self._calculation_task
+        unique_task.spawn(self._follow_live_candles_real(unique_task))
+
+    async def _follow_live_candles_real(self, unique_task: UniqueTask) -> None:
+        year = self._simulation_settings.year
+        strategy_index = self._simulation_settings.strategy_index
+        strategy = team.strategist.strategies[strategy_index]
+        target_symbols = self._window.data_settings.target_symbols
+        prefix = make_result_prefix(strategy, target_symbols, year)
+
+        current_moment = to_moment(datetime.now(UTC))
+        calculate_until = current_moment - timedelta(seconds=LIVE_CANDLE_DELAY)
+
+        previous_result = None
+        if self._live_result_prefix == prefix:
+            previous_result = self._live_result
+
+        should_save = True
+        window_from = None
+        if previous_result is not None:
+            observed_until = previous_result.account_state.observed_until
+            # Store a checkpoint once an hour, otherwise keep results in memory
+            hour_start = calculate_until.replace(minute=0, second=0, microsecond=0)
+            should_save = observed_until <= hour_start
+            window_from = find_live_window_from(
+                previous_result,
+                should_save=should_save,
+            )
+
+        # Only recent candle data is needed when continuing a result in memory
+        async with team.collector.candle_data.read_lock as cell:
+            if window_from is None:
+                mask = cell.data.index.year == year  # type:ignore
+                candle_data = cell.data[mask].copy()
+            else:
+                candle_data = cell.data[window_from:].copy()
+
+        config = CalculationConfig(
+            year=year,
+            strategy=strategy,
+            target_symbols=target_symbols,
+            only_visible=False,
+            should_draw_all_years=self._should_draw_all_years,
+            calculate_until=calculate_until,
+            max_span=timedelta(seconds=LIVE_CALCULATION_SPAN),
+            should_save=should_save,
+        )
+
+        calculator = SimulationCalculator(
+            context=self._make_calculation_context(unique_task),
+            config=config,
+            year_candle_data=candle_data,
+            previous_result=previous_result,
+        )
+
+        result = await calculator.calculate_live()
+
+        self._live_result = result
+        self._live_result_prefix = prefix
+
+        if previous_result is not None and previous_result is self._presented_result:
+            await self._append_calculation_result(previous_result, result)
+        else:
+            await self._apply_calculation_result(year, strategy, result)
+
+    async def _apply_calculation_result(
+        self,
+        year: int,
+        strategy: Strategy,
+        result: CalculationResult,
+    ) -> None:
         self._raw_asset_record = RWLock[pd.DataFrame](result.asset_record)
         self._raw_unrealized_changes = RWLock[pd.Series](result.unrealized_changes)
         self._raw_scribbles = result.scribbles
@@ -596,39 +862,75 @@ class Simulator:
             strategy_code_name=strategy.code_name,
             strategy_version=strategy.version,
         )
+        self._presented_result = result
         await self.present()
 
-    def _calculate_chunk_asset_changes(
+    async def _append_calculation_result(
         self,
-        chunk_asset_record: pd.DataFrame,
-        maker_fee: float,
-        taker_fee: float,
-        leverage: int,
-    ) -> pd.Series:
-        """Calculate asset changes for a single chunk."""
-        chunk_result_asset_sr = chunk_asset_record["RESULT_ASSET"]
-        chunk_asset_shifts: pd.Series = chunk_result_asset_sr.diff()
-        if len(chunk_asset_shifts) > 0:
-            chunk_asset_shifts.iloc[0] = 0.0
+        previous_result: CalculationResult,
+        result: CalculationResult,
+    ) -> None:
+        """Present a result that continues the presented one.
 
-        lazy_chunk_result_asset = chunk_result_asset_sr.shift(periods=1)
-        if len(lazy_chunk_result_asset) > 0:
-            lazy_chunk_result_asset.iloc[0] = 1
+        Only rows after the previous result get fees and leverage applied,
+        and they're appended to the drawn lines instead of redrawing them.
+        """
+        maker_fee = self._simulation_settings.maker_fee
+        taker_fee = self._simulation_settings.taker_fee
+        leverage = self._simulation_settings.leverage
 
-        chunk_asset_changes_by_leverage = (
-            1 + chunk_asset_shifts / lazy_chunk_result_asset * leverage
-        )
+        self._raw_asset_record = RWLock[pd.DataFrame](result.asset_record)
+        self._raw_unrealized_changes = RWLock[pd.Series](result.unrealized_changes)
+        self._raw_scribbles = result.scribbles
+        self._raw_account_state = result.account_state
+        self._presented_result = result
 
-        chunk_fees = chunk_asset_record["ROLE"].copy()
-        chunk_fees[chunk_fees == "MAKER"] = maker_fee
-        chunk_fees[chunk_fees == "TAKER"] = taker_fee
-        chunk_fees = chunk_fees.astype(np.float32)
-        chunk_margin_ratios = chunk_asset_record["MARGIN_RATIO"]
-        chunk_asset_changes_by_fee = (
-            1 - (chunk_fees / 100) * chunk_margin_ratios * leverage
+        # The last previous row keeps asset changes of new rows continuous
+        last_moment = previous_result.asset_record.index[-1]
+        asset_record = result.asset_record[last_moment:]
+        chunk_data = self._prepare_chunk_list(asset_record)
+        asset_changes: pd.Series = pd.concat(
+            [
+                calculate_asset_changes(chunk, maker_fee, taker_fee, leverage)
+                for chunk in chunk_data.chunks
+            ],
         )
+        asset_changes = asset_changes[asset_changes.index > last_moment]
+        new_asset_record = asset_record.reindex(asset_changes.index)
+
+        previous_changes = previous_result.unrealized_changes
+        unrealized_changes = result.unrealized_changes
+        if len(previous_changes) > 0:
+            # Searched instead of compared, as all rows of the year are there
+            new_from = unrealized_changes.index.searchsorted(
+                previous_changes.index[-1],
+                side="right",
+            )
+            unrealized_changes = unrealized_changes.iloc[new_from:]
+        unrealized_changes = unrealized_changes * leverage
+
+        async with self._asset_record.read_lock as cell:
+            if len(cell.data) == 0:
+                await self.present()
+                return
+            last_asset = float(cell.data["RESULT_ASSET"].iloc[-1])
+        new_asset_record["RESULT_ASSET"] = last_asset * asset_changes.cumprod()
+
+        self._scribbles = result.scribbles.copy()
+        self._account_state = result.account_state.model_copy(deep=True)
+        # Copying the whole year happens in a thread to keep the window responsive
+        async with self._asset_record.write_lock as cell:
+            cell.data = await to_thread(pd.concat, [cell.data, new_asset_record])
+        async with self._unrealized_changes.write_lock as cell:
+            cell.data = await to_thread(pd.concat, [cell.data, unrealized_changes])
 
-        return chunk_asset_changes_by_leverage * chunk_asset_changes_by_fee
+        await self._window.simulation_graph.append_asset_lines(
+            symbol=self._viewing_symbol,
+            asset_record=new_asset_record,
+            unrealized_changes=unrealized_changes,
+            last_asset=last_asset,
+        )
+        spawn(self._display_range_information())
 
     def _prepare_chunk_list(self, asset_record: pd.DataFrame) -> ChunkList:
         """Prepare list of asset record chunks based on strategy settings."""
@@ -665,7 +967,7 @@ class Simulator:
         chunk_data = self._prepare_chunk_list(asset_record)
 
         chunk_asset_changes_list: list[pd.Series] = [
-            self._calculate_chunk_asset_changes(
+            calculate_asset_changes(
                 chunk_data.chunks[turn],
                 maker_fee,
                 taker_fee,
@@ -740,13 +1042,11 @@ class Simulator:
         strategy_version = strategy.version
 
         workerpath = self._workerpath
-        prefix = f"{strategy_code_name}_{strategy_version}_{year}"
+        target_symbols = self._window.data_settings.target_symbols
+        prefix = make_result_prefix(strategy, target_symbols, year)
         filepaths = [
-            workerpath / f"{prefix}_asset_record.pickle",
-            workerpath / f"{prefix}_unrealized_changes.pickle",
-            workerpath / f"{prefix}_scribbles.pickle",
-            workerpath / f"{prefix}_account_state.pickle",
-            workerpath / f"{prefix}_virtual_state.pickle",
+            workerpath / f"{prefix}_checkpoint.pickle",
+            *get_legacy_result_paths(workerpath, strategy, year),
         ]
 
         does_file_exist = False
@@ -776,6 +1076,8 @@ class Simulator:
         for filepath in filepaths:
             if await aiofiles.os.path.isfile(filepath):
                 await aiofiles.os.remove(filepath)
+        self._live_result = None
+        self._live_result_prefix = None
 
         await self._erase()
 
@@ -788,25 +1090,19 @@ class Simulator:
         strategy_version = strategy.version
 
         workerpath = self._workerpath
-        prefix = f"{strategy_code_name}_{strategy_version}_{year}"
-        asset_record_path = workerpath / f"{prefix}_asset_record.pickle"
-        unrealized_changes_path = workerpath / f"{prefix}_unrealized_changes.pickle"
-        scribbles_path = workerpath / f"{prefix}_scribbles.pickle"
-        account_state_path = workerpath / f"{prefix}_account_state.pickle"
+        target_symbols = self._window.data_settings.target_symbols
+        prefix = make_result_prefix(strategy, target_symbols, year)
+        checkpoint_path = workerpath / f"{prefix}_checkpoint.pickle"
 
         try:
+            checkpoint = await read_checkpoint(checkpoint_path)
             async with self._raw_asset_record.write_lock as cell:
-                new = await spawn_blocking(pd.read_pickle, asset_record_path)
-                cell.data = new
+                cell.data = checkpoint.asset_record
             async with self._raw_unrealized_changes.write_lock as cell:
-                new = await spawn_blocking(pd.read_pickle, unrealized_changes_path)
-                cell.data = new
-            async with aiofiles.open(scribbles_path, "rb") as file:
-                content = await file.read()
-                self._raw_scribbles = pickle.loads(content)
-            async with aiofiles.open(account_state_path, "rb") as file:
-                content = await file.read()
-                self._raw_account_state: AccountState = pickle.loads(content)
+                cell.data = checkpoint.unrealized_changes
+            self._raw_scribbles = checkpoint.scribbles
+            self._raw_account_state = checkpoint.account_state
+            self._presented_result = None
             self._simulation_summary = SimulationSummary(
                 year=year,
                 strategy_code_name=strategy_code_name,
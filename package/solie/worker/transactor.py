@@ -22,9 +22,11 @@ from solie.logic import (
     BinanceWatcher,
     DecisionContext,
     ExchangeConfig,
+    IndicatorCache,
     OrderPlacer,
     OrderPlacerConfig,
     StateConfig,
+    is_decision_moment,
     make_decisions,
     make_indicators,
 )
@@ -37,6 +39,7 @@ from solie.utility import (
     Cell,
     Decision,
     DurationRecorder,
+    GridFrame,
     OrderType,
     PositionDirection,
     RWLock,
@@ -49,6 +52,7 @@ from solie.utility import (
     slice_deque,
     sort_data_frame,
     sort_series,
+    to_epoch_ms,
     to_moment,
     when_internet_connected,
     when_internet_disconnected,
@@ -103,6 +107,7 @@ class IndicatorData(NamedTuple):
 
     current_candle_data: dict[str, float]
     current_indicators: dict[str, float]
+    indicators: pd.DataFrame
 
 
 class Transactor:
@@ -113,6 +118,7 @@ class Transactor:
         self._window = window
         self._scheduler = scheduler
         self._workerpath = window.datapath / "transactor"
+        self._indicator_cache = IndicatorCache(None)
 
         self._line_display_task = UniqueTask()
         self._range_display_task = UniqueTask()
@@ -804,20 +810,22 @@ class Transactor:
 
         await self._window.transaction_graph.update_heavy_lines(
             symbol=symbol,
-            candle_data=asset_data.candle_sliced,
+            candle_data=GridFrame.from_frame(asset_data.candle_sliced),
             asset_record=asset_record,
             unrealized_changes=unrealized_changes,
         )
 
-        indicators = await spawn_blocking(
-            make_indicators,
+        indicators = await self._indicator_cache.make_indicators(
             strategy=strategy,
             target_symbols=[self._viewing_symbol],
             candle_data=asset_data.candle_original,
         )
         indicators = indicators[time_range.slice_from : time_range.slice_until]
 
-        await self._window.transaction_graph.update_custom_lines(symbol, indicators)
+        await self._window.transaction_graph.update_custom_lines(
+            symbol,
+            GridFrame.from_frame(indicators),
+        )
         duration_recorder.record()
         await self._set_minimum_view_range()
 
@@ -941,6 +949,7 @@ class Transactor:
         return IndicatorData(
             current_candle_data=current_candle_data,
             current_indicators=current_indicators,
+            indicators=indicators,
         )
 
     async def _run_progress_bar(
@@ -977,10 +986,16 @@ class Transactor:
         if cumulation_rate < 1:
             return
 
-        duration_recorder = DurationRecorder("PERFORM_TRANSACTION")
         current_moment = to_moment(datetime.now(UTC))
         before_moment = current_moment - timedelta(seconds=10)
 
+        strategy_index = self._transaction_settings.strategy_index
+        strategy = team.strategist.strategies[strategy_index]
+        if not is_decision_moment(strategy, to_epoch_ms(current_moment)):
+            return
+
+        duration_recorder = DurationRecorder("PERFORM_TRANSACTION")
+
         is_cycle_done = Cell(False)
 
         spawn(self._run_progress_bar(current_moment, is_cycle_done))
@@ -997,8 +1012,6 @@ class Transactor:
             candle_data = cell.data[slice_from:].copy()
 
         target_symbols = self._window.data_settings.target_symbols
-        strategy_index = self._transaction_settings.strategy_index
-        strategy = team.strategist.strategies[strategy_index]
 
         indicator_data = await self._calculate_indicators(
             candle_data,
@@ -1015,6 +1028,8 @@ class Transactor:
             current_indicators=indicator_data.current_indicators,
             account_state=self._account_state,
             scribbles=self._scribbles,
+            candle_data=candle_data,
+            indicators=indicator_data.indicators,
         )
         decisions = make_decisions(decision_context)
 
@@ -0,0 +1,41 @@
+"""Shared fixtures of tests."""
+
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+import pytest
+from solie.common import prepare_process_pool
+from solie.common.parallelism import shutdown_process_pool
+from solie.utility import create_empty_candle_data
+
+
+@pytest.fixture(scope="session", autouse=True)
+def process_pool() -> Iterator[None]:
+    """Provide the process pool that blocking work is sent to."""
+    prepare_process_pool()
+    yield
+    shutdown_process_pool()
+
+
+def make_candle_data(
+    target_symbols: list[str],
+    start: str,
+    row_count: int,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Make candle data of random walks on the 10-second grid."""
+    generator = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=row_count, freq="10s", tz="UTC")
+    candle_data = create_empty_candle_data(target_symbols).reindex(index)
+    for symbol in target_symbols:
+        steps = generator.normal(0.0, 0.002, row_count)
+        close_prices = 100.0 * np.exp(np.cumsum(steps))
+        open_prices = np.concatenate(([100.0], close_prices[:-1]))
+        spreads = np.abs(generator.normal(0.0, 0.001, row_count)) * close_prices
+        candle_data[f"{symbol}/OPEN"] = open_prices
+        candle_data[f"{symbol}/HIGH"] = np.maximum(open_prices, close_prices) + spreads
+        candle_data[f"{symbol}/LOW"] = np.minimum(open_prices, close_prices) - spreads
+        candle_data[f"{symbol}/CLOSE"] = close_prices
+        candle_data[f"{symbol}/VOLUME"] = generator.uniform(1.0, 10.0, row_count)
+    return candle_data.astype(np.float32)
@@ -0,0 +1,76 @@
+"""Tests of trading decisions."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from solie.logic import DecisionContext, make_decisions
+from solie.utility import (
+    DecisionInput,
+    ExposureInput,
+    IndicatorInput,
+    OrderType,
+    RiskLevel,
+    create_empty_account_state,
+)
+
+from .conftest import make_candle_data
+
+
+class AverageStrategy:
+    """Holds the side of the price relative to its average of recent rows."""
+
+    code_name = "AVERGE"
+    readable_name = "Average Strategy"
+    version = "0.1"
+    description = "Looks back on recent candle data when deciding exposures"
+    risk_level = RiskLevel.HIGH
+    parallel_simulation_chunk_days: int | None = None
+    exposure_lookback = 100
+
+    def create_indicators(self, given: IndicatorInput) -> None:
+        """Create no indicators."""
+
+    def create_decisions(self, given: DecisionInput) -> None:
+        """Make no decisions, as exposures are used instead."""
+
+    def create_exposures(self, given: ExposureInput) -> None:
+        """Go long above the average price and short below it."""
+        for symbol in given.target_symbols:
+            close_sr = given.candle_data[f"{symbol}/CLOSE"]
+            average_sr = close_sr.rolling(self.exposure_lookback).mean()
+            exposures = given.new_exposures[symbol]
+            exposures[(close_sr > average_sr).to_numpy()] = 0.5
+            exposures[(close_sr < average_sr).to_numpy()] = -0.5
+
+
+def test_live_exposures_look_back_on_recent_rows() -> None:
+    """Exposures of the current moment are created from a trailing window."""
+    target_symbols = ["BTCUSDT"]
+    candle_data = make_candle_data(target_symbols, "2024-01-01", 500)
+    current_moment: datetime = candle_data.index[-1].to_pydatetime()
+    indicators = pd.DataFrame(index=candle_data.index)
+
+    close_sr = candle_data["BTCUSDT/CLOSE"]
+    is_above = close_sr.iloc[-1] > close_sr.iloc[-100:].mean()
+    expected_order_type = OrderType.NOW_BUY if is_above else OrderType.NOW_SELL
+
+    decisions = make_decisions(
+        DecisionContext(
+            strategy=AverageStrategy(),
+            target_symbols=target_symbols,
+            current_moment=current_moment,
+            current_candle_data={
+                str(k): float(v) for k, v in candle_data.iloc[-1].items()
+            },
+            current_indicators={},
+            account_state=create_empty_account_state(target_symbols),
+            scribbles={},
+            candle_data=candle_data,
+            indicators=indicators,
+        ),
+    )
+
+    assert list(decisions["BTCUSDT"]) == [expected_order_type]
+    decision = decisions["BTCUSDT"][expected_order_type]
+    assert np.isclose(decision.margin, 0.5)
@@ -0,0 +1,90 @@
+"""Tests of storing candle data in archives and journals."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from solie.logic import (
+    append_candle_journal,
+    read_archive_manifest,
+    read_candle_archive,
+    read_candle_journal,
+    update_candle_archive,
+    write_candle_archive,
+)
+from solie.utility import to_epoch_ms
+
+from .conftest import make_candle_data
+
+TARGET_SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+
+def test_archive_round_trip(tmp_path: Path) -> None:
+    """Candle data read back from an archive is the same as written."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 300)
+    folder = tmp_path / "candle_data_2024"
+
+    write_candle_archive(folder, candle_data)
+
+    read_data = read_candle_archive(folder)
+    pd.testing.assert_frame_equal(read_data, candle_data, check_freq=False)
+
+    sliced_data = read_candle_archive(
+        folder,
+        columns=["ETHUSDT/CLOSE", "SOLUSDT/CLOSE"],
+        slice_from=candle_data.index[100],
+        slice_until=candle_data.index[199],
+    )
+    assert len(sliced_data) == 100
+    assert sliced_data.index[0] == candle_data.index[100]
+    np.testing.assert_array_equal(
+        sliced_data["ETHUSDT/CLOSE"].to_numpy(),
+        candle_data["ETHUSDT/CLOSE"].iloc[100:200].to_numpy(),
+    )
+    assert sliced_data["SOLUSDT/CLOSE"].isna().all()
+
+
+def test_journal_rows_compact_into_archive(tmp_path: Path) -> None:
+    """Rows appended to a journal extend the archive when compacted."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 300)
+    folder = tmp_path / "candle_data_2024"
+    journal_path = tmp_path / "candle_journal_2024.jsonl"
+
+    write_candle_archive(folder, candle_data.iloc[:200])
+    # The last archived row is rewritten, then rows after a gap are added
+    for moment in [*candle_data.index[199:250], *candle_data.index[260:]]:
+        row = candle_data.loc[moment]
+        values = {str(c): float(v) for c, v in row.items()}
+        append_candle_journal(journal_path, to_epoch_ms(moment), values)
+
+    journal_data = read_candle_journal(journal_path)
+    assert len(journal_data) == 91
+    assert update_candle_archive(folder, journal_data)
+
+    assert read_archive_manifest(folder).row_count == 300
+    read_data = read_candle_archive(folder)
+    assert read_data.iloc[250:260].isna().all().all()
+    kept_data = read_data.drop(read_data.index[250:260])
+    expected_data = candle_data.drop(candle_data.index[250:260])
+    pd.testing.assert_frame_equal(kept_data, expected_data, check_freq=False)
+
+
+def test_truncated_journal_is_recovered(tmp_path: Path) -> None:
+    """A line left incomplete by a crash is ignored when reading a journal."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 10)
+    journal_path = tmp_path / "candle_journal_2024.jsonl"
+
+    for moment, row in candle_data.iterrows():
+        values = {str(c): float(v) for c, v in row.items()}
+        append_candle_journal(journal_path, to_epoch_ms(moment), values)  # type:ignore
+    journal_text = journal_path.read_text(encoding="utf8")
+    journal_path.write_text(journal_text[:-40], encoding="utf8")
+
+    journal_data = read_candle_journal(journal_path)
+    assert len(journal_data) == 9
+    pd.testing.assert_frame_equal(
+        journal_data,
+        candle_data.iloc[:9],
+        check_freq=False,
+        check_column_type=False,
+    )
@@ -0,0 +1,41 @@
+"""Tests of turning aggregate trades into candle data."""
+
+from collections import deque
+
+from solie.logic import collect_moment_aggtrades
+from solie.utility import AggregateTrade
+
+
+def test_collect_moment_aggtrades_keeps_trades_inside_the_moment() -> None:
+    """Only trades of target symbols strictly inside the moment are grouped."""
+    moment_from = 1_700_000_000_000
+    aggregate_trades = deque(
+        [
+            AggregateTrade(moment_from - 5000, "BTCUSDT", 1.0, 1.0),
+            AggregateTrade(moment_from, "BTCUSDT", 2.0, 1.0),
+            AggregateTrade(moment_from + 1000, "BTCUSDT", 3.0, 1.0),
+            AggregateTrade(moment_from + 2000, "XRPUSDT", 4.0, 1.0),
+            AggregateTrade(moment_from + 3000, "ETHUSDT", 5.0, 1.0),
+            AggregateTrade(moment_from + 4000, "BTCUSDT", 6.0, 1.0),
+            AggregateTrade(moment_from + 10000, "BTCUSDT", 7.0, 1.0),
+        ],
+    )
+
+    symbol_aggtrades = collect_moment_aggtrades(
+        aggregate_trades,
+        ["BTCUSDT", "ETHUSDT", "SOLUSDT"],
+        moment_from,
+    )
+
+    assert symbol_aggtrades is not None
+    assert [t.price for t in symbol_aggtrades["BTCUSDT"]] == [3.0, 6.0]
+    assert [t.price for t in symbol_aggtrades["ETHUSDT"]] == [5.0]
+    assert symbol_aggtrades["SOLUSDT"] == []
+
+
+def test_collect_moment_aggtrades_without_recent_trades() -> None:
+    """Nothing is collected when trades stopped arriving before the moment."""
+    moment_from = 1_700_000_000_000
+    aggregate_trades = deque([AggregateTrade(moment_from - 5000, "BTCUSDT", 1.0, 1.0)])
+
+    assert collect_moment_aggtrades(aggregate_trades, ["BTCUSDT"], moment_from) is None
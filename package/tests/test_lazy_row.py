@@ -0,0 +1,77 @@
+"""Tests of reading rows of values lazily."""
+
+from collections.abc import Sequence
+from typing import SupportsFloat
+
+from solie.utility import LazyRow
+
+
+class CountingRow(Sequence[SupportsFloat]):
+    """Row of values that counts how many times they are read."""
+
+    def __init__(self, values: list[float]) -> None:
+        """Initialize with plain values."""
+        self.values = values
+        self.read_count = 0
+
+    def __getitem__(self, position: int) -> float:  # type:ignore
+        """Read a value at a position."""
+        self.read_count += 1
+        return self.values[position]
+
+    def __len__(self) -> int:
+        """Get the number of values."""
+        return len(self.values)
+
+
+def make_row() -> tuple[LazyRow, CountingRow]:
+    """Make a lazy row of three columns."""
+    values = CountingRow([1.0, 2.0, 3.0])
+    columns = {"BTCUSDT/OPEN": 0, "BTCUSDT/CLOSE": 1, "ETHUSDT/CLOSE": 2}
+    return LazyRow(columns, values), values
+
+
+def test_values_are_read_only_when_accessed() -> None:
+    """Accessing a column converts only that value, and only once."""
+    row, values = make_row()
+
+    assert values.read_count == 0
+    assert row["BTCUSDT/CLOSE"] == 2.0
+    assert row["BTCUSDT/CLOSE"] == 2.0
+    assert values.read_count == 1
+
+
+def test_get_and_contains() -> None:
+    """Missing columns give the default without reading other values."""
+    row, values = make_row()
+
+    assert "ETHUSDT/CLOSE" in row
+    assert "SOLUSDT/CLOSE" not in row
+    assert row.get("ETHUSDT/CLOSE") == 3.0
+    assert row.get("SOLUSDT/CLOSE") is None
+    assert row.get("SOLUSDT/CLOSE", 0.0) == 0.0
+    assert values.read_count == 1
+
+
+def test_iteration_fills_in_column_order() -> None:
+    """Iterating converts every value and keeps assigned ones."""
+    row, values = make_row()
+    row["BTCUSDT/CLOSE"] = 20.0
+    row["SOLUSDT/CLOSE"] = 4.0
+
+    assert list(row) == [
+        "BTCUSDT/OPEN",
+        "BTCUSDT/CLOSE",
+        "ETHUSDT/CLOSE",
+        "SOLUSDT/CLOSE",
+    ]
+    assert dict(row.items()) == {
+        "BTCUSDT/OPEN": 1.0,
+        "BTCUSDT/CLOSE": 20.0,
+        "ETHUSDT/CLOSE": 3.0,
+        "SOLUSDT/CLOSE": 4.0,
+    }
+    assert len(row) == 4
+    assert list(row.values()) == [1.0, 20.0, 3.0, 4.0]
+    assert row == row.copy()
+    assert values.read_count == 2
@@ -0,0 +1,59 @@
+"""Tests of scheduling chunks across consumers."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+from solie.common import consume_chunks
+
+
+def test_consume_chunks_handles_every_chunk_once() -> None:
+    """Each chunk reaches exactly one consumer, in the given order."""
+    handled: list[tuple[int, int]] = []
+
+    async def handle_chunk(consumer: int, chunk: int) -> None:
+        await asyncio.sleep(0.001 * (chunk % 3))
+        handled.append((consumer, chunk))
+
+    asyncio.run(consume_chunks(range(20), handle_chunk, 4))
+
+    assert sorted(c for _, c in handled) == list(range(20))
+    assert {consumer for consumer, _ in handled} == {0, 1, 2, 3}
+
+
+def test_consume_chunks_advances_source_lazily() -> None:
+    """An asynchronous source doesn't run far ahead of the consumers."""
+    produced_count = 0
+    handled_count = 0
+    max_waiting_count = 0
+
+    async def produce() -> AsyncIterator[int]:
+        nonlocal produced_count, max_waiting_count
+        for chunk in range(30):
+            produced_count += 1
+            max_waiting_count = max(max_waiting_count, produced_count - handled_count)
+            yield chunk
+
+    async def handle_chunk(_: int, __: int) -> None:
+        nonlocal handled_count
+        await asyncio.sleep(0.001)
+        handled_count += 1
+
+    asyncio.run(consume_chunks(produce(), handle_chunk, 2))
+
+    assert handled_count == 30
+    # Two chunks being handled, two waiting and one being put
+    assert max_waiting_count <= 5
+
+
+def test_consume_chunks_stops_on_failure() -> None:
+    """A failing chunk cancels other consumers and raises its error."""
+
+    async def handle_chunk(_: int, chunk: int) -> None:
+        if chunk == 3:
+            msg = "Broken chunk"
+            raise ValueError(msg)
+        await asyncio.sleep(1.0)
+
+    with pytest.raises(ValueError, match="Broken chunk"):
+        asyncio.run(consume_chunks(range(10), handle_chunk, 4))
@@ -0,0 +1,330 @@
+"""Tests of simulation calculation and stored results."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from solie.common import UniqueTask
+from solie.logic import (
+    CalculationConfig,
+    CalculationContext,
+    CalculationResult,
+    IndicatorCache,
+    SimulationCalculator,
+    find_live_window_from,
+    read_checkpoint,
+    simulate_chunk,
+)
+from solie.logic.analyze_market import CalculationOutput
+from solie.logic.simulation_calculator import (
+    create_blank_states,
+    merge_symbol_outputs,
+    separate_symbol_states,
+    write_checkpoint,
+)
+from solie.utility import (
+    AccountState,
+    Decision,
+    DecisionInput,
+    IndicatorInput,
+    OrderType,
+    PositionDirection,
+    RiskLevel,
+)
+
+from .conftest import make_candle_data
+
+TARGET_SYMBOLS = ["BTCUSDT", "ETHUSDT"]
+
+
+class CrossingStrategy:
+    """Flips positions of each symbol when the price crosses its average."""
+
+    code_name = "CROSSN"
+    readable_name = "Crossing Strategy"
+    version = "0.1"
+    description = "Trades each symbol on its own"
+    risk_level = RiskLevel.HIGH
+    parallel_simulation_chunk_days: int | None = None
+    symbol_independent = True
+
+    def create_indicators(self, given: IndicatorInput) -> None:
+        """Calculate moving averages of prices."""
+        for symbol in given.target_symbols:
+            close_sr = given.candle_data[f"{symbol}/CLOSE"]
+            given.new_indicators[f"{symbol}/PRICE/SMA"] = close_sr.rolling(30).mean()
+
+    def create_decisions(self, given: DecisionInput) -> None:
+        """Hold a position on the side of the price relative to its average."""
+        wallet_balance = given.account_state.wallet_balance
+        for symbol in given.target_symbols:
+            close_price = given.current_candle_data[f"{symbol}/CLOSE"]
+            average_price = given.current_indicators[f"{symbol}/PRICE/SMA"]
+            position = given.account_state.positions[symbol]
+            margin = 0.5 * wallet_balance
+            if close_price > average_price:
+                if position.direction == PositionDirection.NONE:
+                    given.new_decisions[symbol][OrderType.NOW_BUY] = Decision(
+                        margin=margin,
+                    )
+                elif position.direction == PositionDirection.SHORT:
+                    given.new_decisions[symbol][OrderType.NOW_BUY] = Decision(
+                        margin=position.margin + margin,
+                    )
+            elif close_price < average_price:
+                if position.direction == PositionDirection.NONE:
+                    given.new_decisions[symbol][OrderType.NOW_SELL] = Decision(
+                        margin=margin,
+                    )
+                elif position.direction == PositionDirection.LONG:
+                    given.new_decisions[symbol][OrderType.NOW_SELL] = Decision(
+                        margin=position.margin + margin,
+                    )
+
+
+def make_context(workerpath: Path) -> CalculationContext:
+    """Make a calculation context without widgets, which are not drawn."""
+    return CalculationContext(
+        unique_task=UniqueTask(),
+        workerpath=workerpath,
+        widgets=None,  # type:ignore
+        indicator_cache=IndicatorCache(None),
+    )
+
+
+async def calculate_until(
+    workerpath: Path,
+    candle_data: pd.DataFrame,
+    until: datetime,
+) -> CalculationResult:
+    """Calculate like the simulator does, storing the result as a checkpoint."""
+    config = CalculationConfig(
+        year=2024,
+        strategy=CrossingStrategy(),
+        target_symbols=TARGET_SYMBOLS,
+        only_visible=False,
+        should_draw_all_years=False,
+        calculate_until=until,
+    )
+    calculator = SimulationCalculator(
+        context=make_context(workerpath),
+        config=config,
+        year_candle_data=candle_data,
+    )
+    calculation_inputs = await calculator.prepare()
+    calculation_outputs = [simulate_chunk(i) for i in calculation_inputs]
+    return await calculator.finish(calculation_outputs)
+
+
+@pytest.mark.parametrize("split_row", [1500, 2345])
+def test_resumed_symbol_split_matches_full_run(tmp_path: Path, split_row: int) -> None:
+    """Continuing stored results of separate symbols gives the same results."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 4000)
+    until = datetime(2024, 1, 1, 11, tzinfo=UTC)
+    split_moment = candle_data.index[split_row].to_pydatetime()
+
+    full_path = tmp_path / "full"
+    full_path.mkdir()
+    full_result = asyncio.run(calculate_until(full_path, candle_data, until))
+
+    resumed_path = tmp_path / "resumed"
+    resumed_path.mkdir()
+    asyncio.run(calculate_until(resumed_path, candle_data, split_moment))
+    resumed_result = asyncio.run(calculate_until(resumed_path, candle_data, until))
+
+    trade_count = int((full_result.asset_record["CAUSE"] == "AUTO_TRADE").sum())
+    assert trade_count > 10
+    assert len(resumed_result.asset_record) == len(full_result.asset_record)
+    assert resumed_result.account_state.wallet_balance == pytest.approx(
+        full_result.account_state.wallet_balance,
+        rel=1e-12,
+    )
+    np.testing.assert_allclose(
+        resumed_result.asset_record["RESULT_ASSET"].to_numpy(np.float64),
+        full_result.asset_record["RESULT_ASSET"].to_numpy(np.float64),
+        rtol=1e-12,
+    )
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    """A stored checkpoint reads back as the result it was made from."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 2000)
+    until = datetime(2024, 1, 1, 5, tzinfo=UTC)
+    result = asyncio.run(calculate_until(tmp_path, candle_data, until))
+
+    (checkpoint_path,) = tmp_path.glob("*_checkpoint.pickle")
+    checkpoint = asyncio.run(read_checkpoint(checkpoint_path))
+    copied_path = tmp_path / "copied_checkpoint.pickle"
+    asyncio.run(write_checkpoint(copied_path, checkpoint))
+    copied = asyncio.run(read_checkpoint(copied_path))
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [checkpoint_path.name, copied_path.name],
+    )
+    pd.testing.assert_frame_equal(copied.asset_record, result.asset_record)
+    pd.testing.assert_series_equal(
+        copied.unrealized_changes,
+        result.unrealized_changes,
+    )
+    assert copied.scribbles == result.scribbles
+    assert copied.account_state == result.account_state
+    assert copied.virtual_state == result.virtual_state
+    assert copied.symbol_states == result.symbol_states
+    assert copied.segments == checkpoint.segments
+    assert copied.segments[-1].slice_until < until
+
+
+def make_symbol_output(
+    account_state: AccountState,
+    symbol: str,
+    start_balance: float,
+    end_balance: float,
+) -> CalculationOutput:
+    """Make an output of a symbol that traded once at the same moment as others."""
+    blank_states = create_blank_states(TARGET_SYMBOLS)
+    symbol_account_state, symbol_virtual_state = separate_symbol_states(
+        account_state.model_copy(update={"wallet_balance": start_balance}),
+        blank_states.virtual_state,
+        symbol,
+    )
+    symbol_account_state.wallet_balance = end_balance
+    asset_record = pd.DataFrame(
+        {
+            "CAUSE": ["AUTO_TRADE"],
+            "SYMBOL": [symbol],
+            "SIDE": ["BUY"],
+            "FILL_PRICE": [100.0],
+            "ROLE": ["TAKER"],
+            "MARGIN_RATIO": [0.5],
+            "ORDER_ID": [0],
+            "RESULT_ASSET": [end_balance],
+        },
+        index=pd.DatetimeIndex([datetime(2024, 1, 1, 0, 1, tzinfo=UTC)]),
+    )
+    return CalculationOutput(
+        chunk_asset_record=asset_record,
+        chunk_scribbles={symbol: end_balance},
+        chunk_account_state=symbol_account_state,
+        chunk_virtual_state=symbol_virtual_state,
+    )
+
+
+def test_merge_symbol_outputs_chains_ratios() -> None:
+    """Each symbol changes the combined wallet by the ratio of its own wallet."""
+    account_state = create_blank_states(TARGET_SYMBOLS).account_state
+    symbol_outputs = [
+        make_symbol_output(account_state, "BTCUSDT", 1.2, 1.32),
+        make_symbol_output(account_state, "ETHUSDT", 0.8, 0.72),
+    ]
+
+    merged = merge_symbol_outputs(
+        create_blank_states(TARGET_SYMBOLS).asset_record,
+        symbol_outputs,
+        TARGET_SYMBOLS,
+        1.0,
+        [1.2, 0.8],
+    )
+
+    asset_record = merged.chunk_asset_record
+    np.testing.assert_allclose(asset_record["RESULT_ASSET"], [1.1, 0.99])
+    assert asset_record.index.is_unique
+    assert list(asset_record["SYMBOL"]) == TARGET_SYMBOLS
+    assert merged.chunk_account_state.wallet_balance == pytest.approx(0.99)
+    assert merged.chunk_scribbles == {"BTCUSDT": 1.32, "ETHUSDT": 0.72}
+
+
+async def follow_live(
+    workerpath: Path,
+    candle_data: pd.DataFrame,
+    moments: list[datetime],
+    *,
+    should_save: bool = False,
+) -> CalculationResult:
+    """Extend results step by step in memory, like following live candles."""
+    result = None
+    for moment in moments:
+        window_from = None
+        if result is not None:
+            window_from = find_live_window_from(result, should_save=should_save)
+        config = CalculationConfig(
+            year=2024,
+            strategy=CrossingStrategy(),
+            target_symbols=TARGET_SYMBOLS,
+            only_visible=False,
+            should_draw_all_years=False,
+            calculate_until=moment,
+            should_save=should_save,
+        )
+        calculator = SimulationCalculator(
+            context=make_context(workerpath),
+            config=config,
+            year_candle_data=candle_data[window_from:],
+            previous_result=result,
+        )
+        result = await calculator.calculate_live()
+    if result is None:
+        msg = "No moment was given"
+        raise ValueError(msg)
+    return result
+
+
+def test_live_steps_match_full_run(tmp_path: Path) -> None:
+    """Calculating a few new rows at a time gives the same results."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 2000, seed=1)
+    until = datetime(2024, 1, 1, 5, tzinfo=UTC)
+    moments = [until - timedelta(seconds=10 * r) for r in (400, 250, 90, 30, 0)]
+
+    full_path = tmp_path / "full"
+    full_path.mkdir()
+    full_result = asyncio.run(calculate_until(full_path, candle_data, until))
+
+    live_path = tmp_path / "live"
+    live_path.mkdir()
+    live_result = asyncio.run(follow_live(live_path, candle_data, moments))
+
+    assert not any(live_path.iterdir())
+
+    assert live_result.account_state.wallet_balance == pytest.approx(
+        full_result.account_state.wallet_balance,
+        rel=1e-12,
+    )
+    np.testing.assert_allclose(
+        live_result.asset_record["RESULT_ASSET"].to_numpy(np.float64),
+        full_result.asset_record["RESULT_ASSET"].to_numpy(np.float64),
+        rtol=1e-12,
+    )
+    pd.testing.assert_series_equal(
+        live_result.unrealized_changes,
+        full_result.unrealized_changes,
+    )
+
+
+def test_saved_live_steps_keep_segments(tmp_path: Path) -> None:
+    """Saving while following live candles gives the segments of a full run."""
+    candle_data = make_candle_data(TARGET_SYMBOLS, "2024-01-01", 20000, seed=2)
+    until = datetime(2024, 1, 2, 12, tzinfo=UTC)
+    moments = [datetime(2024, 1, 1, 20, tzinfo=UTC), until - timedelta(hours=1), until]
+
+    full_path = tmp_path / "full"
+    full_path.mkdir()
+    full_result = asyncio.run(calculate_until(full_path, candle_data, until))
+
+    live_path = tmp_path / "live"
+    live_path.mkdir()
+    live_result = asyncio.run(
+        follow_live(live_path, candle_data, moments, should_save=True),
+    )
+
+    assert full_result.segments is not None
+    assert len(full_result.segments) == 2
+    assert live_result.segments == full_result.segments
+    (checkpoint_path,) = live_path.glob("*_checkpoint.pickle")
+    checkpoint = asyncio.run(read_checkpoint(checkpoint_path))
+    assert checkpoint.segments == full_result.segments
+    pd.testing.assert_series_equal(
+        live_result.unrealized_changes,
+        full_result.unrealized_changes,
+    )